@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Benchmark feedparser against the lxml streaming feed parser.
+
+Builds a large synthetic RSS 2.0 feed in memory and parses it repeatedly with
+each backend, reading the same fields the dispatcher would (title, link and
+description of every entry).
+
+Run: python benchmarks/bench_feeds.py [--entries 5000] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from xwebetl.extract.rss import parse_rss  # noqa: E402
+
+FIELDS = ["title", "link", "description"]
+
+
+def synthetic_feed(entries: int) -> bytes:
+    items = "".join(
+        f"""
+    <item>
+      <title>Article {i}: A reasonably long headline for benchmarking</title>
+      <link>https://example.com/articles/{i}.html</link>
+      <description><![CDATA[<p>Summary of article {i}. {"Lorem ipsum dolor sit amet. " * 8}</p>]]></description>
+      <pubDate>Mon, 30 Dec 2025 10:00:00 GMT</pubDate>
+      <guid>https://example.com/articles/{i}.html</guid>
+      <category>News</category>
+    </item>"""
+        for i in range(entries)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8" ?>
+<rss version="2.0">
+  <channel>
+    <title>Synthetic feed</title>
+    <link>https://example.com/</link>
+    <description>Benchmark feed</description>{items}
+  </channel>
+</rss>""".encode()
+
+
+def run(label: str, parser: str, body: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        feed = parse_rss(body, url="bench", parser=parser, fields=FIELDS)
+        values = [entry.get(field) for entry in feed.entries for field in FIELDS]
+        best = min(best, time.perf_counter() - start)
+    assert values and all(values)
+    print(f"{label:<24} {best * 1000:9.1f} ms  {len(feed.entries) / best:10.0f} entries/s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    body = synthetic_feed(args.entries)
+    print(f"{args.entries} entries, {len(body) / 1024:.0f} KiB")
+
+    baseline = run("feedparser", "feedparser", body, args.repeat)
+    fast = run("lxml iterparse", "lxml", body, args.repeat)
+    print(f"speedup: {baseline / fast:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Benchmark HTML field extraction: lxml + XPath, lxml + CSS, and selectolax + CSS.
+
+Scales up the test_server article pages (the article body is repeated until the
+page reaches --size KiB) and extracts the same fields the test sources use,
+through Dispatcher.html_parse with each selector engine.
+
+Run: python benchmarks/bench_html.py [--size 500] [--repeat 20]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from xwebetl.extract import fast_html  # noqa: E402
+from xwebetl.extract.dispatch import Dispatcher  # noqa: E402
+from xwebetl.source.source_manager import Field, Job  # noqa: E402
+
+PAGES = ROOT / "test_server" / "content" / "html"
+
+JOBS = {
+    "lxml + XPath": [
+        Field(name="title", selector="/html/body/h1"),
+        Field(name="link", selector="//div[@id='article-body']/p[4]/a/@href"),
+        Field(name="body", selector="//div[@id='article-body']"),
+    ],
+    "lxml + CSS (cssselect)": [
+        Field(name="title", selector="body > h1", engine="css"),
+        Field(name="link", selector="#article-body > p:nth-of-type(4) a::attr(href)", engine="css"),
+        Field(name="body", selector="#article-body", engine="css"),
+    ],
+}
+JOBS["selectolax + CSS"] = JOBS["lxml + CSS (cssselect)"]
+
+
+def scaled_page(path: Path, size_kib: int) -> str:
+    """Repeat the article's filler sections until the page reaches size_kib."""
+    html = path.read_text()
+    head, rest = html.split("<body>", 1)
+    filler = f'<div class="related">{rest.split("</body>", 1)[0]}</div>'.replace(
+        'id="article-body"', 'class="article-body"'
+    )
+    body = [rest.split("</body>", 1)[0]]
+    while sum(map(len, body)) < size_kib * 1024:
+        body.append(filler)
+    return f"{head}<body>{''.join(body)}</body></html>"
+
+
+def run(label: str, dispatcher: Dispatcher, job: Job, pages: list[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            result = dispatcher.html_parse(job, "bench", page)
+            assert len(result.fields) == len(job.extract)
+    elapsed = (time.perf_counter() - start) / (repeat * len(pages))
+    print(f"{label:<26} {elapsed * 1000:8.2f} ms/page")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=500, help="Page size in KiB")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = [scaled_page(PAGES / f"article_{i}.html", args.size) for i in (1, 2, 3)]
+    print(f"{len(pages)} pages of ~{args.size} KiB")
+
+    dispatcher = Dispatcher.__new__(Dispatcher)
+    lexbor = fast_html.LexborHTMLParser
+    timings = {}
+    for label, fields in JOBS.items():
+        if label.startswith("selectolax") and lexbor is None:
+            print(f"{label:<26} skipped (pip install 'xwebetl[fast-html]')")
+            continue
+        # The lxml CSS run must not be routed to selectolax
+        fast_html.LexborHTMLParser = lexbor if label.startswith("selectolax") else None
+        job = Job(name="bench", start="", ftype="html", extract=fields, extract_ftype="html", nav=[])
+        timings[label] = run(label, dispatcher, job, pages, args.repeat)
+    fast_html.LexborHTMLParser = lexbor
+
+    baseline = timings["lxml + XPath"]
+    for label, elapsed in timings.items():
+        print(f"{label:<26} {baseline / elapsed:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
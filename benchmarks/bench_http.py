@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+Benchmark per-request connections against the pooled keep-alive session.
+
+Starts the test server with HTTP/1.1 keep-alive and fetches the article pages
+repeatedly, once with a fresh `requests.get` per URL (new TCP connection each
+time) and once through `visit_html` (shared pooled session).
+
+Run: python benchmarks/bench_http.py [--requests 500]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "test_server"))
+
+from server import TestServer  # noqa: E402
+from xwebetl.extract.http import DEFAULT_HEADERS, configure_session, visit_html  # noqa: E402
+
+PAGES = [
+    "html/home.html",
+    "html/article_1.html",
+    "html/article_2.html",
+    "html/article_3.html",
+]
+
+
+def run(label: str, fetch, urls: list[str]) -> float:
+    start = time.perf_counter()
+    for url in urls:
+        assert fetch(url)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<28} {len(urls) / elapsed:8.1f} req/s "
+        f"{elapsed / len(urls) * 1000:8.3f} ms/req"
+    )
+    return elapsed
+
+
+def fresh_connection(url: str) -> str:
+    return requests.get(url, timeout=10, headers=DEFAULT_HEADERS).text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8899)
+    args = parser.parse_args()
+
+    server = TestServer(port=args.port, keep_alive=True)
+    base = server.start_background()
+    urls = [f"{base}/{PAGES[i % len(PAGES)]}" for i in range(args.requests)]
+
+    try:
+        configure_session()
+        # Warm up both paths so imports and the first handshake don't skew results
+        fresh_connection(urls[0])
+        visit_html(urls[0])
+
+        baseline = run("requests.get (no pool)", fresh_connection, urls)
+        pooled = run("visit_html (pooled session)", visit_html, urls)
+        print(f"speedup: {baseline / pooled:.2f}x")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Benchmark RunTracker bookkeeping on a large fetch history.
+
+Fills a temporary runs.db with fetched URLs for two sources, then times
+recording new URLs and filtering a large candidate list, as the dispatcher
+does for a job with many discovered URLs. Then compares filtering a list of
+URLs never seen before with and without the Bloom prefilter.
+
+Run: python benchmarks/bench_tracker.py [--history 200000] [--candidates 100000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from xwebetl.extract.dispatch import RunTracker  # noqa: E402
+
+
+def timed(label: str, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed * 1000:9.1f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--history", type=int, default=200000)
+    parser.add_argument("--candidates", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = RunTracker(Path(tmp) / "runs.db")
+
+        def record():
+            # Every other article was fetched before, plus another source's history
+            for i in range(0, args.history, 2):
+                tracker.add_url(f"https://example.com/articles/{i}.html", "news")
+            for i in range(args.history // 2):
+                tracker.add_url(f"https://example.org/{i}.html", "other")
+            tracker.flush()
+
+        timed(f"add_url x {args.history}", record)
+
+        candidates = [f"https://example.com/articles/{i}.html" for i in range(args.candidates)]
+        unfetched = []
+        timed(
+            f"filter_unfetched_urls x {args.candidates}",
+            lambda: unfetched.extend(tracker.filter_unfetched_urls(candidates, "news")),
+        )
+        assert len(unfetched) == args.candidates // 2
+        tracker.close()
+
+        fresh = [f"https://example.com/new/{i}.html" for i in range(args.candidates)]
+        timed(
+            "  new URLs, no prefilter",
+            lambda: tracker.filter_unfetched_urls(fresh, "news"),
+        )
+        prefiltered = RunTracker(Path(tmp) / "runs.db", prefilter=True)
+        timed("  prefilter build from runs.db", lambda: prefiltered.has_been_fetched("x", "news"))
+        prefiltered.close()
+        prefiltered = RunTracker(Path(tmp) / "runs.db", prefilter=True)
+        timed("  prefilter load from runs.bloom", lambda: prefiltered.has_been_fetched("x", "news"))
+        timed(
+            "  new URLs, prefilter",
+            lambda: prefiltered.filter_unfetched_urls(fresh, "news"),
+        )
+        prefiltered.close()
+
+
+if __name__ == "__main__":
+    main()
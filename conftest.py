@@ -116,6 +116,36 @@ def cleanup_generated_test_files():
         print(f"Warning: Test cleanup failed: {e}")
 
 
+class FetchSpy:
+    """URLs requested over HTTP during a test, in request order."""
+
+    def __init__(self, spy, url_arg: int):
+        self.spy = spy
+        self.url_arg = url_arg
+
+    def urls(self) -> list[str]:
+        return [call.args[self.url_arg] for call in self.spy.call_args_list]
+
+    def reset(self) -> None:
+        self.spy.reset_mock()
+
+
+@pytest.fixture
+def fetch_spy(engine, mocker):
+    """
+    Fixture that records every URL fetched by the test's `engine` parameter.
+    The process engine's pool is replaced by threads so requests made in
+    workers are seen too.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from xwebetl.extract import aio, http
+
+    if engine == "async":
+        return FetchSpy(mocker.spy(aio.AsyncFetcher, "fetch"), url_arg=1)
+    mocker.patch("xwebetl.extract.dispatch.ProcessPoolExecutor", ThreadPoolExecutor)
+    return FetchSpy(mocker.spy(http, "request"), url_arg=0)
+
+
 @pytest.fixture
 def dispatch_all_sources(test_sources_yml):
     """
@@ -13,11 +13,17 @@ class ReusableTCPServer(socketserver.TCPServer):
     allow_reuse_address = True
 
 
+class ReusableThreadingTCPServer(socketserver.ThreadingMixIn, ReusableTCPServer):
+    """Threaded variant so idle keep-alive connections don't block other clients."""
+    daemon_threads = True
+
+
 class TestServer:
     """Simple HTTP server for serving test content."""
 
-    def __init__(self, port=8888):
+    def __init__(self, port=8888, keep_alive=False):
         self.port = port
+        self.keep_alive = keep_alive
         self.content_dir = Path(__file__).parent / "content"
         self.httpd = None
         self.server_thread = None
@@ -52,7 +58,15 @@ class TestServer:
                     return os.path.join(content_dir, relpath)
             handler = CustomHTTPRequestHandler
 
-        self.httpd = ReusableTCPServer(("", self.port), handler)
+        if self.keep_alive:
+            # HTTP/1.1 keeps connections open between requests (used by benchmarks)
+            handler.protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without TCP_NODELAY the
+            # client's delayed ACK adds ~40ms to every reused connection.
+            handler.disable_nagle_algorithm = True
+            self.httpd = ReusableThreadingTCPServer(("", self.port), handler)
+        else:
+            self.httpd = ReusableTCPServer(("", self.port), handler)
         return f"http://localhost:{self.port}"
 
     def start_background(self):
@@ -162,7 +162,9 @@ ENV/
 @click.option("--source", "-s", help="Specific source name to process (processes all if not specified)")
 @click.option("--date", "-d", help="Date string (YYYY-MM-DD) for transform/load. Defaults to today if not specified")
 @click.option("--no-track", is_flag=True, help="Disable fetch tracking, allowing re-fetching of already processed URLs")
-def run(config_file, source, date, no_track):
+@click.option("--engine", type=click.Choice(["process", "async"]), default=None, help="Fetch engine (overrides settings.engine in the config)")
+@click.option("--from-cache", is_flag=True, help="Serve every page from the response cache and never touch the network")
+def run(config_file, source, date, no_track, engine, from_cache):
     """Run full ETL pipeline: extract, transform, and load.
 
     Extract always uses current time. Transform and load use --date if specified, or today's date.
@@ -178,11 +180,19 @@ def run(config_file, source, date, no_track):
         click.echo(f"  Source: {source}")
     if no_track:
         click.echo("  Tracking disabled - will re-fetch all URLs")
+    if from_cache:
+        click.echo("  Offline - pages are served from the response cache only")
 
     try:
         # Extract
         click.echo("\n[1/3] Extracting data...")
-        dispatcher = Dispatcher(path=config_file, source_name=source, no_track=no_track)
+        dispatcher = Dispatcher(
+            path=config_file,
+            source_name=source,
+            no_track=no_track,
+            engine=engine,
+            from_cache=from_cache,
+        )
         dispatcher.execute_jobs()
         dispatcher.save_results()
         click.echo("  ✓ Extraction complete")
@@ -201,7 +211,7 @@ def run(config_file, source, date, no_track):
         click.echo("  ✓ Loading complete")
 
         click.echo("\n✓ ETL pipeline completed successfully")
-    except ValueError as e:
+    except (ValueError, ImportError) as e:
         click.echo(f"\n✗ Error: {e}", err=True)
         raise click.Abort()
 
@@ -210,19 +220,29 @@ def run(config_file, source, date, no_track):
 @click.argument("config_file", type=click.Path(exists=True))
 @click.option("--source", "-s", help="Specific source name to extract")
 @click.option("--no-track", is_flag=True, help="Disable fetch tracking, allowing re-fetching of already processed URLs")
-def extract(config_file, source, no_track):
+@click.option("--engine", type=click.Choice(["process", "async"]), default=None, help="Fetch engine (overrides settings.engine in the config)")
+@click.option("--from-cache", is_flag=True, help="Serve every page from the response cache and never touch the network")
+def extract(config_file, source, no_track, engine, from_cache):
     """Extract data from sources defined in config file."""
     click.echo(f"Extracting data from {config_file}")
     if source:
         click.echo(f"  Source: {source}")
     if no_track:
         click.echo("  Tracking disabled - will re-fetch all URLs")
+    if from_cache:
+        click.echo("  Offline - pages are served from the response cache only")
 
     try:
-        dispatcher = Dispatcher(path=config_file, source_name=source, no_track=no_track)
+        dispatcher = Dispatcher(
+            path=config_file,
+            source_name=source,
+            no_track=no_track,
+            engine=engine,
+            from_cache=from_cache,
+        )
         dispatcher.execute_jobs()
         dispatcher.save_results()
-    except ValueError as e:
+    except (ValueError, ImportError) as e:
         click.echo(f"✗ Error: {e}", err=True)
         raise click.Abort()
 
@@ -0,0 +1,340 @@
+"""Asyncio fetch engine.
+
+Downloads run concurrently on a single event loop while parsing (lxml,
+feedparser, pdfium) is handed to a small process pool, so hundreds of
+sockets can be in flight without a forked interpreter per request.
+"""
+
+from collections import Counter
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable
+import asyncio
+import logging
+
+from xwebetl.extract.http import (
+    DEFAULT_HEADERS,
+    Document,
+    NotModified,
+    ResponseTooLarge,
+    decode_body,
+    format_size,
+)
+from xwebetl.extract.validators import ValidatorStore
+from xwebetl.extract.cache import ResponseCache, get_cache, is_offline, cache_ttl
+from xwebetl.extract.retry import (
+    get_retry_policy,
+    backoff_delay,
+    should_retry_status,
+    RetryLater,
+)
+from xwebetl.source.source_manager import RetryPolicy
+from xwebetl.extract.scheduler import Scheduler
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, see the "async" extra
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+# Transient network failures that are safe to retry for a GET
+RETRY_EXCEPTIONS = (
+    (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+    if aiohttp is not None
+    else ()
+)
+
+
+@dataclass
+class FetchTask:
+    """A URL to download and the function that turns its body into a result.
+
+    The parser is called in the process pool as parse(*args, body). context is
+    caller data handed back to crawl's on_result callback; it never leaves the
+    event loop. retries is filled in with the number of retried attempts and
+    validators with the response's (url, etag, last_modified) for a
+    conditional fetch, for the caller to save (see record_validators).
+    Bodies larger than max_bytes are skipped. With raw the parser gets a
+    Document instead of text or bytes. A task given a body parses it without
+    downloading; with keep_body the downloaded body is stored in body for
+    on_result. With attempt set a failed request is not retried in place: the
+    result is a RetryLater and the caller schedules the next attempt.
+    """
+
+    url: str
+    parse: Callable
+    args: tuple = ()
+    text: bool = True
+    conditional: bool = False
+    ttl: int | None = None
+    retry: RetryPolicy | None = None
+    max_bytes: int | None = None
+    context: Any = None
+    retries: int = 0
+    validators: list = field(default_factory=list)
+    body: str | bytes | None = None
+    keep_body: bool = False
+    raw: bool = False
+    attempt: int | None = None
+
+
+def require_aiohttp() -> None:
+    if aiohttp is None:
+        raise ImportError(
+            "The async engine requires aiohttp. Install it with: pip install 'xwebetl[async]'"
+        )
+
+
+class AsyncFetcher:
+    """aiohttp session bounded by a global and a per-host connection limit."""
+
+    def __init__(self, concurrency: int = 200, max_per_host: int = 10, timeout: float = 10):
+        require_aiohttp()
+        self.concurrency = concurrency
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.session = None
+        # Retried attempts per URL, collected by _fetch_and_parse
+        self.retries: Counter = Counter()
+        # Validators of conditional fetches per URL, collected by _fetch_and_parse
+        self.validators: dict[str, tuple[str | None, str | None]] = {}
+        self.store: ValidatorStore | None = None
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency, limit_per_host=self.max_per_host
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=DEFAULT_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.session.close()
+
+    async def validator_headers(self, url: str) -> dict[str, str]:
+        """Conditional request headers for a URL, read in a thread."""
+        if self.store is None:
+            self.store = await asyncio.to_thread(ValidatorStore)
+        return await asyncio.to_thread(self.store.request_headers, url)
+
+    async def fetch(
+        self,
+        url: str,
+        text: bool = True,
+        conditional: bool = False,
+        ttl: int | None = None,
+        retry: RetryPolicy | None = None,
+        max_bytes: int | None = None,
+        raw: bool = False,
+        attempt: int | None = None,
+    ) -> str | bytes | Document | NotModified | RetryLater | None:
+        """Fetch a URL, retrying transient failures.
+
+        With attempt (1-based) only that attempt is made, and instead of
+        retrying in place a retryable failure returns RetryLater so the
+        scheduler queues the retry under the host's rate limit.
+        """
+        cache = get_cache()
+        key = ResponseCache.key(url, DEFAULT_HEADERS) if cache else None
+        # SQLite and cache file I/O run in threads so they don't stall the
+        # event loop, and with it every other download in flight
+        if cache:
+            cached = await asyncio.to_thread(cache.get, key, cache_ttl(ttl))
+            if cached is not None:
+                logger.debug(f"Cache hit: {url}")
+                body, encoding, content_type = cached
+                if max_bytes is not None and len(body) > max_bytes:
+                    logger.error(
+                        f"Skipping {url}: cached body of {format_size(len(body))} "
+                        f"exceeds the {format_size(max_bytes)} limit"
+                    )
+                    return None
+                # Decoded like a cache hit of the process engine (cached_document)
+                if raw:
+                    return Document(body, encoding or "utf-8", content_type)
+                if text:
+                    return decode_body(body, encoding or "utf-8")
+                return body
+            if is_offline():
+                logger.error(f"Not in cache (offline mode): {url}")
+                return None
+
+        headers = await self.validator_headers(url) if conditional else None
+        policy = get_retry_policy(retry)
+        attempts = max(1, policy.max_attempts)
+        scheduled = attempt
+        try:
+            for attempt in range(scheduled or 1, attempts + 1):
+                last_attempt = attempt == attempts
+                try:
+                    async with self.session.get(url, headers=headers) as response:
+                        if last_attempt or not should_retry_status(policy, response.status):
+                            return await self.read(
+                                url, response, text, conditional, cache, key, max_bytes, raw
+                            )
+                        delay = backoff_delay(
+                            policy, attempt, response.headers.get("Retry-After")
+                        )
+                        reason = f"HTTP {response.status}"
+                except RETRY_EXCEPTIONS as e:
+                    if last_attempt:
+                        raise
+                    delay = backoff_delay(policy, attempt)
+                    reason = type(e).__name__
+                logger.warning(
+                    f"Retrying {url} in {delay:.1f}s after {reason} (attempt {attempt}/{attempts})"
+                )
+                self.retries[url] += 1
+                if scheduled is not None:
+                    return RetryLater(delay)
+                await asyncio.sleep(delay)
+        except ResponseTooLarge as e:
+            logger.error(f"Skipping {url}: {e}")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to fetch {url}: {e!r}")
+            return None
+
+    async def read(
+        self, url, response, text, conditional, cache, key, max_bytes=None, raw=False
+    ):
+        """Turn a final response into a body, NotModified, or an exception."""
+        if response.status == 304:
+            logger.info(f"Not modified since last run: {url}")
+            return NotModified()
+        response.raise_for_status()
+        body = await self.read_body(response, max_bytes)
+        if conditional:
+            self.validators[url] = (
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+        # The Content-Type charset; without one decode_body detects it
+        encoding = response.charset
+        if cache:
+            await asyncio.to_thread(
+                cache.put, key, url, body, encoding, response.headers.get("Content-Type")
+            )
+        if raw:
+            return Document(body, encoding, response.headers.get("Content-Type"))
+        if text:
+            return decode_body(body, encoding)
+        return body
+
+    @staticmethod
+    async def read_body(response, max_bytes: int | None) -> bytes:
+        """Read a body, giving up as soon as it is larger than max_bytes."""
+        if max_bytes is None:
+            return await response.read()
+        if response.content_length is not None and response.content_length > max_bytes:
+            raise ResponseTooLarge(
+                f"Content-Length of {format_size(response.content_length)} exceeds the {format_size(max_bytes)} limit"
+            )
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ResponseTooLarge(f"body exceeds the {format_size(max_bytes)} limit")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+
+async def _fetch_and_parse(
+    fetcher: AsyncFetcher, executor: Executor, task: FetchTask
+) -> Any:
+    body = task.body
+    if body is None:
+        body = await fetcher.fetch(
+            task.url,
+            text=task.text,
+            conditional=task.conditional,
+            ttl=task.ttl,
+            retry=task.retry,
+            max_bytes=task.max_bytes,
+            raw=task.raw,
+            attempt=task.attempt,
+        )
+        task.retries += fetcher.retries.pop(task.url, 0)
+        if task.url in fetcher.validators:
+            task.validators.append((task.url, *fetcher.validators.pop(task.url)))
+        if task.keep_body and not isinstance(body, (NotModified, RetryLater)):
+            task.body = body
+    if body is None or isinstance(body, (NotModified, RetryLater)):
+        return body
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(task.parse, *task.args, body))
+
+
+async def _crawl(
+    scheduler: Scheduler,
+    executor: Executor,
+    on_result: Callable[[FetchTask, Any], None],
+    concurrency: int,
+    max_per_host: int,
+    timeout: float,
+) -> None:
+    async with AsyncFetcher(
+        concurrency=concurrency, max_per_host=max_per_host, timeout=timeout
+    ) as fetcher:
+
+        in_flight: dict[asyncio.Task, FetchTask] = {}
+        while scheduler or in_flight:
+            while len(in_flight) < concurrency:
+                task = scheduler.pop()
+                if task is None:
+                    break
+                in_flight[asyncio.create_task(_fetch_and_parse(fetcher, executor, task))] = task
+
+            if not in_flight:
+                # Everything queued is rate limited; wait for the next token
+                await asyncio.sleep(scheduler.delay())
+                continue
+
+            done, _ = await asyncio.wait(
+                in_flight,
+                timeout=scheduler.delay() if scheduler else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for finished in done:
+                task = in_flight.pop(finished)
+                scheduler.done(task)
+                if not finished.cancelled():
+                    on_result(task, finished.result())
+
+            if scheduler.cancelled:
+                # Abort downloads of cancelled tasks; they are reaped above
+                for running, task in in_flight.items():
+                    if not running.done() and scheduler.is_cancelled(task):
+                        running.cancel()
+
+
+def crawl(
+    scheduler: Scheduler,
+    executor: Executor,
+    on_result: Callable[[FetchTask, Any], None],
+    concurrency: int = 200,
+    max_per_host: int = 10,
+    timeout: float = 10,
+) -> None:
+    """Fetch scheduled tasks concurrently until the scheduler runs dry.
+
+    Args:
+        scheduler: Queue of FetchTasks; on_result may push follow-up tasks
+        executor: Pool that runs the CPU-bound parse functions
+        on_result: Called on the event loop with each finished task and its
+            result; downloads of tasks it cancels (Scheduler.cancel) are aborted
+        concurrency: Maximum number of simultaneous fetches
+        max_per_host: Maximum number of simultaneous connections per host
+        timeout: Total seconds allowed for each request
+    """
+    if not scheduler:
+        return
+    asyncio.run(
+        _crawl(scheduler, executor, on_result, concurrency, max_per_host, timeout)
+    )
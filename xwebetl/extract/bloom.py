@@ -0,0 +1,88 @@
+"""Bloom filter used by RunTracker to skip database lookups for new URLs.
+
+A negative answer is exact (the URL was never added), a positive one is only
+"probably": callers confirm hits against the database.
+"""
+
+from pathlib import Path
+import hashlib
+import math
+import os
+import struct
+import tempfile
+
+MAGIC = b"XBLM"
+# magic, hash count, bit count, capacity, then the owner's fingerprint (rows, max rowid)
+HEADER = struct.Struct("<4sIQQqq")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    Sized for capacity items at the given false positive rate; past capacity
+    the rate degrades, so owners rebuild it bigger (see needs_rebuild).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @staticmethod
+    def digest(item: str) -> tuple[int, int]:
+        # Double hashing: the k positions are h1 + i * h2 for two halves of one digest
+        value = int.from_bytes(hashlib.blake2b(item.encode(), digest_size=16).digest(), "little")
+        return value & 0xFFFFFFFFFFFFFFFF, (value >> 64) | 1
+
+    def add(self, item: str) -> None:
+        h1, h2 = self.digest(item)
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        # Written out, not via add()'s loop shape: this is the hot path of URL filtering
+        h1, h2 = self.digest(item)
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def needs_rebuild(self) -> bool:
+        return self.count > self.capacity
+
+    def save(self, path: Path, fingerprint: tuple[int, int]) -> None:
+        """Write the filter atomically, tagged with the state it reflects."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.hashes, self.size, self.capacity, *fingerprint))
+            f.write(self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> tuple["BloomFilter", tuple[int, int]] | None:
+        """Read a saved filter and its fingerprint; None if missing or corrupt."""
+        try:
+            data = path.read_bytes()
+            magic, hashes, size, capacity, rows, max_rowid = HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        bits = data[HEADER.size :]
+        if magic != MAGIC or len(bits) != (size + 7) // 8:
+            return None
+        bloom = cls.__new__(cls)
+        bloom.capacity = capacity
+        bloom.error_rate = 0.5**hashes  # rate at capacity for this layout
+        bloom.size = size
+        bloom.hashes = hashes
+        bloom.bits = bytearray(bits)
+        bloom.count = rows
+        return bloom, (rows, max_rowid)
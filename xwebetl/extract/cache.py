@@ -0,0 +1,207 @@
+from pathlib import Path
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+
+from xwebetl.source.source_manager import CacheSettings
+
+logger = logging.getLogger(__name__)
+
+# Request headers that change the response body and therefore the cache key
+VARY_HEADERS = ("Accept", "Accept-Language")
+
+_cache: "ResponseCache | None" = None
+_settings = CacheSettings()
+
+
+class ResponseCache:
+    """On-disk cache of response bodies with a TTL and a total size cap.
+
+    Bodies are zlib-compressed into one file per entry under the cache
+    directory; a small SQLite index next to them tracks size, age and last
+    access so the least recently used entries are evicted once the cache
+    grows past max_bytes. Safe to share between worker processes.
+    """
+
+    def __init__(self, cache_dir: str | Path = None, max_bytes: int = 500 * 1024 * 1024):
+        if cache_dir is None:
+            project_root = Path.cwd()
+            cache_dir = project_root / "data" / "cache"
+        else:
+            cache_dir = Path(cache_dir)
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.cache_dir = cache_dir
+        self.db_path = cache_dir / "index.db"
+        self.max_bytes = max_bytes
+        self._create_table()
+
+    def _create_table(self) -> None:
+        """Create the index table if it doesn't exist."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    encoding TEXT,
+                    content_type TEXT,
+                    size INTEGER NOT NULL,
+                    stored REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            if "content_type" not in columns:
+                # Indexes written before Content-Types were kept
+                conn.execute("ALTER TABLE entries ADD COLUMN content_type TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON entries(accessed)")
+            conn.commit()
+
+    @staticmethod
+    def key(url: str, headers: dict[str, str] | None = None) -> str:
+        """Cache key for a URL and the request headers that affect its body."""
+        headers = headers or {}
+        parts = [url] + [f"{name}:{headers.get(name, '')}" for name in VARY_HEADERS]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.z"
+
+    def get(
+        self, key: str, ttl: float | None = None
+    ) -> tuple[bytes, str | None, str | None] | None:
+        """Return (body, encoding, content_type) for a cached entry.
+
+        Args:
+            key: Cache key from ResponseCache.key
+            ttl: Maximum age in seconds; None accepts entries of any age
+
+        Returns:
+            The body, its text encoding and the response's Content-Type, or
+            None on a miss or expired entry
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT encoding, content_type, stored FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            encoding, content_type, stored = row
+            if ttl is not None and time.time() - stored > ttl:
+                return None
+            try:
+                body = zlib.decompress(self.path_for(key).read_bytes())
+            except (OSError, zlib.error):
+                # Evicted by another process or truncated; treat as a miss
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            conn.commit()
+        return body, encoding, content_type
+
+    def put(
+        self,
+        key: str,
+        url: str,
+        body: bytes,
+        encoding: str | None = None,
+        content_type: str | None = None,
+    ) -> None:
+        """Store a response body, evicting old entries if the cache is full."""
+        data = zlib.compress(body)
+        path = self.path_for(key)
+        path.parent.mkdir(exist_ok=True)
+
+        # Write to a temp file first so readers never see a partial body
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, url, encoding, content_type, size, stored, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, encoding, content_type, len(data), now, now),
+            )
+            conn.commit()
+        self.evict()
+
+    def size(self) -> int:
+        """Total compressed size of all entries in bytes."""
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with sqlite3.connect(self.db_path) as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            rows = conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed ASC"
+            ).fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self.path_for(key).unlink(missing_ok=True)
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+            conn.commit()
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with sqlite3.connect(self.db_path) as conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM entries")]
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+        for key in keys:
+            self.path_for(key).unlink(missing_ok=True)
+
+
+def configure_cache(settings: CacheSettings | None = None) -> None:
+    """Set up the response cache used by this process.
+
+    Called in the parent for the async engine and as part of the worker
+    initializer for the process engine.
+    """
+    global _cache, _settings
+    _settings = settings or CacheSettings()
+    _cache = None
+    if _settings.enabled or _settings.offline:
+        _cache = ResponseCache(_settings.dir, max_bytes=_settings.max_size_mb * 1024 * 1024)
+
+
+def get_cache() -> ResponseCache | None:
+    """Return this process's response cache, or None if caching is disabled."""
+    return _cache
+
+
+def is_offline() -> bool:
+    """True when responses must come from the cache and never the network."""
+    return _settings.offline
+
+
+def cache_ttl(ttl: int | None = None) -> float | None:
+    """Effective TTL for a lookup: None (any age) offline, else ttl or the default."""
+    if _settings.offline:
+        return None
+    return _settings.ttl if ttl is None else ttl
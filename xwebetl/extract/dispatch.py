@@ -1,27 +1,100 @@
-from xwebetl.source.source_manager import Source, Nav, Job
+from xwebetl.source.source_manager import (
+    Source,
+    Nav,
+    Job,
+    Settings,
+    RateLimit,
+    HttpSettings,
+    CacheSettings,
+    RetryPolicy,
+)
 from xwebetl.source.data_manager import DataManager
-from xwebetl.extract.http import visit_html
-from xwebetl.extract.rss import visit_rss
+from xwebetl.extract.http import (
+    Document,
+    visit_html,
+    fetch_document,
+    open_stream,
+    download,
+    configure_session,
+    configure_size_limits,
+    size_limit,
+    max_size_limit,
+    NotModified,
+)
+from xwebetl.extract.rss import visit_rss, parse_rss
+from xwebetl.extract.cache import configure_cache, get_cache
+from xwebetl.extract.stream_html import StreamingExtractor
+from xwebetl.extract.retry import (
+    configure_retry,
+    take_retry_count,
+    scheduled_attempt,
+    RetryLater,
+)
+from xwebetl.extract.validators import ValidatorStore, take_validators
+from xwebetl.extract.pdf import select_pages, extract_text, extract_file, save_temp
+from xwebetl.extract import aio, fast_html
+from xwebetl.extract.scheduler import Scheduler, run_scheduled
+from xwebetl.extract.ratelimit import HostLimiter
+from xwebetl.extract.bloom import BloomFilter
+from xwebetl.extract.urls import canonicalize, dedupe
+from xwebetl.extract.shared import SharedDocuments, FETCH, WAIT
 from lxml import html as lxml_html
 from urllib.parse import urljoin, quote
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime
-from io import BytesIO
+from functools import partial
+from typing import BinaryIO, Callable
 import pypdfium2 as pdfium
+import requests
 import sqlite3
 import json
+import time
+import re
 import logging
 
 
 logger = logging.getLogger(__name__)
 
 
+def init_worker(http: HttpSettings, cache: CacheSettings, retry: RetryPolicy) -> None:
+    """ProcessPoolExecutor initializer: pooled session, response cache and retry policy."""
+    configure_session(http.pool_size, http.max_per_host, http.pool_block, http.timeout)
+    configure_size_limits(http.max_size_mb)
+    configure_cache(cache)
+    configure_retry(retry)
+
+
 class RunTracker:
-    """Tracks fetched URLs in SQLite database to prevent duplicate fetches."""
+    """Tracks fetched URLs in SQLite database to prevent duplicate fetches.
+
+    One connection in WAL mode is kept open. add_url only buffers the row;
+    rows are written in a single transaction once flush_size of them are
+    pending or flush_interval seconds have passed, before every read, and on
+    flush()/close(). The Dispatcher closes the tracker at the end of each run.
+
+    With prefilter=True a Bloom filter of each source's URLs is loaded on the
+    source's first lookup (from runs.bloom/ next to the database, or rebuilt
+    from it when missing or stale) and kept up to date by add_url. URLs the
+    filter has never seen are unfetched without asking SQLite; only possible
+    hits are confirmed with a query. Filters are saved on close().
+    """
 
-    def __init__(self, db_path: str | Path = None):
+    # Candidate lists up to this size are checked with a single IN (...) query
+    IN_QUERY_LIMIT = 500
+    # Smallest filter built for a source, so new sources don't rebuild at once
+    MIN_FILTER_CAPACITY = 10_000
+
+    def __init__(
+        self,
+        db_path: str | Path = None,
+        flush_size: int = 500,
+        flush_interval: float = 5.0,
+        prefilter: bool = False,
+        error_rate: float = 0.01,
+    ):
         if db_path is None:
             project_root = Path.cwd()
             db_path = project_root / "data" / "runs.db"
@@ -32,11 +105,63 @@ class RunTracker:
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
         self.db_path = db_path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._conn: sqlite3.Connection | None = None
+        self._pending: list[tuple[str, str, str]] = []
+        self._last_flush = time.monotonic()
+        self.prefilter = prefilter
+        self.error_rate = error_rate
+        self.filter_dir = db_path.with_suffix(".bloom")
+        self._filters: dict[str, BloomFilter] = {}
+        # Rows each loaded filter should account for, checked before saving it
+        self._filter_rows: dict[str, int] = {}
         self._create_table()
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The tracker's connection, opened on first use (and after close())."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path)
+            # Readers don't block the writer and commits don't fsync the main file
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def flush(self) -> None:
+        """Write all buffered URLs in one transaction."""
+        if self._pending:
+            by_source = defaultdict(list)
+            for row in self._pending:
+                by_source[row[1]].append(row)
+            with self.conn:
+                for source_name, rows in by_source.items():
+                    cursor = self.conn.executemany(
+                        "INSERT OR IGNORE INTO fetched_urls (url, source_name, fetch_datetime) VALUES (?, ?, ?)",
+                        rows,
+                    )
+                    if source_name in self._filter_rows:
+                        self._filter_rows[source_name] += cursor.rowcount
+            self._pending = []
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Flush buffered URLs, save the prefilters and close the connection."""
+        self.flush()
+        self.save_filters()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "RunTracker":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def _create_table(self) -> None:
         """Create the fetched_urls table if it doesn't exist."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conn as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS fetched_urls (
@@ -46,25 +171,89 @@ class RunTracker:
                 )
                 """
             )
-            # Create index for faster source lookups
+            # Per-source lookups of a URL are a single index seek; this also
+            # serves source-only queries, which made idx_source_name redundant
             conn.execute(
                 """
-                CREATE INDEX IF NOT EXISTS idx_source_name
-                ON fetched_urls(source_name)
+                CREATE INDEX IF NOT EXISTS idx_source_url
+                ON fetched_urls(source_name, url)
                 """
             )
+            conn.execute("DROP INDEX IF EXISTS idx_source_name")
             conn.execute(
                 """
                 CREATE INDEX IF NOT EXISTS idx_fetch_datetime
                 ON fetched_urls(fetch_datetime)
                 """
             )
-            conn.commit()
+
+    def _filter_path(self, source_name: str) -> Path:
+        return self.filter_dir / (re.sub(r"[^\w.-]", "_", source_name) + ".bloom")
+
+    def _fingerprint(self, source_name: str) -> tuple[int, int]:
+        """Row count and highest rowid of a source, identifying its tracked set."""
+        cursor = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM fetched_urls WHERE source_name = ?",
+            (source_name,),
+        )
+        return cursor.fetchone()
+
+    def _filter(self, source_name: str) -> BloomFilter:
+        """The source's prefilter, loaded or (re)built on first use and when full."""
+        bloom = self._filters.get(source_name)
+        if bloom is not None and not bloom.needs_rebuild():
+            return bloom
+
+        self.flush()
+        fingerprint = self._fingerprint(source_name)
+        rows = fingerprint[0]
+        loaded = None if bloom is not None else BloomFilter.load(self._filter_path(source_name))
+        if loaded is not None and loaded[1] == fingerprint and not loaded[0].needs_rebuild():
+            bloom = loaded[0]
+        else:
+            bloom = BloomFilter(max(2 * rows, self.MIN_FILTER_CAPACITY), self.error_rate)
+            cursor = self.conn.execute(
+                "SELECT url FROM fetched_urls WHERE source_name = ?", (source_name,)
+            )
+            for (url,) in cursor:
+                bloom.add(url)
+        self._filters[source_name] = bloom
+        self._filter_rows[source_name] = rows
+        return bloom
+
+    def save_filters(self) -> None:
+        """Persist the loaded prefilters next to the database.
+
+        A filter is only saved if the database holds exactly the rows it was
+        built from plus the ones this tracker inserted; otherwise (another
+        process tracked URLs meanwhile) its file is removed and the next run
+        rebuilds it.
+        """
+        for source_name, bloom in self._filters.items():
+            path = self._filter_path(source_name)
+            fingerprint = self._fingerprint(source_name)
+            if fingerprint[0] == self._filter_rows[source_name]:
+                bloom.save(path, fingerprint)
+            else:
+                path.unlink(missing_ok=True)
+
+    def _drop_filters(self, source_name: str | None = None) -> None:
+        """Forget prefilters after deletions (all of them if source_name is None)."""
+        if source_name is None:
+            self._filters.clear()
+            self._filter_rows.clear()
+            paths = self.filter_dir.glob("*.bloom") if self.filter_dir.is_dir() else []
+        else:
+            self._filters.pop(source_name, None)
+            self._filter_rows.pop(source_name, None)
+            paths = [self._filter_path(source_name)]
+        for path in paths:
+            path.unlink(missing_ok=True)
 
     def add_url(
         self, url: str, source_name: str, fetch_datetime: datetime = None
     ) -> None:
-        """Add a fetched URL record to the database.
+        """Add a fetched URL record to the database (buffered, see flush()).
 
         Args:
             url: The URL that was fetched
@@ -76,12 +265,14 @@ class RunTracker:
 
         datetime_str = fetch_datetime.isoformat()
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR IGNORE INTO fetched_urls (url, source_name, fetch_datetime) VALUES (?, ?, ?)",
-                (url, source_name, datetime_str),
-            )
-            conn.commit()
+        self._pending.append((url, source_name, datetime_str))
+        if self.prefilter:
+            self._filter(source_name).add(url)
+        if (
+            len(self._pending) >= self.flush_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
 
     def has_been_fetched(self, url: str, source_name: str = None) -> bool:
         """Check if a URL has been fetched for a specific source.
@@ -94,7 +285,10 @@ class RunTracker:
         Returns:
             True if the URL has been fetched before, False otherwise
         """
-        with sqlite3.connect(self.db_path) as conn:
+        if self.prefilter and source_name and url not in self._filter(source_name):
+            return False
+        self.flush()
+        with self.conn as conn:
             if source_name:
                 cursor = conn.execute(
                     "SELECT COUNT(*) FROM fetched_urls WHERE url = ? AND source_name = ?",
@@ -108,12 +302,16 @@ class RunTracker:
             count = cursor.fetchone()[0]
             return count > 0
 
-    def filter_unfetched_urls(self, urls: list[str], source_name: str) -> list[str]:
+    def filter_unfetched_urls(
+        self, urls: list[str], source_name: str, key: Callable[[str], str] | None = None
+    ) -> list[str]:
         """Filter out URLs that have already been fetched by this specific source.
 
         Args:
             urls: List of URLs to filter
             source_name: Name of the source doing the fetching
+            key: Maps a URL to the form it is tracked under (its canonical
+                URL); the URL itself by default
 
         Returns:
             List of URLs that have not been fetched by this source yet
@@ -121,15 +319,51 @@ class RunTracker:
         if not urls:
             return []
 
-        placeholders = ",".join("?" * len(urls))
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                f"SELECT url FROM fetched_urls WHERE url IN ({placeholders}) AND source_name = ?",
-                (*urls, source_name),
+        keys = [key(url) for url in urls] if key else list(urls)
+        candidates = keys
+        if self.prefilter:
+            # Only URLs the filter may have seen need the database
+            bloom = self._filter(source_name)
+            candidates = [url for url in keys if url in bloom]
+            if not candidates:
+                return list(urls)
+
+        self.flush()
+        if len(candidates) <= self.IN_QUERY_LIMIT:
+            placeholders = ",".join("?" * len(candidates))
+            cursor = self.conn.execute(
+                f"SELECT url FROM fetched_urls WHERE source_name = ? AND url IN ({placeholders})",
+                (source_name, *candidates),
             )
-            fetched_urls = {row[0] for row in cursor.fetchall()}
+            fetched_urls = {row[0] for row in cursor}
+        else:
+            fetched_urls = self._fetched_among(candidates, source_name)
+
+        return [url for url, url_key in zip(urls, keys) if url_key not in fetched_urls]
+
+    def _fetched_among(self, urls: list[str], source_name: str) -> set[str]:
+        """Bulk lookup: load the candidates into a temp table and join.
 
-        return [url for url in urls if url not in fetched_urls]
+        Avoids SQLite's limit on bound parameters and lets SQLite do the
+        matching as one pass over the (source_name, url) index.
+        """
+        conn = self.conn
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS candidate_urls (url TEXT PRIMARY KEY)")
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO candidate_urls (url) VALUES (?)",
+                ((url,) for url in urls),
+            )
+            cursor = conn.execute(
+                """
+                SELECT c.url FROM candidate_urls c
+                JOIN fetched_urls f ON f.source_name = ? AND f.url = c.url
+                """,
+                (source_name,),
+            )
+            fetched_urls = {row[0] for row in cursor}
+            conn.execute("DELETE FROM candidate_urls")
+        return fetched_urls
 
     def delete_by_source(self, source_name: str) -> int:
         """Delete all fetched URLs for a specific source.
@@ -140,12 +374,14 @@ class RunTracker:
         Returns:
             Number of rows deleted
         """
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self.conn as conn:
             cursor = conn.execute(
                 "DELETE FROM fetched_urls WHERE source_name = ?", (source_name,)
             )
             conn.commit()
-            return cursor.rowcount
+        self._drop_filters(source_name)
+        return cursor.rowcount
 
     def delete_by_url(self, url: str) -> int:
         """Delete a specific URL from the database.
@@ -156,10 +392,12 @@ class RunTracker:
         Returns:
             Number of rows deleted
         """
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self.conn as conn:
             cursor = conn.execute("DELETE FROM fetched_urls WHERE url = ?", (url,))
             conn.commit()
-            return cursor.rowcount
+        self._drop_filters()
+        return cursor.rowcount
 
     def delete_all(self) -> int:
         """Delete all fetched URLs from the database.
@@ -167,10 +405,12 @@ class RunTracker:
         Returns:
             Number of rows deleted
         """
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self.conn as conn:
             cursor = conn.execute("DELETE FROM fetched_urls")
             conn.commit()
-            return cursor.rowcount
+        self._drop_filters()
+        return cursor.rowcount
 
     def reset_tracking_by_date(self, date_str: str = None) -> int:
         """Reset (delete) all fetched URLs for a specific date.
@@ -187,7 +427,8 @@ class RunTracker:
             target_date = date_str
 
         # Delete all records where the fetch_datetime date matches the target date
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self.conn as conn:
             cursor = conn.execute(
                 """
                 DELETE FROM fetched_urls
@@ -196,7 +437,8 @@ class RunTracker:
                 (target_date,),
             )
             conn.commit()
-            return cursor.rowcount
+        self._drop_filters()
+        return cursor.rowcount
 
     def get_latest_fetches(self, limit: int = 100) -> list[tuple[str, str, str]]:
         """Get the latest fetched URLs from the database.
@@ -207,7 +449,8 @@ class RunTracker:
         Returns:
             List of tuples (url, source_name, fetch_datetime) ordered by most recent first
         """
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self.conn as conn:
             cursor = conn.execute(
                 """
                 SELECT url, source_name, fetch_datetime
@@ -231,33 +474,200 @@ class PageResult:
     url: str
     fields: list[Extraction]
 
+    def entries(self) -> list[dict]:
+        """Group extractions into individual entries.
+
+        For RSS: multiple entries, for HTML/PDF: single entry
+        """
+        entries = []
+        current_entry = {}
+
+        for extraction in self.fields:
+            # If we see a field name we've already seen, start a new entry
+            if extraction.name in current_entry:
+                entries.append(current_entry)
+                current_entry = {}
+            current_entry[extraction.name] = extraction.data
+
+        # Add the last entry
+        if current_entry:
+            entries.append(current_entry)
+        return entries
+
+
+@dataclass
+class CrawlTask:
+    """One unit of crawl work: a navigation page, a URL to extract, or a
+    range of pages of a split PDF (pages and path)."""
+
+    job: Job
+    url: str
+    step: int | None = None
+    nav: Nav | None = None
+    pages: list[int] | None = None
+    path: str | None = None
+    # For documents several jobs fetch (see Navigate.claim): a body to parse
+    # instead of downloading, or whether to hand the downloaded body back
+    body: Document | None = None
+    share: bool = False
+    # Retries are queued again as the next attempt (see RetryLater)
+    attempt: int = 1
+
+
+@dataclass
+class PdfSplit:
+    """A large PDF saved to disk, to be extracted by several workers in chunks."""
+
+    url: str
+    path: str
+    chunks: list[list[int]]
+
+
+@dataclass
+class PdfParts:
+    """Pages of a split PDF collected so far."""
+
+    path: str
+    remaining: int
+    pages: list[tuple[int, str]] = field(default_factory=list)
+
+
+@dataclass
+class StepStop:
+    """Whether a navigation step may stop fetching pages, judged page by page
+    in order: with max_items_scope: step once max_items distinct URLs were
+    found, with stop_when_seen at the first page whose URLs were mostly
+    fetched on earlier runs (mostly_fetched)."""
+
+    max_items: int | None = None
+    mostly_fetched: Callable[[list[str]], bool] | None = None
+    # What makes two URLs the same (Navigate.url_key)
+    key: Callable[[str], str] | None = None
+    # Pages judged so far: results[:pages]
+    pages: int = 0
+    seen: set[str] = field(default_factory=set)
+    stopped: bool = False
+
+    def update(self, results: list) -> bool:
+        """Judge pages finished in order (None is a page still running);
+        True once the step should stop."""
+        while not self.stopped and self.pages < len(results):
+            urls = results[self.pages]
+            if urls is None:
+                break
+            self.pages += 1
+            if isinstance(urls, NotModified):
+                continue
+            self.seen.update(map(self.key, urls) if self.key else urls)
+            if self.max_items and len(self.seen) >= self.max_items:
+                self.stopped = True
+            elif self.mostly_fetched is not None and self.mostly_fetched(urls):
+                self.stopped = True
+        return self.stopped
+
+
+def step_cap(nav: Nav) -> int | None:
+    """max_items of a navigation step capped across all its pages, or None."""
+    if nav.max_items and nav.max_items_scope == "step":
+        return nav.max_items
+    return None
+
+
+def crawl_task(item: "CrawlTask | aio.FetchTask") -> CrawlTask:
+    """The CrawlTask behind a scheduled item; the async engine queues FetchTasks."""
+    return item.context if isinstance(item, aio.FetchTask) else item
+
+
+@dataclass
+class JobProgress:
+    """Per-job bookkeeping while the scheduler runs all jobs together."""
+
+    step_urls: list[int]
+    page_results: list[PageResult] = field(default_factory=list)
+    extract_count: int = 0
+    not_modified: bool = False
+    # Set with raw_format: jsonl; page results are written instead of kept
+    writer: "ResultWriter | None" = None
+    # URLs already found by each navigation step, so repeats are queued once
+    seen: dict[int, set[str]] = field(default_factory=lambda: defaultdict(set))
+    # URLs queued by each step with max_items_scope: step
+    kept: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    # Navigation steps whose remaining pages were cancelled
+    stopped: set[int] = field(default_factory=set)
+
+    def add(self, page_result: PageResult) -> None:
+        if self.writer is not None:
+            self.writer.write(page_result)
+        else:
+            self.page_results.append(page_result)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_results) + (self.writer.count if self.writer else 0)
+
+
+class ResultWriter:
+    """Appends a job's page results to a raw JSON Lines file as they arrive.
+
+    The file is only created (replacing an earlier run of the same day) once
+    there is something to write, or when the job finishes.
+    """
+
+    def __init__(self, source_name: str):
+        self.source_name = source_name
+        self.extraction_date = datetime.now()
+        self.path: Path | None = None
+        self.file = None
+        self.count = 0
+
+    def open(self) -> None:
+        self.path = DataManager().jsonl_path(self.source_name, layer="raw")
+        self.file = open(self.path, "w", encoding="utf-8")
+        header = {
+            "source": self.source_name,
+            "extraction_date": self.extraction_date.isoformat(),
+        }
+        self.file.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+    def write(self, page_result: PageResult) -> None:
+        if self.file is None:
+            self.open()
+        record = {"url": page_result.url, "entries": page_result.entries()}
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # Flushed per page so a crashed run keeps what it extracted
+        self.file.flush()
+        self.count += 1
+
+    def close(self) -> Path:
+        """Close the file, creating it if nothing was written."""
+        if self.file is None:
+            self.open()
+        self.file.close()
+        return self.path
+
+    def abort(self) -> None:
+        """Close the file of a run that failed, if it is still open.
+
+        The pages already written are kept: they are tracked as fetched, so
+        the next run would not extract them again.
+        """
+        if self.file is not None and not self.file.closed:
+            self.file.close()
+
 
 @dataclass
 class SourceResult:
     source_name: str
     results: list[PageResult]
     extraction_date: datetime
+    # Set when the page results were streamed to this file during the run
+    path: Path | None = None
+    streamed: int = 0
 
     def to_json(self) -> dict:
         result_dict = {}
         for page_result in self.results:
-            # Group extractions into individual entries
-            # For RSS: multiple entries, for HTML/PDF: single entry
-            entries = []
-            current_entry = {}
-
-            for extraction in page_result.fields:
-                # If we see a field name we've already seen, start a new entry
-                if extraction.name in current_entry:
-                    entries.append(current_entry)
-                    current_entry = {}
-                current_entry[extraction.name] = extraction.data
-
-            # Add the last entry
-            if current_entry:
-                entries.append(current_entry)
-
-            result_dict[page_result.url] = entries
+            result_dict[page_result.url] = page_result.entries()
 
         return {
             "source": self.source_name,
@@ -266,6 +676,9 @@ class SourceResult:
         }
 
     def save(self) -> None:
+        if self.path is not None:
+            logger.info(f"Raw data for {self.source_name} was streamed to {self.path}")
+            return
         dm = DataManager()  # Uses today's date
         logger.info(f"Saving raw data for {self.source_name}")
         logger.info(f"Number of page results: {len(self.results)}")
@@ -275,34 +688,130 @@ class SourceResult:
 
 class Navigate:
 
-    def __init__(self, path: str, source_name: str | None = None):
-        self.jobs: list[Job] = Source(path, source_name=source_name).gen_jobs()
+    def __init__(
+        self,
+        path: str,
+        source_name: str | None = None,
+        engine: str | None = None,
+        executor: ProcessPoolExecutor | None = None,
+        from_cache: bool = False,
+    ):
+        source = Source(path, source_name=source_name)
+        self.jobs: list[Job] = source.gen_jobs()
+        self.settings: Settings = source.gen_settings()
+        if engine:
+            self.settings.engine = engine
+        if from_cache:
+            self.settings.cache.offline = True
+        # The async engine fetches in this process, so it needs these too
+        configure_cache(self.settings.cache)
+        configure_retry(self.settings.retry)
+        configure_size_limits(self.settings.http.max_size_mb)
+        if self.settings.engine == "async":
+            aio.require_aiohttp()
+        fast_html.require_css(self.jobs)
+        for job in self.jobs:
+            if job.conditional_get is None:
+                job.conditional_get = self.settings.http.conditional_get
+            # Only the start page or feed is revalidated; a 304 there skips the job
+            if job.conditional_get and job.nav:
+                job.nav[0].conditional = True
+            for nav in job.nav:
+                nav.cache_ttl = job.cache_ttl
+                nav.retry = job.retry
+        # Start pages and feeds that several jobs fetch are downloaded once per run
+        keys = (self.document_key(self.first_task(job)) for job in self.jobs)
+        self.shared = SharedDocuments(Counter(key for key in keys if key is not None))
+        self.executor: ProcessPoolExecutor | None = executor
+        # Shared by navigation and extraction so host limits hold for the whole run
+        self.limiter = HostLimiter()
+        # Retried requests per job, reported in the run summary
+        self.retries: Counter = Counter()
+        # Validators of each job's conditional fetches and its failed
+        # requests, until save_validators() runs at the end of the job
+        self.validators: defaultdict[str, list] = defaultdict(list)
+        self.failures: Counter = Counter()
+        # Set by the Dispatcher when tracking is on, for stop_when_seen
+        self.tracker: RunTracker | None = None
+
+    def __getstate__(self) -> dict:
+        # Bound methods are pickled with their instance on every submit; workers
+        # only need the settings, never the jobs, the pool or the limiter.
+        return {
+            "settings": self.settings,
+            "jobs": [],
+            "executor": None,
+            "limiter": None,
+            "retries": None,
+            "validators": None,
+            "failures": None,
+            "shared": None,
+            "tracker": None,
+        }
+
+    def new_executor(self) -> ProcessPoolExecutor:
+        """Create a worker pool whose processes share a pooled HTTP session.
+
+        With the async engine the pool only parses, so it is kept small.
+        """
+        if self.settings.engine == "async":
+            max_workers = self.settings.aio.parse_workers
+        else:
+            max_workers = self.settings.workers
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=init_worker,
+            initargs=(self.settings.http, self.settings.cache, self.settings.retry),
+        )
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        """Return the run's worker pool, starting it on first use."""
+        if self.executor is None:
+            self.executor = self.new_executor()
+        return self.executor
+
+    def shutdown(self) -> None:
+        """Shut down the worker pool, if one is running."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
 
     def start(self):
-        for job in self.jobs:
-            if not job.nav:
-                job.urls = [job.start]
-                continue
+        # A pool handed in by the caller (e.g. the Dispatcher) outlives navigation
+        owns_executor = self.executor is None
+        try:
+            for job in self.jobs:
+                if not job.nav:
+                    job.urls = [job.start]
+                    continue
 
-            current_navs = [job.nav[0]]
+                current_navs = [job.nav[0]]
 
-            for step_index in range(len(job.nav)):
-                is_final = step_index == len(job.nav) - 1
-                current_navs = self.process_navigation_step(
-                    job, current_navs, step_index, is_final
-                )
+                for step_index in range(len(job.nav)):
+                    is_final = step_index == len(job.nav) - 1
+                    current_navs = self.process_navigation_step(
+                        job, current_navs, step_index, is_final
+                    )
+        finally:
+            if owns_executor:
+                self.shutdown()
 
     def process_navigation_step(
         self, job: Job, current_navs: list[Nav], step_index: int, is_final: bool
     ) -> list[Nav]:
 
-        all_urls = self.navigate_all(current_navs)
+        all_urls = self.navigate_all(current_navs, job)
+        if isinstance(all_urls, NotModified):
+            logger.info(f"Start page unchanged since last run, skipping job {job.name}")
+            return []
         if not all_urls:
             logger.warning(
                 f"No URLs found during navigation step {step_index + 1} for job {job.name}: {job.nav[step_index]}"
             )
             return []
 
+        # Listing pages often link the same page; queue it once
+        all_urls = dedupe(all_urls, key=self.url_key)
         if is_final:
             if job.urls is None:
                 job.urls = []
@@ -311,17 +820,222 @@ class Navigate:
         else:
             return self.build_next_navs(all_urls, job.nav[step_index + 1])
 
-    def navigate_all(self, navs: list[Nav]) -> list[str]:
-        all_urls = []
+    def navigate_all(self, navs: list[Nav], job: Job | None = None) -> list[str]:
+        """URLs found on all pages of a navigation step, in page order.
+
+        With max_items_scope: step the step stops once the pages so far,
+        taken in order, have yielded max_items URLs, and with stop_when_seen
+        after the first page whose URLs were mostly fetched on earlier runs:
+        queued pages are dropped and pages not yet started are cancelled.
+        """
+        tasks = [CrawlTask(job=job, url=nav.url, nav=nav) for nav in navs]
+        # Results by page position; None until the page is done (or if cancelled)
+        results: list = [None] * len(tasks)
+        positions = {id(task): position for position, task in enumerate(tasks)}
+        stop = self.step_stop(job, navs[0]) if navs else None
+
+        scheduler = Scheduler(self.limiter)
+        limit = self.rate_limit_for(job)
+        name = job.name if job is not None else "navigate"
+
+        def push(task: CrawlTask, not_before: float | None = None) -> None:
+            item = self.fetch_task(task) if self.settings.engine == "async" else task
+            scheduler.push(
+                item, key="navigate", url=task.url, limit=limit, not_before=not_before
+            )
+
+        for task in tasks:
+            if self.claim(task):
+                push(task)
+
+        def on_result(task, urls, retries, body=None, validators=()):
+            self.record(name, urls, retries, validators)
+            if isinstance(urls, RetryLater):
+                task.attempt += 1
+                push(task, time.monotonic() + urls.delay)
+                return
+            results[positions[id(task)]] = urls if urls is not None else []
+            for waiting in self.release(task, body):
+                if self.claim(waiting):
+                    push(waiting)
+            if stop is not None and not stop.stopped and stop.update(results):
+                logger.info(f"Skipping the remaining pages of this navigation step for {name}")
+                # A sharing task still has to deliver its body to other jobs
+                scheduler.cancel(lambda item: not crawl_task(item).share)
+
+        if self.settings.engine == "async":
+            aio.crawl(
+                scheduler,
+                self.get_executor(),
+                on_result=lambda fetch_task, urls: on_result(
+                    fetch_task.context,
+                    urls,
+                    fetch_task.retries,
+                    fetch_task.body,
+                    fetch_task.validators,
+                ),
+                concurrency=self.settings.aio.concurrency,
+                max_per_host=self.settings.http.max_per_host,
+                timeout=self.settings.http.timeout,
+            )
+        else:
+            run_scheduled(
+                scheduler,
+                self.get_executor(),
+                self.run_nav,
+                on_result=lambda task, outcome: on_result(task, *outcome),
+                max_in_flight=self.settings.workers * 2,
+            )
+
+        if stop is not None and stop.stopped:
+            # Pages that were already running when the step stopped are cut off
+            results = results[: stop.pages]
+        results = [urls for urls in results if urls is not None]
+        # Every page answered 304: the caller skips this navigation entirely
+        if results and all(isinstance(urls, NotModified) for urls in results):
+            return NotModified()
+        urls = [url for urls in results if not isinstance(urls, NotModified) for url in urls]
+        if stop is not None and stop.max_items:
+            return dedupe(urls, key=self.url_key)[: stop.max_items]
+        return urls
+
+    def record(self, name: str, result, retries: int, validators: list) -> None:
+        """Account a finished task to its job; None is a failed request."""
+        self.retries[name] += retries
+        self.validators[name].extend(validators)
+        if result is None:
+            self.failures[name] += 1
+
+    def save_validators(self, job: Job) -> None:
+        """Store the validators of a job's conditional fetches.
+
+        Called once the job's results are recorded. If any of its requests
+        failed they are dropped, so the next run fetches the start page again
+        instead of skipping the job on a 304.
+        """
+        validators = self.validators.pop(job.name, [])
+        failures = self.failures.pop(job.name, 0)
+        if not validators:
+            return
+        if failures:
+            logger.warning(
+                f"{failures} requests failed for job {job.name}, not saving its validators"
+            )
+            return
+        store = ValidatorStore()
+        for url, etag, last_modified in validators:
+            store.save(url, etag, last_modified)
+
+    def step_stop(self, job: Job | None, nav: Nav) -> StepStop | None:
+        """When the navigation step of nav may stop early, or None if it can't."""
+        mostly_fetched = None
+        if nav.stop_when_seen and job is not None:
+            mostly_fetched = partial(self.mostly_fetched, job, nav)
+        max_items = step_cap(nav)
+        if max_items is None and mostly_fetched is None:
+            return None
+        return StepStop(max_items=max_items, mostly_fetched=mostly_fetched, key=self.url_key)
+
+    def mostly_fetched(self, job: Job, nav: Nav, urls: list[str]) -> bool:
+        """Whether enough of a page's URLs were fetched on earlier runs to end
+        its step (stop_when_seen). Never true without tracking."""
+        if self.tracker is None or job.no_track:
+            return False
+        urls = dedupe(urls, key=self.url_key)
+        if not urls:
+            return False
+        unfetched = self.tracker.filter_unfetched_urls(urls, job.name, key=self.url_key)
+        fetched = len(urls) - len(unfetched)
+        return fetched >= nav.stop_when_seen * len(urls)
+
+    def fetch_task(self, task: CrawlTask) -> aio.FetchTask:
+        """Describe a navigation page for the async engine."""
+        nav = task.nav
+        # Mixed pages are sniffed and shared ones parsed as Documents by parse_nav
+        raw = nav.ftype == "mixed" or task.share
+        return aio.FetchTask(
+            url=nav.url,
+            parse=self.parse_nav,
+            args=(nav,),
+            text=nav.ftype == "html",
+            conditional=nav.conditional,
+            ttl=nav.cache_ttl,
+            retry=nav.retry,
+            max_bytes=max_size_limit() if nav.ftype == "mixed" else size_limit(nav.ftype),
+            context=task,
+            body=task.body,
+            keep_body=task.share,
+            raw=raw,
+            attempt=task.attempt,
+        )
+
+    def first_task(self, job: Job) -> CrawlTask:
+        """The task that fetches a job's start page or feed."""
+        if job.nav:
+            return CrawlTask(job=job, url=job.start, step=0, nav=job.nav[0])
+        return CrawlTask(job=job, url=job.start)
 
-        with ProcessPoolExecutor(max_workers=10) as executor:
-            future_to_nav = {executor.submit(self.navigate, nav): nav for nav in navs}
+    def document_key(self, task: CrawlTask) -> str | None:
+        """Key (the URL) under which a task's download can be shared, or None.
 
-            for future in as_completed(future_to_nav):
-                urls = future.result()
-                all_urls.extend(urls)
+        Conditional GETs depend on each job's validators, PDFs are too large
+        to keep in memory, and streamed HTML extraction never reads the whole
+        body, so none of them is shared. Jobs reading the document as
+        different ftypes share it, each gets the form it parses.
+        """
+        if task.nav is not None:
+            if task.nav.conditional:
+                return None
+            ftype = task.nav.ftype
+        else:
+            job = task.job
+            if task.pages is not None or (
+                job.conditional_get and not job.nav and task.url == job.start
+            ):
+                return None
+            ftype = job.extract_ftype
+            if ftype == "html" and job.stream_extract:
+                return None
+        if ftype == "pdf":
+            return None
+        return task.url
+
+    def claim(self, task: CrawlTask) -> bool:
+        """Prepare a task whose document other jobs also fetch.
+
+        The first such task downloads it for everyone (share), later ones get
+        the body. Returns False if the task has to wait for a download in
+        flight; release() hands it back once the body is in.
+        """
+        key = self.document_key(task)
+        if key is None:
+            return True
+        state, body = self.shared.request(key, task)
+        if state == WAIT:
+            return False
+        task.body = body
+        task.share = state == FETCH
+        return True
+
+    def release(self, task: CrawlTask, body: Document | None) -> list[CrawlTask]:
+        """Store the body a sharing task downloaded; returns the tasks waiting for it."""
+        if not task.share:
+            return []
+        return self.shared.complete(self.document_key(task), body)
+
+    def fetch_document(self, task: CrawlTask) -> Document | None:
+        """Download a shared document, under the size cap of the task's ftype."""
+        if task.nav is not None:
+            options, ftype = task.nav, task.nav.ftype
+        else:
+            options, ftype = task.job, task.job.extract_ftype
+        return fetch_document(task.url, ttl=options.cache_ttl, retry=options.retry, ftype=ftype)
 
-        return all_urls
+    def rate_limit_for(self, job: Job | None) -> RateLimit | None:
+        """Per-host rate limit for a job's requests, falling back to the run default."""
+        if job is not None and job.rate_limit is not None:
+            return job.rate_limit
+        return self.settings.rate_limit
 
     def build_next_navs(self, urls: list[str], template: Nav) -> list[Nav]:
         return [
@@ -331,6 +1045,12 @@ class Navigate:
                 ftype=template.ftype,
                 must_contain=template.must_contain,
                 must_contain_all=template.must_contain_all,
+                max_items=template.max_items,
+                max_items_scope=template.max_items_scope,
+                stop_when_seen=template.stop_when_seen,
+                engine=template.engine,
+                cache_ttl=template.cache_ttl,
+                retry=template.retry,
             )
             for url in urls
         ]
@@ -357,29 +1077,98 @@ class Navigate:
 
         return filtered_urls
 
-    def navigate(self, nav: Nav) -> list[str]:
+    def run_nav(self, task: CrawlTask) -> tuple[list[str] | None, int, Document | None, list]:
+        """Worker entry point: navigate and report how many requests were retried.
 
-        if nav.ftype == "mixed":
-            nav.ftype = self.auto_ftype(nav.url)
+        A shared document is parsed from task.body, or downloaded and also
+        returned so other jobs can reuse it (see claim()). The validators of
+        a conditional fetch are returned for the caller to save. The URLs
+        are None if the page could not be fetched, or a RetryLater if the
+        caller should schedule another attempt.
+        """
+        take_retry_count()
+        take_validators()
+        body = None
+        with scheduled_attempt(task.attempt):
+            try:
+                if task.body is not None:
+                    urls = self.parse_nav(task.nav, task.body)
+                elif task.share:
+                    body = self.fetch_document(task)
+                    urls = self.parse_nav(task.nav, body) if body else None
+                else:
+                    urls = self.navigate(task.nav)
+            except RetryLater as retry:
+                urls = retry
+        return urls, take_retry_count(), body, take_validators()
 
-        if nav.ftype == "rss":
-            doc = visit_rss(url=nav.url)
-            selector = self.select_rss
+    def navigate(self, nav: Nav) -> list[str] | None:
+
+        if nav.ftype == "mixed":
+            # One request: the type is sniffed from the response
+            doc = fetch_document(
+                url=nav.url, conditional=nav.conditional, ttl=nav.cache_ttl, retry=nav.retry
+            )
+            if isinstance(doc, Document):
+                return self.parse_nav(nav, doc)
+        elif nav.ftype == "rss":
+            doc = visit_rss(
+                url=nav.url,
+                conditional=nav.conditional,
+                ttl=nav.cache_ttl,
+                retry=nav.retry,
+                parser=self.settings.feed_parser,
+                fields=[nav.selector],
+            )
         elif nav.ftype == "html":
-            doc = visit_html(url=nav.url)
-            selector = self.select_html
+            doc = visit_html(
+                url=nav.url, conditional=nav.conditional, ttl=nav.cache_ttl, retry=nav.retry
+            )
         elif nav.ftype == "json":
-            doc = visit_html(url=nav.url, text=False)
-            selector = self.select_json
+            doc = visit_html(
+                url=nav.url,
+                text=False,
+                conditional=nav.conditional,
+                ttl=nav.cache_ttl,
+                retry=nav.retry,
+                ftype="json",
+            )
         else:
             raise Exception(f"Unsupported navigation ftype: {nav.ftype}")
 
+        if doc is None or isinstance(doc, NotModified):
+            return doc
+        return self.select_urls(nav, doc)
+
+    def parse_nav(self, nav: Nav, body: str | bytes | Document) -> list[str]:
+        """Select URLs from an already downloaded navigation page."""
+        if isinstance(body, Document):
+            opened = body.as_ftype(nav.ftype, nav.url)
+            if opened is None:
+                return []
+            nav.ftype, body = opened
+        if nav.ftype == "rss":
+            body = parse_rss(
+                body, url=nav.url, parser=self.settings.feed_parser, fields=[nav.selector]
+            )
+        return self.select_urls(nav, body)
+
+    def select_urls(self, nav: Nav, doc) -> list[str]:
         if not doc:
             return []
 
-        relative_urls = self.filter_urls(selector(doc, nav.selector), nav)
+        if nav.ftype == "rss":
+            selected = self.select_rss(doc, nav.selector)
+        elif nav.ftype == "html":
+            selected = self.select_html(doc, nav)
+        elif nav.ftype == "json":
+            selected = self.select_json(doc, nav.selector)
+        else:
+            raise Exception(f"Unsupported navigation ftype: {nav.ftype}")
+
+        relative_urls = self.filter_urls(selected, nav)
 
-        # Apply max_items limit if specified
+        # Apply max_items limit if specified (a page never needs more than its step)
         if nav.max_items and len(relative_urls) > nav.max_items:
             logger.info(f"Limiting navigation results from {len(relative_urls)} to {nav.max_items} items")
             relative_urls = relative_urls[:nav.max_items]
@@ -388,19 +1177,31 @@ class Navigate:
         for url in relative_urls:
             if not isinstance(url, str):
                 logger.error(
-                    f"The navigation xpath did not return a string, make sure you are selecting the actual url e.g. /@href. "
+                    f"The navigation selector did not return a string, make sure you are selecting the actual url "
+                    f"e.g. /@href (XPath) or ::attr(href) (CSS). "
                     f"Got type {type(url).__name__} for selector '{nav.selector}' at {nav.url}"
                 )
                 continue
-            result_urls.append(urljoin(nav.url, quote(url, safe="/:?#[]@!$&'()*+,;=")))
+            absolute = urljoin(nav.url, quote(url, safe="/:?#[]@!$&'()*+,;="))
+            result_urls.append(absolute)
 
         return result_urls
 
-    def select_html(self, doc: str, selector: str) -> list:
+    def url_key(self, url: str) -> str:
+        """Form a URL is deduplicated and tracked under: canonical if enabled.
+
+        The URL itself is what gets fetched, so a canonical form that serves
+        another resource never replaces a working link.
+        """
+        return canonicalize(url, self.settings.urls)
+
+    def select_html(self, doc: str, nav: Nav) -> list:
+        if nav.engine == "css" and fast_html.available():
+            return fast_html.select(fast_html.parse(doc), nav.selector)
+
         tree = lxml_html.fromstring(doc)
-        selectors = selector.split("|")
-        for sel in selectors:
-            result = tree.xpath(sel)
+        for xpath in nav.xpaths:
+            result = xpath(tree)
             if result:
                 return result
         return []
@@ -443,93 +1244,464 @@ class Navigate:
         else:
             return [result] if result else []
 
-    def auto_ftype(self, url: str) -> str:
-        if url.endswith(".rss") or url.endswith(".xml"):
-            return "rss"
-        elif url.endswith(".pdf"):
-            return "pdf"
-        elif url.endswith(".json"):
-            return "json"
-        else:
-            return "html"
-
 
 class Dispatcher:
 
     def __init__(
-        self, path: str, source_name: str | None = None, no_track: bool = False
+        self,
+        path: str,
+        source_name: str | None = None,
+        no_track: bool = False,
+        engine: str | None = None,
+        from_cache: bool = False,
     ):
-        self.navigate = Navigate(path, source_name=source_name)
-        self.navigate.start()
+        self.navigate = Navigate(
+            path, source_name=source_name, engine=engine, from_cache=from_cache
+        )
+        # One pool serves every navigation step and extract batch of the run
+        self.navigate.executor = self.navigate.new_executor()
         self.results: list[SourceResult] = []
-        self.run_tracker = RunTracker()
+        # Run state of execute_jobs, by job name (names are unique, see gen_jobs)
+        self.scheduler = Scheduler(self.navigate.limiter)
+        self.progress: dict[str, JobProgress] = {}
+        # Split PDFs by (job name, url) until all their chunks are extracted
+        self.pdf_parts: dict[tuple[str, str], PdfParts] = {}
+        tracking = self.navigate.settings.tracking
+        self.run_tracker = RunTracker(
+            prefilter=tracking.prefilter, error_rate=tracking.error_rate
+        )
         self.no_track = no_track
+        if not no_track:
+            self.navigate.tracker = self.run_tracker
+        # In stream mode navigation runs inside execute_jobs, interleaved with extraction
+        if self.navigate.settings.crawl != "stream":
+            try:
+                self.navigate.start()
+            except BaseException:
+                # execute_jobs won't run to close them
+                self.close()
+                raise
+
+    def __getstate__(self) -> dict:
+        return {"navigate": self.navigate, "no_track": self.no_track}
 
     def execute_jobs(self):
+        try:
+            self._execute_jobs()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Shut down the run's worker pool and write out buffered tracking.
+
+        Also cleans up after a run that failed: split PDFs are deleted and
+        result files still open are closed.
+        """
+        self.remove_pdf_files()
+        for progress in self.progress.values():
+            if progress.writer is not None:
+                progress.writer.abort()
+        self.navigate.shutdown()
+        self.run_tracker.close()
+
+    def _execute_jobs(self):
+        stream = self.navigate.settings.crawl == "stream"
+
+        # Queue the work of every job up front; the scheduler interleaves them
         for job in self.navigate.jobs:
             logger.info(f"Processing job: {job.name}")
+            self.progress[job.name] = JobProgress(step_urls=[0] * len(job.nav))
+            if self.navigate.settings.raw_format == "jsonl":
+                self.progress[job.name].writer = ResultWriter(job.name)
+            if stream:
+                job.urls = []
+                tasks = self.initial_tasks(job)
+            else:
+                tasks = self.batch_tasks(job)
+            for task in tasks:
+                self.schedule(task)
+
+        try:
+            self.crawl()
+        finally:
+            self.remove_pdf_files()
 
-            if not job.urls:
-                logger.warning(f"No URLs found for job: {job.name}")
+        for job in self.navigate.jobs:
+            progress = self.progress[job.name]
+            if progress.not_modified and not progress.page_count:
+                logger.info(f"Start page unchanged since last run, skipping job {job.name}")
+                continue
+            if stream:
+                self.warn_empty_steps(job, progress)
+                if not job.urls:
+                    logger.warning(f"No URLs found for job: {job.name}")
+                    continue
+                if not progress.extract_count:
+                    logger.warning(f"All URLs already fetched for job: {job.name}")
+                    continue
+            elif not progress.extract_count:
                 continue
 
-            # Filter out URLs that have already been fetched by this source (unless no_track is enabled)
-            # Job-level no_track overrides dispatcher-level no_track
-            should_skip_tracking = self.no_track or getattr(job, 'no_track', False)
+            logger.info(f"Collected {progress.page_count} page results for {job.name}")
+            self.results.append(self.source_result(job, progress))
 
-            if should_skip_tracking:
-                unfetched_urls = job.urls
-            else:
-                unfetched_urls = self.run_tracker.filter_unfetched_urls(
-                    job.urls, job.name
+        for job in self.navigate.jobs:
+            self.navigate.save_validators(job)
+        self.log_summary()
+
+    def source_result(self, job: Job, progress: JobProgress) -> SourceResult:
+        writer = progress.writer
+        if writer is None:
+            return SourceResult(
+                source_name=job.name,
+                results=progress.page_results,
+                extraction_date=datetime.now(),
+            )
+        return SourceResult(
+            source_name=job.name,
+            results=[],
+            extraction_date=writer.extraction_date,
+            path=writer.close(),
+            streamed=writer.count,
+        )
+
+    def log_summary(self) -> None:
+        pages = sum(len(result.results) + result.streamed for result in self.results)
+        retries = self.navigate.retries
+        logger.info(
+            f"Run summary: {pages} page results from {len(self.results)} sources, "
+            f"{sum(retries.values())} retried requests"
+        )
+        for name, count in retries.items():
+            if count:
+                logger.info(f"  {name}: {count} retried requests")
+
+    def batch_tasks(self, job: Job) -> list[CrawlTask]:
+        """Extraction tasks for a job whose navigation has already run."""
+        if not job.urls:
+            logger.warning(f"No URLs found for job: {job.name}")
+            return []
+
+        # Filter out URLs that have already been fetched by this source (unless no_track is enabled)
+        # Job-level no_track overrides dispatcher-level no_track
+        if self.should_skip_tracking(job):
+            unfetched_urls = job.urls
+        else:
+            unfetched_urls = self.run_tracker.filter_unfetched_urls(
+                job.urls, job.name, key=self.navigate.url_key
+            )
+
+            # Skip if all URLs have already been fetched by this source
+            if not unfetched_urls:
+                logger.warning(f"All URLs already fetched for job: {job.name}")
+                return []
+
+        logger.info(f"Fetching {len(unfetched_urls)} URLs for {job.name}")
+        self.progress[job.name].extract_count = len(unfetched_urls)
+        return [CrawlTask(job=job, url=url) for url in unfetched_urls]
+
+    def is_conditional(self, job: Job, url: str) -> bool:
+        """Whether to send a conditional GET: only for the start URL of a job without navigation."""
+        return bool(job.conditional_get) and not job.nav and url == job.start
+
+    def should_skip_tracking(self, job: Job) -> bool:
+        return self.no_track or getattr(job, 'no_track', False)
+
+    def warn_empty_steps(self, job: Job, progress: "JobProgress") -> None:
+        for step_index, count in enumerate(progress.step_urls):
+            if not count:
+                logger.warning(
+                    f"No URLs found during navigation step {step_index + 1} for job {job.name}: {job.nav[step_index]}"
                 )
+                break
+
+    def initial_tasks(self, job: Job) -> list[CrawlTask]:
+        if not job.nav:
+            return self.extract_tasks(job, [job.start])
+        return [CrawlTask(job=job, url=job.start, step=0, nav=job.nav[0])]
+
+    def extract_tasks(self, job: Job, urls: list[str]) -> list[CrawlTask]:
+        job.urls.extend(urls)
+        if not self.should_skip_tracking(job):
+            urls = self.run_tracker.filter_unfetched_urls(
+                urls, job.name, key=self.navigate.url_key
+            )
+        self.progress[job.name].extract_count += len(urls)
+        return [CrawlTask(job=job, url=url) for url in urls]
+
+    def expand(self, task: CrawlTask, result) -> list[CrawlTask]:
+        """Handle a finished task and return the work it unlocks."""
+        job = task.job
+        progress = self.progress[job.name]
+        if isinstance(result, NotModified):
+            progress.not_modified = True
+            return []
+        if isinstance(result, PdfSplit):
+            return self.pdf_chunk_tasks(task, result)
+        if task.pages is not None:
+            result = self.join_pdf_chunk(task, result)
+        if task.nav is None:
+            if result:
+                progress.add(result)
+                # Mark this URL as fetched (unless no_track is enabled)
+                if not self.should_skip_tracking(job):
+                    self.run_tracker.add_url(self.navigate.url_key(result.url), job.name)
+            return []
 
-                # Skip if all URLs have already been fetched by this source
-                if not unfetched_urls:
-                    logger.warning(f"All URLs already fetched for job: {job.name}")
-                    continue
+        if not result:
+            return []
+        step, nav = task.step, job.nav[task.step]
+        progress.step_urls[step] += len(result)
+        if nav.stop_when_seen and self.navigate.mostly_fetched(job, nav, result):
+            self.stop_step(job, step, "a page's URLs were already fetched")
+        result = dedupe(result, progress.seen[step], key=self.navigate.url_key)
+        cap = step_cap(nav)
+        if cap:
+            result = result[: cap - progress.kept[step]]
+            progress.kept[step] += len(result)
+            if progress.kept[step] == cap:
+                self.stop_step(job, step, f"found {cap} URLs")
+        if not result:
+            return []
 
-            logger.info(f"Fetching {len(unfetched_urls)} URLs for {job.name}")
-            page_results = []
-            with ProcessPoolExecutor(max_workers=10) as executor:
-                futures = []
-                for url in unfetched_urls:
-
-                    if job.extract_ftype == "mixed":
-                        job.extract_ftype = self.navigate.auto_ftype(url)
-
-                    if job.extract_ftype == "html":
-                        extractor = self.html_extract
-                    elif job.extract_ftype == "rss":
-                        extractor = self.rss_extract
-                    elif job.extract_ftype == "pdf":
-                        extractor = self.pdf_extract
-                    elif job.extract_ftype == "json":
-                        extractor = self.json_extract
+        if task.step == len(job.nav) - 1:
+            return self.extract_tasks(job, result)
+
+        next_navs = self.navigate.build_next_navs(result, job.nav[task.step + 1])
+        return [
+            CrawlTask(job=job, url=nav.url, step=task.step + 1, nav=nav)
+            for nav in next_navs
+        ]
+
+    def stop_step(self, job: Job, step: int, reason: str) -> None:
+        """Stop fetching the pages of a navigation step (max_items_scope: step
+        or stop_when_seen).
+
+        Unlike batch navigation, which judges pages in page order, this acts
+        on pages as they finish, since later pages may finish first.
+        """
+        progress = self.progress[job.name]
+        if step in progress.stopped:
+            return
+        progress.stopped.add(step)
+
+        def in_step(item) -> bool:
+            task = crawl_task(item)
+            # A sharing task still has to deliver its body to other jobs
+            return task.job is job and task.step == step and not task.share
+
+        logger.info(
+            f"Skipping the remaining pages of navigation step {step + 1} for {job.name}: {reason}"
+        )
+        self.scheduler.cancel(in_step)
+
+    def pdf_chunk_tasks(self, task: CrawlTask, split: PdfSplit) -> list[CrawlTask]:
+        self.pdf_parts[(task.job.name, split.url)] = PdfParts(
+            path=split.path, remaining=len(split.chunks)
+        )
+        return [
+            CrawlTask(job=task.job, url=split.url, pages=pages, path=split.path)
+            for pages in split.chunks
+        ]
+
+    def join_pdf_chunk(self, task: CrawlTask, pages: list[tuple[int, str]]) -> PageResult | None:
+        """Collect a chunk's pages; returns the PDF's result once all chunks are in."""
+        key = (task.job.name, task.url)
+        parts = self.pdf_parts[key]
+        parts.pages.extend(pages)
+        parts.remaining -= 1
+        if parts.remaining:
+            return None
+        del self.pdf_parts[key]
+        Path(parts.path).unlink(missing_ok=True)
+        return self.pdf_result(task.job, task.url, sorted(parts.pages))
+
+    def remove_pdf_files(self) -> None:
+        """Delete split PDFs left behind by an interrupted run."""
+        for parts in self.pdf_parts.values():
+            Path(parts.path).unlink(missing_ok=True)
+        self.pdf_parts.clear()
+
+    def schedule(self, task: CrawlTask) -> None:
+        if not self.navigate.claim(task):
+            return  # queued again by on_result once the shared download is in
+        self.push(task)
+
+    def push(self, task: CrawlTask, not_before: float | None = None) -> None:
+        item = task
+        if self.navigate.settings.engine == "async":
+            item = self.fetch_task(task)
+        self.scheduler.push(
+            item,
+            key=task.job.name,
+            priority=task.job.priority,
+            # PDF chunks are read from disk, the host's rate limit doesn't apply
+            url=task.url if task.pages is None else None,
+            limit=self.navigate.rate_limit_for(task.job),
+            not_before=not_before,
+        )
+
+    def retry_later(self, task: CrawlTask, retry: RetryLater) -> None:
+        """Queue a task's next attempt once its backoff is over.
+
+        Like any other request it then waits for its host's rate limit,
+        and no worker is blocked during the backoff.
+        """
+        task.attempt += 1
+        self.push(task, not_before=time.monotonic() + retry.delay)
+
+    def on_result(
+        self,
+        task: CrawlTask,
+        result,
+        retries: int = 0,
+        body: Document | None = None,
+        validators: list = (),
+    ) -> None:
+        self.navigate.record(task.job.name, result, retries, validators)
+        if isinstance(result, RetryLater):
+            self.retry_later(task, result)
+            return
+        for waiting in self.navigate.release(task, body):
+            self.schedule(waiting)
+        for new_task in self.expand(task, result):
+            self.schedule(new_task)
+
+    def crawl(self) -> None:
+        """Run scheduled tasks from all jobs until no follow-up work is left."""
+        settings = self.navigate.settings
+        if settings.engine == "async":
+            aio.crawl(
+                self.scheduler,
+                self.navigate.get_executor(),
+                on_result=lambda fetch_task, result: self.on_result(
+                    fetch_task.context,
+                    result,
+                    fetch_task.retries,
+                    fetch_task.body,
+                    fetch_task.validators,
+                ),
+                concurrency=settings.aio.concurrency,
+                max_per_host=settings.http.max_per_host,
+                timeout=settings.http.timeout,
+            )
+            return
+
+        # Keep a few tasks queued per worker so none idles between results,
+        # while everything else waits in the scheduler where fairness applies
+        run_scheduled(
+            self.scheduler,
+            self.navigate.get_executor(),
+            self.run_task,
+            on_result=lambda task, outcome: self.on_result(task, *outcome),
+            max_in_flight=settings.workers * 2,
+        )
+
+    def run_task(self, task: CrawlTask) -> tuple:
+        """Worker entry point for the process engine.
+
+        Returns the task's result, the number of requests it retried, for a
+        task that downloads a shared document its body, and the validators
+        of a conditional fetch. The result is a RetryLater if the task's
+        request should be tried again (see retry_later).
+        """
+        if task.nav is not None:
+            return self.navigate.run_nav(task)
+        take_retry_count()
+        take_validators()
+        body = None
+        with scheduled_attempt(task.attempt):
+            try:
+                if task.pages is not None:
+                    result = self.pdf_extract_pages(task)
+                else:
+                    ftype = self.resolve_ftype(task.job)
+                    if task.body is not None:
+                        result = self.parse_body(task.job, task.url, ftype, task.body)
+                    elif task.share:
+                        body = self.navigate.fetch_document(task)
+                        result = (
+                            self.parse_body(task.job, task.url, ftype, body) if body else None
+                        )
                     else:
-                        raise Exception(f"Unsupported job ftype: {job.ftype}")
-
-                    futures.append(executor.submit(extractor, job, url))
-
-                for future in as_completed(futures):
-                    result = future.result()
-                    if result:
-                        page_results.append(result)
-                        # Mark this URL as fetched (unless no_track is enabled)
-                        if not should_skip_tracking:
-                            self.run_tracker.add_url(result.url, job.name)
-
-            logger.info(f"Collected {len(page_results)} page results for {job.name}")
-            self.results.append(
-                SourceResult(
-                    source_name=job.name,
-                    results=page_results,
-                    extraction_date=datetime.now(),
-                )
+                        result = getattr(self, f"{ftype}_extract")(task.job, task.url)
+            except RetryLater as retry:
+                result = retry
+        return result, take_retry_count(), body, take_validators()
+
+    def fetch_task(self, task: CrawlTask) -> aio.FetchTask:
+        """Describe a crawl task for the async engine."""
+        if task.nav is not None:
+            return self.navigate.fetch_task(task)
+        ftype = self.resolve_ftype(task.job)
+        return aio.FetchTask(
+            url=task.url,
+            parse=self.parse_body,
+            args=(task.job, task.url, ftype),
+            text=ftype == "html",
+            conditional=self.is_conditional(task.job, task.url),
+            ttl=task.job.cache_ttl,
+            retry=task.job.retry,
+            max_bytes=max_size_limit() if ftype == "mixed" else size_limit(ftype),
+            context=task,
+            body=task.body,
+            keep_body=task.share,
+            # Mixed pages are sniffed and shared ones parsed as Documents by parse_body
+            raw=ftype == "mixed" or task.share,
+            attempt=task.attempt,
+        )
+
+    def resolve_ftype(self, job: Job) -> str:
+        """The job's extract ftype; "mixed" is resolved per URL from the response."""
+        if job.extract_ftype not in ("html", "rss", "pdf", "json", "mixed"):
+            raise Exception(f"Unsupported job ftype: {job.extract_ftype}")
+        return job.extract_ftype
+
+    def parse_body(
+        self, job: Job, url: str, ftype: str, body: str | bytes | Document
+    ) -> PageResult | None:
+        """Extract fields from an already downloaded body."""
+        if isinstance(body, Document):
+            opened = body.as_ftype(ftype, url)
+            if opened is None:
+                return None
+            ftype, body = opened
+        if ftype == "rss":
+            feed = parse_rss(
+                body,
+                url=url,
+                parser=self.navigate.settings.feed_parser,
+                fields=[field.selector for field in job.extract],
             )
+            return self.rss_parse(job, url, feed)
+        return getattr(self, f"{ftype}_parse")(job, url, body)
+
+    def mixed_extract(self, job: Job, url: str) -> PageResult:
+        """Fetch a page of unknown type once and extract it as what it turns out to be."""
+        doc = fetch_document(
+            url,
+            conditional=self.is_conditional(job, url),
+            ttl=job.cache_ttl,
+            retry=job.retry,
+        )
+        if not isinstance(doc, Document):
+            return doc
+        return self.parse_body(job, url, "mixed", doc)
 
     def rss_extract(self, job: Job, url: str) -> PageResult:
-        rss = visit_rss(url=url)
+        rss = visit_rss(
+            url=url,
+            conditional=self.is_conditional(job, url),
+            ttl=job.cache_ttl,
+            retry=job.retry,
+            parser=self.navigate.settings.feed_parser,
+            fields=[field.selector for field in job.extract],
+        )
+        if isinstance(rss, NotModified):
+            return rss
+        return self.rss_parse(job, url, rss)
+
+    def rss_parse(self, job: Job, url: str, rss) -> PageResult:
         if not rss:
             return None
 
@@ -543,24 +1715,69 @@ class Dispatcher:
         return PageResult(url=url, fields=extractions)
 
     def html_extract(self, job: Job, url: str) -> PageResult:
-        html = visit_html(url=url)
+        # Streaming needs the raw response: cached and conditional fetches
+        # go through visit_html, which has to see the whole body anyway
+        if job.stream_extract and get_cache() is None and not self.is_conditional(job, url):
+            return self.html_stream_extract(job, url)
+        html = visit_html(
+            url=url,
+            conditional=self.is_conditional(job, url),
+            ttl=job.cache_ttl,
+            retry=job.retry,
+        )
+        if isinstance(html, NotModified):
+            return html
+        return self.html_parse(job, url, html)
+
+    def html_stream_extract(self, job: Job, url: str) -> PageResult:
+        """Parse the page while it downloads and stop once every field is found."""
+        response = open_stream(url, retry=job.retry)
+        if response is None:
+            return None
+
+        # Without a charset header let libxml2 detect it from the page's <meta>
+        content_type = response.headers.get("Content-Type", "")
+        encoding = response.encoding if "charset" in content_type.lower() else None
+        extractor = StreamingExtractor(job.extract, encoding=encoding)
+        limit = size_limit("html")
+        received = 0
+        try:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                received += len(chunk)
+                if limit is not None and received > limit:
+                    logger.error(f"Skipping {url}: body exceeds the html size limit")
+                    return None
+                if extractor.feed(chunk):
+                    break
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to fetch {url}: {e}")
+            return None
+        finally:
+            response.close()
+        logger.debug(f"Streamed {received} bytes of {url}")
+
+        values = extractor.close()
+        extractions = [
+            Extraction(name=field.name, data=values[field.name])
+            for field in job.extract
+            if field.name in values
+        ]
+        return PageResult(url=url, fields=extractions)
+
+    def html_parse(self, job: Job, url: str, html: str) -> PageResult:
         if not html:
             return None
 
+        # One parse per page: the fast parser only if it can serve every field
+        if fast_html.available() and all(field.engine == "css" for field in job.extract):
+            return self.html_parse_css(job, url, html)
+
         tree = lxml_html.fromstring(html)
 
         extractions = []
         for field in job.extract:
-            # Warn if selector ends with /text() as it may not capture nested element text
-            if field.selector.rstrip().endswith("/text()"):
-                logger.warning(
-                    f"Extraction selector '{field.selector}' ends with /text() which only captures direct text nodes. "
-                    f"This will miss text in nested elements. Consider removing /text() to capture all text content."
-                )
-
-            selectors = field.selector.split("|")
-            for sel in selectors:
-                data = tree.xpath(sel)
+            for xpath in field.xpaths:
+                data = xpath(tree)
                 if data:
                     value = (
                         data[0] if isinstance(data[0], str) else data[0].text_content()
@@ -570,8 +1787,32 @@ class Dispatcher:
 
         return PageResult(url=url, fields=extractions)
 
+    def html_parse_css(self, job: Job, url: str, html: str) -> PageResult:
+        tree = fast_html.parse(html)
+
+        extractions = []
+        for field in job.extract:
+            data = fast_html.select(tree, field.selector)
+            if data:
+                value = data[0] if isinstance(data[0], str) else fast_html.text(data[0])
+                extractions.append(Extraction(name=field.name, data=value.strip()))
+
+        return PageResult(url=url, fields=extractions)
+
     def json_extract(self, job: Job, url: str) -> PageResult:
-        doc = visit_html(url=url, text=False)
+        doc = visit_html(
+            url=url,
+            text=False,
+            conditional=self.is_conditional(job, url),
+            ttl=job.cache_ttl,
+            retry=job.retry,
+            ftype="json",
+        )
+        if isinstance(doc, NotModified):
+            return doc
+        return self.json_parse(job, url, doc)
+
+    def json_parse(self, job: Job, url: str, doc: bytes) -> PageResult:
         if not doc:
             return None
 
@@ -606,32 +1847,80 @@ class Dispatcher:
         return PageResult(url=url, fields=extractions)
 
     def pdf_extract(self, job: Job, url: str) -> list:
-        # Load PDF from bytes
+        # Cached and conditional fetches need the body in memory; otherwise the
+        # PDF goes to a spooled temp file and pdfium reads it from there
+        if get_cache() is None and not self.is_conditional(job, url):
+            doc = download(url, ftype="pdf", retry=job.retry)
+            if doc is None:
+                return None
+            with doc:
+                return self.pdf_parse(job, url, doc, split=True)
+
         try:
-            doc = visit_html(url=url, text=False)
+            doc = visit_html(
+                url=url,
+                text=False,
+                conditional=self.is_conditional(job, url),
+                ttl=job.cache_ttl,
+                retry=job.retry,
+                ftype="pdf",
+            )
+        except RetryLater:
+            raise
         except Exception as e:
             logger.error(f"Failed to fetch PDF from {url}: {e}, job: {job.name}")
             return None
 
+        if isinstance(doc, NotModified):
+            return doc
+        return self.pdf_parse(job, url, doc, split=True)
+
+    def pdf_parse(
+        self, job: Job, url: str, doc: bytes | BinaryIO, split: bool = False
+    ) -> PageResult | PdfSplit:
+        """Extract the selected pages of a PDF.
+
+        With split (process engine only), documents with more selected pages
+        than settings.pdf.chunk_pages are saved to disk and returned as a
+        PdfSplit, so the pages are extracted by several workers in parallel.
+        """
         if not doc:
             return None
 
-        pdf = pdfium.PdfDocument(BytesIO(doc))
+        # pdfium reads bytes and file objects in place, without another copy
+        pdf = pdfium.PdfDocument(doc)
+        try:
+            indices = select_pages(len(pdf), job.pdf)
+            chunk = self.navigate.settings.pdf.chunk_pages
+            if not (split and chunk and len(indices) > chunk):
+                return self.pdf_result(job, url, extract_text(pdf, indices))
+        finally:
+            pdf.close()
+
+        chunks = [indices[i : i + chunk] for i in range(0, len(indices), chunk)]
+        logger.info(f"Splitting {url} into {len(chunks)} chunks of {chunk} pages")
+        return PdfSplit(url=url, path=save_temp(doc), chunks=chunks)
+
+    def pdf_extract_pages(self, task: CrawlTask) -> list[tuple[int, str]]:
+        """Worker entry point for one chunk of a split PDF."""
+        try:
+            return extract_file(task.path, task.pages)
+        except pdfium.PdfiumError as e:
+            logger.error(f"Failed to extract pages of {task.url}: {e}, job: {task.job.name}")
+            return []
 
-        extractions = []
-        for page_num in range(len(pdf)):
-            page = pdf[page_num]
-            textpage = page.get_textpage()
-            text = textpage.get_text_range()
-            extractions.append(text)
-            textpage.close()
-            page.close()
-
-        pdf.close()
-
-        return PageResult(
-            url=url, fields=[Extraction(name="content", data="".join(extractions))]
-        )
+    def pdf_result(self, job: Job, url: str, pages: list[tuple[int, str]]) -> PageResult:
+        """One content field, or a page/content entry per page with per_page."""
+        if not job.pdf.per_page:
+            return PageResult(
+                url=url,
+                fields=[Extraction(name="content", data="".join(text for _, text in pages))],
+            )
+        fields = []
+        for index, text in pages:
+            fields.append(Extraction(name="page", data=str(index + 1)))
+            fields.append(Extraction(name="content", data=text))
+        return PageResult(url=url, fields=fields)
 
     def save_results(self) -> None:
         for source_result in self.results:
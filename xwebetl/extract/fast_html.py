@@ -0,0 +1,78 @@
+"""CSS selection on selectolax's lexbor parser.
+
+Used instead of lxml when every selector of a page is CSS and selectolax is
+installed: lexbor parses large pages several times faster than lxml.html
+and its CSS engine needs no translation to XPath.
+"""
+
+from xwebetl.source.source_manager import Job, split_css
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional dependency, see the "fast-html" extra
+    LexborHTMLParser = None
+
+
+def available() -> bool:
+    return LexborHTMLParser is not None
+
+
+def require_css(jobs: list[Job]) -> None:
+    """Fail early, at config load, if a CSS selector of the jobs can't be evaluated.
+
+    selectolax serves CSS navigation and pages whose fields are all CSS.
+    Fields of a page mixing CSS and XPath, or extracted with stream, go
+    through lxml and are translated to XPath, which needs cssselect.
+    """
+    css_jobs = [
+        job
+        for job in jobs
+        if any(selector.engine == "css" for selector in job.extract + job.nav)
+    ]
+    if not css_jobs:
+        return
+    translated = [
+        job.name
+        for job in css_jobs
+        if any(field.engine == "css" for field in job.extract)
+        and (job.stream_extract or not all(field.engine == "css" for field in job.extract))
+    ]
+    if available() and not translated:
+        return
+    try:
+        import cssselect  # noqa: F401
+    except ImportError:
+        if available():
+            raise ImportError(
+                f"CSS fields mixed with XPath or extracted with stream ({', '.join(translated)}) "
+                "require cssselect. Install it with: pip install 'xwebetl[css]'"
+            )
+        raise ImportError(
+            "CSS selectors require selectolax or cssselect. Install one with: "
+            "pip install 'xwebetl[fast-html]' or pip install 'xwebetl[css]'"
+        )
+
+
+def parse(html: str | bytes):
+    return LexborHTMLParser(html)
+
+
+def select(tree, selector: str) -> list:
+    """Select with a CSS selector, honouring a trailing ::text or ::attr(name).
+
+    Returns:
+        Strings for ::text / ::attr, nodes otherwise (see text())
+    """
+    css, what = split_css(selector)
+    nodes = tree.css(css)
+    if what is None:
+        return nodes
+    if what == "text":
+        return [node.text(deep=False) for node in nodes]
+    attr = what[1:]
+    return [node.attributes[attr] for node in nodes if node.attributes.get(attr) is not None]
+
+
+def text(node) -> str:
+    """All text inside a node, like lxml's text_content()."""
+    return node.text(deep=True)
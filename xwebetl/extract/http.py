@@ -1,34 +1,413 @@
+from dataclasses import dataclass
+from io import BytesIO
+import itertools
+import os
+import tempfile
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from xwebetl.source.source_manager import MAX_SIZE_MB
+from xwebetl.extract.validators import ValidatorStore, record_validators
+from xwebetl.extract.cache import ResponseCache, get_cache, is_offline, cache_ttl
+from xwebetl.extract.sniff import sniff_ftype
+from xwebetl.extract.retry import (
+    get_retry_policy,
+    backoff_delay,
+    should_retry_status,
+    record_retry,
+    current_attempt,
+    RetryLater,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
+    "DNT": "1",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Cache-Control": "max-age=0",
+}
 
-def visit_html(url, text=True):
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate",
-        "DNT": "1",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "none",
-        "Cache-Control": "max-age=0",
+# Connection pool settings for the per-process session. Each worker process
+# gets its own session so keep-alive connections are reused across every URL
+# the worker fetches instead of paying a TCP/TLS handshake per page.
+_pool_config = {"pool_size": 10, "max_per_host": 10, "pool_block": False, "timeout": 10}
+_session: requests.Session | None = None
+_session_pid: int | None = None
+
+MB = 1024 * 1024
+# Cap on a response body per ftype in bytes, None for no cap (settings.http.max_size_mb)
+_size_limits: dict[str, int | None] = {ftype: int(mb * MB) for ftype, mb in MAX_SIZE_MB.items()}
+CHUNK_SIZE = 64 * 1024
+# Downloads to a spooled file stay in memory up to this size, then go to disk
+SPOOL_SIZE = 8 * MB
+
+
+def configure_session(
+    pool_size: int = 10,
+    max_per_host: int = 10,
+    pool_block: bool = False,
+    timeout: float = 10,
+) -> None:
+    """Configure the connection pool used by this process.
+
+    Also used as the ProcessPoolExecutor initializer so every worker builds
+    its session with the run's settings.
+
+    Args:
+        pool_size: Number of per-host connection pools to keep alive
+        max_per_host: Maximum number of connections kept open per host
+        pool_block: If True, block instead of opening extra connections
+                    once max_per_host is reached
+        timeout: Seconds to wait for a connection or for response data
+    """
+    global _session
+    _pool_config.update(
+        pool_size=pool_size,
+        max_per_host=max_per_host,
+        pool_block=pool_block,
+        timeout=timeout,
+    )
+    if _session is not None:
+        _session.close()
+        _session = None
+
+
+def get_session() -> requests.Session:
+    """Return the pooled session for the current process.
+
+    Sessions are never shared across a fork: a child inheriting the parent's
+    session would share its sockets, so a new one is created per PID.
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=_pool_config["pool_size"],
+            pool_maxsize=_pool_config["max_per_host"],
+            pool_block=_pool_config["pool_block"],
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _session = session
+        _session_pid = os.getpid()
+    return _session
+
+
+def configure_size_limits(max_size_mb: dict[str, float | None] | None = None) -> None:
+    """Set the per-ftype response size caps of this process (worker initializer)."""
+    global _size_limits
+    max_size_mb = max_size_mb or MAX_SIZE_MB
+    _size_limits = {
+        ftype: None if mb is None else int(mb * MB) for ftype, mb in max_size_mb.items()
     }
 
+
+def size_limit(ftype: str) -> int | None:
+    """Maximum body size in bytes for an ftype, or None for no cap."""
+    return _size_limits.get(ftype)
+
+
+def max_size_limit() -> int | None:
+    """The largest cap of any ftype, for bodies whose type is not known yet."""
+    limits = _size_limits.values()
+    return None if None in limits else max(limits)
+
+
+class ResponseTooLarge(requests.exceptions.RequestException):
+    """A response body is larger than the size cap of its ftype."""
+
+
+def format_size(size: int) -> str:
+    return f"{size / MB:.1f} MB" if size >= MB else f"{size} bytes"
+
+
+@dataclass
+class Document:
+    """A fetched body with what is needed to decode or sniff it later.
+
+    Used for ftype: mixed, where the type is only known from the response,
+    and for documents shared between jobs that parse them as different types.
+    """
+
+    body: bytes
+    # None: detect from the body, like requests' apparent_encoding
+    encoding: str | None = None
+    content_type: str | None = None
+
+    def text(self) -> str:
+        return decode_body(self.body, self.encoding)
+
+    def as_ftype(self, ftype: str, url: str) -> tuple[str, str | bytes] | None:
+        """The body in the form parsers of ftype take: text for html, bytes otherwise.
+
+        ftype "mixed" is sniffed from the body and Content-Type.
+
+        Returns:
+            (ftype, body), or None if the body is over that ftype's size cap
+        """
+        if ftype == "mixed":
+            ftype = sniff_ftype(self.body, self.content_type, url)
+        limit = size_limit(ftype)
+        if limit is not None and len(self.body) > limit:
+            logger.error(
+                f"Skipping {url}: body of {format_size(len(self.body))} exceeds the {format_size(limit)} {ftype} limit"
+            )
+            return None
+        return ftype, self.text() if ftype == "html" else self.body
+
+
+class NotModified(list):
+    """Result of a conditional GET answered with 304 Not Modified.
+
+    Falsy like a failed fetch so callers skip the page, but distinguishable
+    with isinstance and safe to send back from worker processes.
+    """
+
+
+# Transient network failures that are safe to retry for a GET
+RETRY_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+def request(url, headers=None, retry=None, stream=False) -> requests.Response:
+    """GET a URL through the pooled session, retrying transient failures.
+
+    Args:
+        url: URL to fetch
+        headers: Extra request headers
+        retry: RetryPolicy overriding the process default (settings.retry)
+        stream: Don't download the body up front (see requests' stream=True)
+
+    Returns:
+        The final response, whatever its status
+
+    Raises:
+        requests.exceptions.RequestException: If the last attempt failed
+        RetryLater: Instead of retrying in place, when run as a scheduled
+            task's attempt (see scheduled_attempt)
+    """
+    policy = get_retry_policy(retry)
+    attempts = max(1, policy.max_attempts)
+    scheduled = current_attempt()
+    for attempt in range(scheduled or 1, attempts + 1):
+        last_attempt = attempt == attempts
+        try:
+            response = get_session().get(
+                url, timeout=_pool_config["timeout"], headers=headers, stream=stream
+            )
+        except RETRY_EXCEPTIONS as e:
+            if last_attempt:
+                raise
+            delay = backoff_delay(policy, attempt)
+            logger.warning(
+                f"Retrying {url} in {delay:.1f}s after {type(e).__name__} (attempt {attempt}/{attempts})"
+            )
+        else:
+            if last_attempt or not should_retry_status(policy, response.status_code):
+                return response
+            response.close()
+            delay = backoff_delay(policy, attempt, response.headers.get("Retry-After"))
+            logger.warning(
+                f"Retrying {url} in {delay:.1f}s after HTTP {response.status_code} (attempt {attempt}/{attempts})"
+            )
+        record_retry()
+        if scheduled is not None:
+            raise RetryLater(delay)
+        time.sleep(delay)
+
+
+def copy_body(response: requests.Response, out, limit: int | None, chunks=None) -> None:
+    """Write a streamed response body to a binary file, enforcing a size cap.
+
+    The Content-Length header is checked first so an oversized body is
+    rejected before any of it is downloaded. chunks is the body iterator when
+    the caller has already started reading it.
+
+    Raises:
+        ResponseTooLarge: If the body is larger than limit bytes
+    """
+    if limit is not None:
+        length = response.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) > limit:
+            raise ResponseTooLarge(
+                f"Content-Length of {format_size(int(length))} exceeds the {format_size(limit)} limit"
+            )
+    if chunks is None:
+        chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if limit is not None and size > limit:
+            raise ResponseTooLarge(f"body exceeds the {format_size(limit)} limit")
+        out.write(chunk)
+
+
+def decode_body(body: bytes, encoding: str | None) -> str:
+    """Decode a body read from a streamed response, like Response.text.
+
+    encoding is the response's (requests') encoding; None detects it.
+    """
+    if encoding is None:
+        encoding = requests.compat.chardet.detect(body)["encoding"] or "utf-8"
     try:
-        response = requests.get(
-            url,
-            timeout=10,
-            headers=headers,
-        )
+        return str(body, encoding, errors="replace")
+    except LookupError:
+        return str(body, "utf-8", errors="replace")
+
+
+def download(url, ftype="pdf", retry=None) -> tempfile.SpooledTemporaryFile | None:
+    """Download a body into a spooled temporary file instead of memory.
+
+    Small bodies stay in memory, larger ones are written to disk as they
+    arrive. The caller must close the returned file.
+
+    Returns:
+        The file, positioned at the start, or None if the request failed or
+        the body is larger than the ftype's size cap
+    """
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    try:
+        with request(url, retry=retry, stream=True) as response:
+            response.raise_for_status()
+            copy_body(response, out, size_limit(ftype))
+    except RetryLater:
+        out.close()
+        raise
+    except ResponseTooLarge as e:
+        out.close()
+        logger.error(f"Skipping {url}: {e}")
+        return None
+    except requests.exceptions.RequestException as e:
+        out.close()
+        logger.error(f"Failed to fetch {url}: {e}")
+        return None
+    out.seek(0)
+    return out
+
+
+def open_stream(url, retry=None) -> requests.Response | None:
+    """Start downloading a page without reading its body.
+
+    The caller reads it with iter_content() and must close the response;
+    closing it early aborts the download.
+
+    Returns:
+        The response, or None if the request failed
+    """
+    try:
+        response = request(url, retry=retry, stream=True)
         response.raise_for_status()
-        if text:
-            return response.text
-        return response.content
+        return response
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to fetch {url}: {e}")
+        return None
+
+
+def visit_html(url, text=True, conditional=False, ttl=None, retry=None, ftype="html"):
+    """Fetch a page through the pooled session.
+
+    Args:
+        url: URL to fetch
+        text: Return decoded text if True, raw bytes otherwise
+        conditional: Send stored ETag/Last-Modified validators and return
+                     NotModified if the server answers 304
+        ttl: Maximum age in seconds of a cached response, if the response
+             cache is enabled (default: settings.cache.ttl)
+        retry: RetryPolicy overriding the process default (settings.retry)
+        ftype: Kind of document, selects the size cap (settings.http.max_size_mb)
+
+    Returns:
+        The body, NotModified, or None if the request failed or the body is
+        larger than the size cap
+    """
+    doc = fetch_document(url, conditional=conditional, ttl=ttl, retry=retry, ftype=ftype)
+    if not isinstance(doc, Document):
+        return doc
+    return doc.text() if text else doc.body
+
+
+def cached_document(url: str, cached: tuple, ftype: str) -> Document | None:
+    """A cache hit as a Document, under the same size cap as a live response.
+
+    Returns:
+        The Document, or None if the body is over the cap of ftype (sniffed
+        from the body and stored Content-Type for "mixed")
+    """
+    body, encoding, content_type = cached
+    if ftype == "mixed":
+        ftype = sniff_ftype(body, content_type, url)
+    limit = size_limit(ftype)
+    if limit is not None and len(body) > limit:
+        logger.error(
+            f"Skipping {url}: cached body of {format_size(len(body))} exceeds the {format_size(limit)} limit"
+        )
+        return None
+    return Document(body, encoding or "utf-8", content_type)
+
+
+def fetch_document(url, conditional=False, ttl=None, retry=None, ftype="mixed"):
+    """Fetch a body along with its encoding and Content-Type.
+
+    Same arguments as visit_html. With ftype "mixed" the size cap is the one
+    of the type sniffed from the first chunk and the Content-Type header, so
+    the document is read once whatever it turns out to be.
+
+    Returns:
+        A Document, NotModified, or None if the request failed or the body is
+        larger than the size cap
+    """
+    cache = get_cache()
+    key = ResponseCache.key(url, DEFAULT_HEADERS) if cache else None
+    if cache:
+        cached = cache.get(key, cache_ttl(ttl))
+        if cached is not None:
+            logger.debug(f"Cache hit: {url}")
+            return cached_document(url, cached, ftype)
+        if is_offline():
+            logger.error(f"Not in cache (offline mode): {url}")
+            return None
+
+    store = ValidatorStore() if conditional else None
+    headers = store.request_headers(url) if store else None
+    try:
+        with request(url, headers=headers, retry=retry, stream=True) as response:
+            if response.status_code == 304:
+                logger.info(f"Not modified since last run: {url}")
+                return NotModified()
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type")
+            chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+            if ftype == "mixed":
+                # The cap depends on the type, which the first chunk tells
+                head = next(chunks, b"")
+                chunks = itertools.chain([head], chunks)
+                ftype = sniff_ftype(head, content_type, url)
+            buffer = BytesIO()
+            copy_body(response, buffer, size_limit(ftype), chunks)
+            body = buffer.getvalue()
+            if conditional:
+                record_validators(
+                    url, response.headers.get("ETag"), response.headers.get("Last-Modified")
+                )
+            if cache:
+                cache.put(key, url, body, response.encoding, content_type)
+            return Document(body, response.encoding, content_type)
+    except ResponseTooLarge as e:
+        logger.error(f"Skipping {url}: {e}")
+        return None
     except requests.exceptions.RequestException as e:
         logger.error(f"Failed to fetch {url}: {e}")
         return None
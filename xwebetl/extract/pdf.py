@@ -0,0 +1,71 @@
+"""PDF page selection and text extraction with pdfium.
+
+Large documents can be split by page: the PDF is saved to a temporary file
+once and each worker opens it from disk to extract its own share of pages.
+"""
+
+from typing import BinaryIO
+import os
+import shutil
+import tempfile
+
+import pypdfium2 as pdfium
+
+from xwebetl.source.source_manager import PdfOptions
+
+
+def select_pages(count: int, options: PdfOptions) -> list[int]:
+    """Zero-based indices of the pages to extract, in document order.
+
+    Args:
+        count: Number of pages in the document
+        options: The source's `pages` ranges and `max_pages` limit
+    """
+    if options.pages is None:
+        indices = range(count)
+    else:
+        selected = set()
+        for start, end in options.pages:
+            stop = count if end is None else min(end, count)
+            selected.update(range(start - 1, stop))
+        indices = sorted(selected)
+    indices = list(indices)
+    if options.max_pages is not None:
+        indices = indices[: options.max_pages]
+    return indices
+
+
+def extract_text(pdf: pdfium.PdfDocument, indices: list[int]) -> list[tuple[int, str]]:
+    """Text of the given pages of an open document as (index, text) pairs."""
+    pages = []
+    for index in indices:
+        page = pdf[index]
+        textpage = page.get_textpage()
+        pages.append((index, textpage.get_text_range()))
+        textpage.close()
+        page.close()
+    return pages
+
+
+def extract_file(path: str, indices: list[int]) -> list[tuple[int, str]]:
+    """Open a PDF saved by save_temp and extract some of its pages."""
+    pdf = pdfium.PdfDocument(path)
+    try:
+        return extract_text(pdf, indices)
+    finally:
+        pdf.close()
+
+
+def save_temp(doc: bytes | BinaryIO) -> str:
+    """Write a PDF to a temporary file other processes can open.
+
+    The caller deletes the file once every page has been extracted.
+    """
+    fd, path = tempfile.mkstemp(prefix="xwebetl-", suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        if isinstance(doc, bytes):
+            f.write(doc)
+        else:
+            doc.seek(0)
+            shutil.copyfileobj(doc, f)
+    return path
@@ -0,0 +1,95 @@
+from collections import Counter
+from urllib.parse import urlsplit
+import time
+
+from xwebetl.source.source_manager import RateLimit
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: int, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.updated = clock()
+
+    def refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self) -> bool:
+        self.refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Seconds until the next token is available."""
+        self.refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class HostLimiter:
+    """Per-host politeness: a token bucket and a concurrency cap for each host.
+
+    The limiter lives in the parent process and is consulted before a task is
+    handed to the worker pool or event loop, so limits hold across all workers.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.buckets: dict[str, TokenBucket] = {}
+        self.max_concurrent: dict[str, int] = {}
+        self.active: Counter = Counter()
+
+    def register(self, host: str, limit: RateLimit) -> None:
+        """Apply a source's limit to host; when several sources share a host
+        the strictest limit wins."""
+        if limit.max_concurrent:
+            current = self.max_concurrent.get(host, limit.max_concurrent)
+            self.max_concurrent[host] = min(current, limit.max_concurrent)
+        if limit.requests_per_second:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                self.buckets[host] = TokenBucket(limit.requests_per_second, limit.burst, self.clock)
+            elif limit.requests_per_second < bucket.rate:
+                bucket.refill()
+                bucket.rate = limit.requests_per_second
+
+    def acquire(self, host: str, limit: RateLimit | None) -> bool:
+        """Reserve a request slot for host, or return False if it must wait.
+
+        Once any source has set a limit for a host it applies to every request
+        to that host, including those of sources without a rate_limit.
+        """
+        if limit is not None:
+            self.register(host, limit)
+
+        if host in self.max_concurrent and self.active[host] >= self.max_concurrent[host]:
+            return False
+        bucket = self.buckets.get(host)
+        if bucket is not None and not bucket.take():
+            return False
+
+        self.active[host] += 1
+        return True
+
+    def release(self, host: str) -> None:
+        self.active[host] -= 1
+        if self.active[host] <= 0:
+            del self.active[host]
+
+    def delay(self) -> float | None:
+        """Seconds until a rate-limited host gets its next token, if any is waiting."""
+        waits = [
+            bucket.wait_time() for bucket in self.buckets.values() if bucket.tokens < 1
+        ]
+        return min(waits) if waits else None
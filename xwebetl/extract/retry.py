@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+
+from xwebetl.source.source_manager import RetryPolicy
+
+_policy = RetryPolicy()
+# Retries performed by this process since the last take_retry_count()
+_retry_count = 0
+# Attempt number of the scheduled task being run (see scheduled_attempt);
+# None outside the crawl scheduler, where failed requests are retried in place
+_attempt: ContextVar[int | None] = ContextVar("attempt", default=None)
+
+
+class RetryLater(Exception):
+    """A scheduled task's request failed and should be tried again after delay.
+
+    Raised instead of sleeping in the worker, so the retry is queued in the
+    scheduler and goes through the host's rate limit like any other request.
+    Workers return it as the task's result.
+    """
+
+    def __init__(self, delay: float):
+        # args must be (delay,) for the exception to be pickled back from workers
+        super().__init__(delay)
+        self.delay = delay
+
+    def __str__(self) -> str:
+        return f"retry in {self.delay:.1f}s"
+
+
+@contextmanager
+def scheduled_attempt(attempt: int):
+    """Run a scheduled task's requests as its given (1-based) attempt.
+
+    A retryable failure then raises RetryLater, unless it is the last attempt.
+    """
+    token = _attempt.set(attempt)
+    try:
+        yield
+    finally:
+        _attempt.reset(token)
+
+
+def current_attempt() -> int | None:
+    return _attempt.get()
+
+
+def configure_retry(policy: RetryPolicy | None = None) -> None:
+    """Set the default retry policy of this process (worker initializer)."""
+    global _policy
+    _policy = policy or RetryPolicy()
+
+
+def get_retry_policy(override: RetryPolicy | None = None) -> RetryPolicy:
+    """Return a source's own policy, or the process default."""
+    return override or _policy
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(
+    policy: RetryPolicy, attempt: int, retry_after: str | None = None
+) -> float:
+    """Delay before retrying after the given (1-based) failed attempt.
+
+    Exponential backoff with jitter, capped at max_backoff. A Retry-After
+    header from the server takes precedence, but is capped the same way so
+    one misbehaving host can't park a worker for hours.
+    """
+    server_delay = parse_retry_after(retry_after)
+    if server_delay is not None:
+        return min(server_delay, policy.max_backoff)
+    delay = min(policy.backoff * 2 ** (attempt - 1), policy.max_backoff)
+    return delay * (1 - policy.jitter * random.random())
+
+
+def should_retry_status(policy: RetryPolicy, status: int) -> bool:
+    return status in policy.statuses
+
+
+def record_retry() -> None:
+    global _retry_count
+    _retry_count += 1
+
+
+def take_retry_count() -> int:
+    """Return and reset the number of retries performed by this process."""
+    global _retry_count
+    count, _retry_count = _retry_count, 0
+    return count
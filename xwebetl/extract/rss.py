@@ -1,17 +1,67 @@
 import feedparser
 import logging
+from xwebetl.extract.http import visit_html
+from xwebetl.extract import feeds
 
 logger = logging.getLogger(__name__)
 
 
-def visit_rss(url: str):
+def visit_rss(
+    url: str,
+    conditional: bool = False,
+    ttl: int | None = None,
+    retry=None,
+    parser: str = "feedparser",
+    fields: list[str] | None = None,
+):
+    """Fetch a feed through the shared HTTP layer and parse it from memory.
+
+    Going through visit_html gives feeds the pooled session, timeout, retries,
+    response cache and conditional GETs instead of feedparser's own urllib
+    fetch, which has no timeout.
+
+    Returns:
+        The parsed feed, NotModified, or None if fetching or parsing failed
+    """
+    body = visit_html(
+        url, text=False, conditional=conditional, ttl=ttl, retry=retry, ftype="rss"
+    )
+    if not body:
+        return body
+    return parse_rss(body, url=url, parser=parser, fields=fields)
+
+
+def parse_rss(
+    body: str | bytes,
+    url: str,
+    parser: str = "feedparser",
+    fields: list[str] | None = None,
+):
+    """Parse an already downloaded feed.
+
+    Args:
+        body: Raw feed bytes or text
+        url: URL of the feed, used for logging
+        parser: "feedparser" or "lxml"; lxml falls back to feedparser on
+                malformed feeds or fields it can't read
+        fields: Entry keys that will be read, required by the lxml parser
+
+    Returns:
+        The parsed feed, or None on fatal errors
+    """
+    if parser == "lxml" and fields:
+        feed = feeds.parse_feed(body, fields)
+        if feed is not None:
+            return feed
+        logger.debug(f"Falling back to feedparser for {url}")
+
     try:
-        feed = feedparser.parse(url)
+        feed = feedparser.parse(body)
         # feedparser doesn't raise exceptions, but check if parsing was successful
         if feed.bozo and hasattr(feed, 'bozo_exception'):
             # Only fail on fatal errors, not encoding warnings
             exception_type = type(feed.bozo_exception).__name__
-            if exception_type in ['URLError', 'HTTPError', 'SAXParseException']:
+            if exception_type == 'SAXParseException':
                 logger.error(f"Failed to parse RSS feed {url}: {feed.bozo_exception}")
                 return None
             else:
@@ -19,5 +69,5 @@ def visit_rss(url: str):
                 logger.warning(f"RSS feed {url} has non-fatal issue: {feed.bozo_exception}")
         return feed
     except Exception as e:
-        logger.error(f"Failed to fetch RSS feed {url}: {e}")
+        logger.error(f"Failed to parse RSS feed {url}: {e}")
         return None
@@ -0,0 +1,196 @@
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, wait, FIRST_COMPLETED
+from itertools import count
+from typing import Any, Callable
+import heapq
+import time
+
+from xwebetl.extract.ratelimit import HostLimiter, host_of
+from xwebetl.source.source_manager import RateLimit
+
+# How long to sleep when every queued host is throttled by concurrency alone
+IDLE_DELAY = 0.05
+
+
+class Scheduler:
+    """Run-wide work queue that interleaves tasks from every job.
+
+    Tasks are grouped per key (the job name). pop() always serves the highest
+    priority that has work and rotates round-robin between the keys at that
+    priority, so one job with thousands of URLs cannot starve the others.
+    With a HostLimiter, tasks whose host is throttled are held back and the
+    next job's task is served instead. Tasks pushed with not_before (retries
+    after a backoff) are queued once that time has come.
+    """
+
+    def __init__(self, limiter: HostLimiter | None = None):
+        # priority -> key -> FIFO of (task, host, limit)
+        self.queues: dict[int, OrderedDict[str, deque]] = {}
+        self.limiter = limiter
+        self.in_flight: dict[int, str] = {}
+        self.size = 0
+        # Predicates of cancel(); matching tasks are never started
+        self.cancelled: list[Callable[[Any], bool]] = []
+        # Heap of (not_before, sequence, priority, key, entry) not queued yet
+        self.delayed: list[tuple] = []
+        self.sequence = count()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(
+        self,
+        task: Any,
+        key: str,
+        priority: int = 0,
+        url: str | None = None,
+        limit: RateLimit | None = None,
+        not_before: float | None = None,
+    ) -> None:
+        """Queue a task.
+
+        Args:
+            task: The unit of work
+            key: Fairness group, typically the job name
+            priority: Higher priorities are always served first
+            url: URL the task fetches, used for per-host rate limiting
+            limit: Rate limit to apply to the URL's host
+            not_before: time.monotonic() before which the task must not run
+        """
+        if self.cancelled and self.is_cancelled(task):
+            return
+        host = host_of(url) if url and self.limiter else None
+        if host is not None and limit is not None:
+            # Known before any task runs, so unlimited tasks to the host wait too
+            self.limiter.register(host, limit)
+        entry = (task, host, limit)
+        self.size += 1
+        if not_before is not None and not_before > time.monotonic():
+            heapq.heappush(
+                self.delayed, (not_before, next(self.sequence), priority, key, entry)
+            )
+            return
+        self.enqueue(priority, key, entry)
+
+    def enqueue(self, priority: int, key: str, entry: tuple) -> None:
+        keys = self.queues.setdefault(priority, OrderedDict())
+        if key not in keys:
+            keys[key] = deque()
+        keys[key].append(entry)
+
+    def queue_ready(self) -> None:
+        """Queue the delayed tasks whose not_before has passed."""
+        now = time.monotonic()
+        while self.delayed and self.delayed[0][0] <= now:
+            _, _, priority, key, entry = heapq.heappop(self.delayed)
+            self.enqueue(priority, key, entry)
+
+    def pop(self) -> Any:
+        """Take the next task that may run now, or None if nothing is ready."""
+        self.queue_ready()
+        for priority in sorted(self.queues, reverse=True):
+            keys = self.queues[priority]
+            for key, tasks in keys.items():
+                task, host, limit = tasks[0]
+                if host is not None and not self.limiter.acquire(host, limit):
+                    continue
+
+                tasks.popleft()
+                self.size -= 1
+                if host is not None:
+                    self.in_flight[id(task)] = host
+
+                # Rotate the key to the back so the next pop serves another job
+                if tasks:
+                    keys.move_to_end(key)
+                else:
+                    del keys[key]
+                    if not keys:
+                        del self.queues[priority]
+                return task
+        return None
+
+    def done(self, task: Any) -> None:
+        """Release the host slot held by a finished task."""
+        host = self.in_flight.pop(id(task), None)
+        if host is not None:
+            self.limiter.release(host)
+
+    def cancel(self, predicate: Callable[[Any], bool]) -> int:
+        """Stop work on every task matching predicate.
+
+        Matching queued tasks are dropped and matching tasks pushed later are
+        ignored. Runners also cancel matching tasks already handed out if they
+        have not started (see is_cancelled). Returns the number dropped.
+        """
+        self.cancelled.append(predicate)
+        dropped = 0
+        for priority in list(self.queues):
+            keys = self.queues[priority]
+            for key in list(keys):
+                kept = deque(entry for entry in keys[key] if not predicate(entry[0]))
+                dropped += len(keys[key]) - len(kept)
+                if kept:
+                    keys[key] = kept
+                else:
+                    del keys[key]
+            if not keys:
+                del self.queues[priority]
+        delayed = [item for item in self.delayed if not predicate(item[4][0])]
+        dropped += len(self.delayed) - len(delayed)
+        heapq.heapify(delayed)
+        self.delayed = delayed
+        self.size -= dropped
+        return dropped
+
+    def is_cancelled(self, task: Any) -> bool:
+        return any(predicate(task) for predicate in self.cancelled)
+
+    def delay(self) -> float:
+        """How long to wait before a throttled or delayed task could become ready."""
+        delay = self.limiter.delay() if self.limiter is not None else None
+        if self.delayed:
+            wait = max(0.0, self.delayed[0][0] - time.monotonic())
+            delay = wait if delay is None else min(delay, wait)
+        return IDLE_DELAY if delay is None else delay
+
+
+def run_scheduled(
+    scheduler: Scheduler,
+    executor: Executor,
+    fn: Callable[[Any], Any],
+    on_result: Callable[[Any, Any], None],
+    max_in_flight: int,
+) -> None:
+    """Run fn(task) in the executor for every scheduled task.
+
+    on_result is called in this process with each task and its result and may
+    push follow-up tasks onto the scheduler, or cancel tasks (Scheduler.cancel);
+    cancelled tasks still in the executor's queue never run.
+    """
+    pending = {}
+    while pending or scheduler:
+        while len(pending) < max_in_flight:
+            task = scheduler.pop()
+            if task is None:
+                break
+            pending[executor.submit(fn, task)] = task
+
+        if not pending:
+            # Everything queued is rate limited; wait for the next token
+            time.sleep(scheduler.delay())
+            continue
+
+        timeout = scheduler.delay() if scheduler else None
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            task = pending.pop(future)
+            scheduler.done(task)
+            on_result(task, future.result())
+
+        if scheduler.cancelled:
+            # Drop cancelled tasks the executor has not started yet
+            for future, task in list(pending.items()):
+                if scheduler.is_cancelled(task) and future.cancel():
+                    del pending[future]
+                    scheduler.done(task)
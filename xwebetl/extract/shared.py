@@ -0,0 +1,77 @@
+"""Run-scoped single-flight downloads of documents several jobs fetch.
+
+Sources often share a start page or feed and only differ in selectors. Each
+such document is downloaded once per run: the first task asking for it
+fetches it and hands the body back, tasks asking while that download is in
+flight wait for it, and later tasks get the stored body. Every job then
+parses the body with its own selectors.
+
+Documents are keyed by URL alone (see Navigate.document_key): the body is
+kept as a Document, so jobs reading the same URL as different ftypes share
+one download and each decodes it the way its parser needs.
+"""
+
+from collections import Counter
+from typing import Any, Hashable
+
+FETCH = "fetch"
+WAIT = "wait"
+BODY = "body"
+
+
+class SharedDocuments:
+    """Bodies of documents that more than one task of the run will request.
+
+    Keys identify a download, e.g. its URL. A stored body is dropped
+    once as many tasks as expected have been served, and a failed download
+    is forgotten so the tasks that wanted it fetch it themselves.
+    """
+
+    def __init__(self, expected: Counter):
+        # Only documents requested more than once are worth keeping
+        self.remaining = {key: count for key, count in expected.items() if count > 1}
+        self.bodies: dict[Hashable, Any] = {}
+        self.waiting: dict[Hashable, list] = {}
+
+    def request(self, key: Hashable, task: Any) -> tuple[str | None, Any]:
+        """Decide how a task gets its document.
+
+        Returns:
+            (FETCH, None) if the task should download the document and pass
+            the body to complete(), (BODY, body) if it is already here,
+            (WAIT, None) if another task is downloading it (the task is
+            returned by complete()), or (None, None) if the key isn't shared
+        """
+        if key not in self.remaining:
+            return None, None
+        if key in self.bodies:
+            body = self.bodies[key]
+            self.served(key)
+            return BODY, body
+        if key in self.waiting:
+            self.waiting[key].append(task)
+            return WAIT, None
+        self.waiting[key] = []
+        self.served(key)
+        return FETCH, None
+
+    def complete(self, key: Hashable, body: Any) -> list:
+        """Store the body a FETCH task downloaded; returns the tasks waiting for it.
+
+        With body None (the download failed) the key is no longer shared and
+        the returned tasks fetch the document on their own.
+        """
+        waiting = self.waiting.pop(key, [])
+        if key not in self.remaining:
+            return waiting
+        if body is None:
+            del self.remaining[key]
+        else:
+            self.bodies[key] = body
+        return waiting
+
+    def served(self, key: Hashable) -> None:
+        self.remaining[key] -= 1
+        if not self.remaining[key]:
+            del self.remaining[key]
+            self.bodies.pop(key, None)
@@ -0,0 +1,71 @@
+"""Detect the type of a fetched document for sources with ftype: mixed.
+
+Magic bytes are checked first, since servers often send feeds and JSON as
+text/html or text/plain; then the Content-Type header; the URL extension is
+only the last resort.
+"""
+
+import re
+
+# First element of an XML/HTML document, after any <?xml ...?>, comments or doctype
+ROOT_TAG = re.compile(rb"<([a-z][\w:.-]*)")
+FEED_ROOTS = (b"rss", b"feed", b"rdf:rdf", b"rdf")
+BOM = b"\xef\xbb\xbf"
+
+MEDIA_TYPES = {
+    "application/pdf": "pdf",
+    "application/json": "json",
+    "text/json": "json",
+    "application/rss+xml": "rss",
+    "application/atom+xml": "rss",
+    "application/rdf+xml": "rss",
+    "text/html": "html",
+    "application/xhtml+xml": "html",
+}
+
+
+def sniff_ftype(head: bytes, content_type: str | None, url: str) -> str:
+    """The ftype (html, rss, json or pdf) of a document.
+
+    Args:
+        head: The start of the body; the first kilobyte is enough
+        content_type: The response's Content-Type header, if known
+        url: The document's URL, for the extension fallback
+    """
+    start = head[:1024]
+    if start.startswith(BOM):
+        start = start[len(BOM) :]
+    start = start.lstrip()
+    if start.startswith(b"%PDF-"):
+        return "pdf"
+    if start[:1] in (b"{", b"["):
+        return "json"
+    if start[:1] == b"<":
+        lower = start.lower()
+        if lower.startswith(b"<!doctype html"):
+            return "html"
+        root = ROOT_TAG.search(lower)
+        if root:
+            if root.group(1) in FEED_ROOTS:
+                return "rss"
+            if root.group(1) == b"html":
+                return "html"
+
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type in MEDIA_TYPES:
+        return MEDIA_TYPES[media_type]
+    if media_type.endswith("+json"):
+        return "json"
+    return from_extension(url)
+
+
+def from_extension(url: str) -> str:
+    """Guess the ftype from the URL's extension (html when there is none)."""
+    if url.endswith(".rss") or url.endswith(".xml"):
+        return "rss"
+    elif url.endswith(".pdf"):
+        return "pdf"
+    elif url.endswith(".json"):
+        return "json"
+    else:
+        return "html"
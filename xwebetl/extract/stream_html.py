@@ -0,0 +1,131 @@
+"""Incremental HTML extraction that can stop before the page is complete.
+
+The body is fed chunk by chunk into lxml's HTMLPullParser. After each chunk
+the fields that are still missing are evaluated against the partial tree, and
+a match is only accepted once it can no longer change: the element (or the
+element owning the text node) has been closed by the parser. When every field
+has a value the caller stops downloading.
+
+Early matches are only taken from a field's first `|` alternative, since a
+later alternative may only win if the first one never matches in the whole
+document. Selectors whose result can depend on content further down the page
+(last(), following axes, predicates on text or child elements, ...) are only
+evaluated on the full page.
+"""
+
+from lxml import etree, html as lxml_html
+import re
+
+from xwebetl.source.source_manager import Field
+
+# XPath constructs whose answer on a partial document may differ from the full one
+UNSAFE = re.compile(r"last\(\)|following")
+PREDICATE = re.compile(r"\[([^\[\]]*)\]")
+# Predicate parts that only look at attributes or at what precedes the node
+SAFE_TOKENS = {
+    "and", "or", "contains", "starts-with", "normalize-space", "translate",
+    "concat", "substring", "count", "position",
+}
+
+
+def safe_predicate(expr: str) -> bool:
+    expr = re.sub(r"'[^']*'|\"[^\"]*\"", "''", expr)
+    expr = re.sub(r"preceding(-sibling)?::[\w*-]+", "", expr)
+    expr = expr.replace("position()", "position")
+    if "()" in expr or re.search(r"(?<![\w@])\.(?!\d)", expr):
+        return False  # text(), string(), "." ... read the node's content
+    for token in re.findall(r"@?[A-Za-z_][\w-]*", expr):
+        if not token.startswith("@") and token not in SAFE_TOKENS:
+            return False  # tests on child elements
+    return True
+
+
+def streamable(field: Field) -> bool:
+    """Whether a field's first alternative can be resolved on a partial page."""
+    path = field.xpaths[0].path
+    if UNSAFE.search(path):
+        return False
+    return all(safe_predicate(expr) for expr in PREDICATE.findall(path))
+
+
+def first_value(data) -> str:
+    """The value html_parse takes from a non-empty XPath result."""
+    value = data[0] if isinstance(data[0], str) else data[0].text_content()
+    return value.strip()
+
+
+class StreamingExtractor:
+    """Extract fields from an HTML body that arrives in chunks.
+
+    Usage: call feed() for each chunk until it returns True (or the body
+    ends), then close() for the values.
+    """
+
+    def __init__(self, fields: list[Field], encoding: str | None = None):
+        self.fields = fields
+        self.parser = etree.HTMLPullParser(events=("end",), encoding=encoding)
+        # Build lxml.html elements, as lxml_html.fromstring does (text_content())
+        self.parser.set_element_class_lookup(lxml_html.HtmlElementClassLookup())
+        self.values: dict[str, str] = {}
+        self.pending = [field for field in fields if streamable(field)]
+        self.closed: set = set()
+        self.root = None
+
+    def feed(self, chunk: bytes) -> bool:
+        """Parse a chunk; True once every field has a value."""
+        self.parser.feed(chunk)
+        ended = False
+        for _, element in self.parser.read_events():
+            self.closed.add(element)
+            ended = True
+        if ended and self.pending:
+            if self.root is None:
+                self.root = element.getroottree().getroot()
+            self.resolve()
+        return len(self.values) == len(self.fields)
+
+    def resolve(self) -> None:
+        for field in list(self.pending):
+            data = field.xpaths[0](self.root)
+            if not data or not self.complete(data):
+                continue
+            self.values[field.name] = first_value(data)
+            self.pending.remove(field)
+
+    def complete(self, data) -> bool:
+        """Whether the first result of an XPath can't change as more HTML arrives."""
+        if not isinstance(data, list):
+            return False  # string(), count(), ... are only taken from the full page
+        first = data[0]
+        if isinstance(first, str):
+            if getattr(first, "is_attribute", False):
+                return True  # attributes are complete once the start tag is parsed
+            parent = first.getparent() if hasattr(first, "getparent") else None
+            if parent is not None and first.is_tail:
+                # A tail is complete once the element containing it is closed
+                parent = parent.getparent()
+            return parent in self.closed
+        return first in self.closed
+
+    def close(self) -> dict[str, str]:
+        """Finish parsing and return {field name: value} for the fields found.
+
+        Fields not resolved while streaming are evaluated on the final tree,
+        with the usual first-matching-alternative semantics.
+        """
+        try:
+            root = self.parser.close()
+        except etree.XMLSyntaxError:
+            root = self.root
+        if root is None:
+            return self.values
+
+        for field in self.fields:
+            if field.name in self.values:
+                continue
+            for xpath in field.xpaths:
+                data = xpath(root)
+                if data:
+                    self.values[field.name] = first_value(data)
+                    break
+        return self.values
@@ -0,0 +1,32 @@
+from xwebetl.extract.bloom import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test that every added item is found and few others are."""
+    bloom = BloomFilter(1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"http://example.com/{i}")
+
+    assert all(f"http://example.com/{i}" in bloom for i in range(1000))
+    false_positives = sum(f"http://other.com/{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+    assert not bloom.needs_rebuild()
+    bloom.add("http://example.com/extra")
+    assert bloom.needs_rebuild()
+
+
+def test_bloom_filter_save_and_load(tmp_path):
+    """Test that a saved filter loads with its fingerprint, and corrupt files don't."""
+    bloom = BloomFilter(100)
+    bloom.add("http://example.com/a")
+    path = tmp_path / "runs.bloom" / "source.bloom"
+    bloom.save(path, (1, 42))
+
+    loaded, fingerprint = BloomFilter.load(path)
+    assert fingerprint == (1, 42)
+    assert "http://example.com/a" in loaded
+    assert (loaded.size, loaded.hashes, loaded.capacity) == (bloom.size, bloom.hashes, bloom.capacity)
+
+    path.write_bytes(path.read_bytes()[:-1])
+    assert BloomFilter.load(path) is None
+    assert BloomFilter.load(tmp_path / "missing.bloom") is None
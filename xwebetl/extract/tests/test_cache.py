@@ -0,0 +1,74 @@
+from xwebetl.extract.cache import ResponseCache
+
+
+def test_cache_roundtrip(tmp_path):
+    """Test that a stored body is returned with its encoding and Content-Type."""
+    cache = ResponseCache(tmp_path)
+    key = ResponseCache.key("http://example.com/")
+
+    assert cache.get(key) is None
+    cache.put(key, "http://example.com/", b"<html>hello</html>", "utf-8", "text/html")
+
+    assert cache.get(key) == (b"<html>hello</html>", "utf-8", "text/html")
+
+
+def test_cache_adds_content_type_to_old_index(tmp_path):
+    """Test that an index written before Content-Types were stored still works."""
+    import sqlite3
+
+    with sqlite3.connect(tmp_path / "index.db") as conn:
+        conn.execute(
+            "CREATE TABLE entries (key TEXT PRIMARY KEY, url TEXT NOT NULL, encoding TEXT, "
+            "size INTEGER NOT NULL, stored REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+    cache = ResponseCache(tmp_path)
+    key = ResponseCache.key("http://example.com/feed")
+    cache.put(key, "http://example.com/feed", b"<rss/>", None, "application/rss+xml")
+
+    assert cache.get(key) == (b"<rss/>", None, "application/rss+xml")
+
+
+def test_cache_key_varies_on_headers():
+    """Test that headers which change the body are part of the key."""
+    url = "http://example.com/"
+    assert ResponseCache.key(url, {"Accept-Language": "en"}) != ResponseCache.key(
+        url, {"Accept-Language": "de"}
+    )
+    assert ResponseCache.key(url, {"User-Agent": "a"}) == ResponseCache.key(
+        url, {"User-Agent": "b"}
+    )
+
+
+def test_cache_ttl(tmp_path, monkeypatch):
+    """Test that entries older than the TTL are misses unless any age is allowed."""
+    cache = ResponseCache(tmp_path)
+    key = ResponseCache.key("http://example.com/")
+    cache.put(key, "http://example.com/", b"body")
+
+    import time
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+
+    assert cache.get(key, ttl=60) is None
+    assert cache.get(key, ttl=300) is not None
+    assert cache.get(key, ttl=None) is not None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that the size cap evicts the least recently read entries first."""
+    import os
+
+    cache = ResponseCache(tmp_path, max_bytes=10_000)
+    keys = [ResponseCache.key(f"http://example.com/{i}") for i in range(3)]
+    # Random bytes don't compress, so each entry takes ~4KB on disk
+    for i, key in enumerate(keys):
+        cache.put(key, f"http://example.com/{i}", os.urandom(4000))
+        if i == 1:
+            # Touch the first entry so the second becomes the oldest
+            assert cache.get(keys[0]) is not None
+
+    assert cache.size() <= 10_000
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
@@ -1,6 +1,10 @@
-from xwebetl.extract.dispatch import Navigate, Dispatcher
-from xwebetl.source.source_manager import Nav, Field
+from xwebetl.extract.dispatch import Navigate, Dispatcher, RunTracker
+from xwebetl.source.source_manager import Nav, Field, Settings, RateLimit
+from xwebetl.extract.scheduler import Scheduler
+from xwebetl.extract.ratelimit import HostLimiter
+from xwebetl.extract.shared import SharedDocuments
 import pytest
+from collections import Counter, defaultdict
 
 
 def test_navigate_test(test_server, test_sources_yml):
@@ -243,7 +247,17 @@ def test_dispatcher_handles_broken_urls(caplog):
     d = Dispatcher.__new__(Dispatcher)
     d.navigate = Navigate.__new__(Navigate)
     d.navigate.jobs = [fake_job]
+    d.navigate.settings = Settings()
+    d.navigate.executor = None
+    d.navigate.limiter = HostLimiter()
+    d.navigate.retries = Counter()
+    d.navigate.validators = defaultdict(list)
+    d.navigate.failures = Counter()
+    d.navigate.shared = SharedDocuments(Counter())
     d.results = []
+    d.scheduler = Scheduler(d.navigate.limiter)
+    d.progress = {}
+    d.pdf_parts = {}
     from extract.dispatch import RunTracker
 
     d.run_tracker = RunTracker()
@@ -282,7 +296,17 @@ def test_dispatcher_handles_broken_rss_feeds(caplog):
     d = Dispatcher.__new__(Dispatcher)
     d.navigate = Navigate.__new__(Navigate)
     d.navigate.jobs = [fake_job]
+    d.navigate.settings = Settings()
+    d.navigate.executor = None
+    d.navigate.limiter = HostLimiter()
+    d.navigate.retries = Counter()
+    d.navigate.validators = defaultdict(list)
+    d.navigate.failures = Counter()
+    d.navigate.shared = SharedDocuments(Counter())
     d.results = []
+    d.scheduler = Scheduler(d.navigate.limiter)
+    d.progress = {}
+    d.pdf_parts = {}
     from extract.dispatch import RunTracker
 
     d.run_tracker = RunTracker()
@@ -482,3 +506,907 @@ def test_dispatcher_test_json_max_items(test_server, test_sources_yml):
         assert len(page_result.fields) == 1
         assert page_result.fields[0].name == "title"
         assert "Article" in page_result.fields[0].data
+
+
+def test_navigate_async_engine(test_server, test_sources_yml):
+    """Test that the async engine discovers the same URLs as the process engine."""
+    d = Navigate(path=test_sources_yml, source_name="test_rss_html", engine="async")
+    d.start()
+
+    job = d.jobs[0]
+    assert set(job.urls) == {
+        f"{test_server}/html/article_1_appendix.html",
+        f"{test_server}/html/article_2_appendix.html",
+        f"{test_server}/html/article_3_appendix.html",
+    }
+
+
+@pytest.mark.parametrize(
+    "source_name, expected_results",
+    [("test", 3), ("test_only_rss", 1), ("test_rss_html_pdf", 1), ("test_json_direct", 1)],
+)
+def test_dispatcher_async_engine(test_server, test_sources_yml, source_name, expected_results):
+    """Test extraction of every ftype through the async engine."""
+    d = Dispatcher(path=test_sources_yml, source_name=source_name, engine="async")
+    d.execute_jobs()
+
+    source_result = d.results[0]
+    assert source_result.source_name == source_name
+    assert len(source_result.results) == expected_results
+    for page_result in source_result.results:
+        assert len(page_result.fields) > 0
+        assert all(len(field.data) > 0 for field in page_result.fields)
+
+
+def test_dispatcher_reuses_one_worker_pool(test_server, test_sources_yml, mocker):
+    """Test that all nav steps and extract batches of a run share one pool."""
+    spy = mocker.spy(Navigate, "new_executor")
+
+    d = Dispatcher(path=test_sources_yml, source_name=None)
+    assert d.navigate.executor is not None
+    d.execute_jobs()
+
+    assert spy.call_count == 1
+    assert d.navigate.executor is None
+    assert len(d.results) > 1
+
+
+def test_navigate_shuts_down_own_pool(test_server, test_sources_yml):
+    """Test that a standalone Navigate cleans up the pool it started."""
+    d = Navigate(path=test_sources_yml, source_name="test")
+    d.start()
+
+    assert len(d.jobs[0].urls) == 3
+    assert d.executor is None
+
+
+@pytest.fixture
+def stream_sources_yml(test_sources_yml, tmp_path):
+    """test_sources.yml with the streaming crawl mode enabled."""
+    path = tmp_path / "stream_sources.yml"
+    with open(test_sources_yml) as f:
+        path.write_text("settings:\n  crawl: stream\n" + f.read())
+    return str(path)
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+@pytest.mark.parametrize(
+    "source_name, expected_urls",
+    [
+        ("test", {"article_1_appendix.html", "article_2_appendix.html", "article_3_appendix.html"}),
+        ("test_rss_html", {"article_1_appendix.html", "article_2_appendix.html", "article_3_appendix.html"}),
+        ("test_json_to_html", {"article_1.html", "article_2.html", "article_3.html"}),
+        ("test_only_rss", {"feed.xml"}),
+    ],
+)
+def test_dispatcher_stream_crawl(test_server, stream_sources_yml, engine, source_name, expected_urls):
+    """Test that streamed navigation extracts the same pages as batch navigation."""
+    d = Dispatcher(path=stream_sources_yml, source_name=source_name, engine=engine)
+    d.execute_jobs()
+
+    source_result = d.results[0]
+    assert source_result.source_name == source_name
+    assert {r.url.rsplit("/", 1)[1] for r in source_result.results} == expected_urls
+    assert {url.rsplit("/", 1)[1] for url in d.navigate.jobs[0].urls} == expected_urls
+    for page_result in source_result.results:
+        assert all(len(field.data) > 0 for field in page_result.fields)
+
+
+def test_dispatcher_stream_crawl_skips_fetched(test_server, stream_sources_yml):
+    """Test that streamed extraction still skips URLs already fetched by the source."""
+    d1 = Dispatcher(path=stream_sources_yml, source_name="test")
+    d1.execute_jobs()
+    assert len(d1.results[0].results) == 3
+
+    d2 = Dispatcher(path=stream_sources_yml, source_name="test")
+    d2.execute_jobs()
+    assert len(d2.results) == 0
+
+
+def test_dispatcher_runs_all_jobs_through_one_scheduler(test_server, test_sources_yml):
+    """Test that a run over all sources keeps results in config order."""
+    d = Dispatcher(path=test_sources_yml, source_name=None)
+    d.execute_jobs()
+
+    names = [result.source_name for result in d.results]
+    config_order = [job.name for job in d.navigate.jobs]
+    assert names == [name for name in config_order if name in names]
+    assert "test_rss_html_pdf" in names
+    assert "test_json_direct" in names
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+def test_dispatcher_respects_host_rate_limit(test_server, test_sources_yml, tmp_path, engine):
+    """Test that a per-source rate limit spaces out requests to the host."""
+    import time
+
+    path = tmp_path / "rate_limited.yml"
+    with open(test_sources_yml) as f:
+        content = f.read()
+    path.write_text(
+        content.replace(
+            "  - name: test\n",
+            "  - name: test\n    rate_limit:\n      requests_per_second: 20\n      max_concurrent: 1\n",
+            1,
+        )
+    )
+
+    started = time.monotonic()
+    d = Dispatcher(path=str(path), source_name="test", engine=engine)
+    d.execute_jobs()
+    elapsed = time.monotonic() - started
+
+    assert d.navigate.jobs[0].rate_limit == RateLimit(requests_per_second=20, max_concurrent=1)
+    assert len(d.results[0].results) == 3
+    # 1 home page + 3 articles + 3 appendices, one token every 50ms after the first
+    assert elapsed >= 6 * 0.05
+
+
+def test_dispatcher_shuts_down_pool_when_navigation_fails(test_sources_yml, mocker):
+    """Test that the worker pool and tracker are closed if navigation raises."""
+    mocker.patch.object(Navigate, "start", side_effect=RuntimeError("navigation failed"))
+    new_executor = mocker.spy(Navigate, "new_executor")
+    close = mocker.spy(Dispatcher, "close")
+
+    with pytest.raises(RuntimeError, match="navigation failed"):
+        Dispatcher(path=test_sources_yml, source_name="test", no_track=True)
+
+    assert close.call_count == 1
+    executor = new_executor.spy_return
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+
+@pytest.mark.parametrize("engine", ["process"])
+def test_dispatcher_queues_retries_in_scheduler(test_server, test_sources_yml, mocker, fetch_spy):
+    """Test that a retried request is queued as a new attempt instead of run in place."""
+    from unittest.mock import MagicMock
+    from xwebetl.extract import http
+
+    session = http.get_session()
+    failed = []
+
+    def flaky_get(url, **kwargs):
+        if url.endswith("article_1.html") and not failed:
+            failed.append(url)
+            response = MagicMock(status_code=503, headers={"Retry-After": "0"})
+            return response
+        return session.get(url, **kwargs)
+
+    flaky = MagicMock()
+    flaky.get.side_effect = flaky_get
+    mocker.patch("xwebetl.extract.http.get_session", return_value=flaky)
+    push = mocker.spy(Scheduler, "push")
+
+    d = Dispatcher(path=test_sources_yml, source_name="test", no_track=True)
+    d.execute_jobs()
+
+    assert len(d.results[0].results) == 3
+    assert fetch_spy.urls().count(failed[0]) == 2
+    retried = [call for call in push.call_args_list if call.kwargs.get("not_before")]
+    assert [call.kwargs["url"] for call in retried] == failed
+    assert d.navigate.retries["test"] == 1
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+def test_dispatcher_conditional_get_skips_unchanged_job(
+    test_server, test_sources_yml, tmp_path, monkeypatch, engine
+):
+    """Test that a start page answering 304 skips the job on the next run."""
+    path = tmp_path / "conditional.yml"
+    with open(test_sources_yml) as f:
+        path.write_text("settings:\n  http:\n    conditional_get: true\n" + f.read())
+    # Keep the tracking and validator databases local to this test
+    monkeypatch.chdir(tmp_path)
+
+    d1 = Dispatcher(path=str(path), source_name="test", engine=engine, no_track=True)
+    d1.execute_jobs()
+    assert len(d1.results[0].results) == 3
+
+    d2 = Dispatcher(path=str(path), source_name="test", engine=engine, no_track=True)
+    d2.execute_jobs()
+
+    assert d2.results == []
+    assert d2.navigate.jobs[0].conditional_get is True
+
+
+@pytest.mark.parametrize("engine", ["process"])
+def test_dispatcher_failed_job_keeps_old_validators(
+    test_server, test_sources_yml, tmp_path, monkeypatch, mocker, fetch_spy
+):
+    """Test that a run with a failed page is not skipped as unchanged next time."""
+    path = tmp_path / "conditional.yml"
+    with open(test_sources_yml) as f:
+        path.write_text("settings:\n  http:\n    conditional_get: true\n" + f.read())
+    # Keep the tracking and validator databases local to this test
+    monkeypatch.chdir(tmp_path)
+
+    html_parse = Dispatcher.html_parse
+    failed = []
+
+    def fail_once(self, job, url, html):
+        if not failed:
+            failed.append(url)
+            return None
+        return html_parse(self, job, url, html)
+
+    mocker.patch.object(Dispatcher, "html_parse", fail_once)
+    d1 = Dispatcher(path=str(path), source_name="test")
+    d1.execute_jobs()
+    assert len(d1.results[0].results) == 2
+
+    # The start page is fetched again and only the failed page is extracted
+    d2 = Dispatcher(path=str(path), source_name="test")
+    d2.execute_jobs()
+    assert [result.url for result in d2.results[0].results] == failed
+
+    d3 = Dispatcher(path=str(path), source_name="test")
+    d3.execute_jobs()
+    assert d3.results == []
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+def test_navigate_all_returns_not_modified(test_server, test_sources_yml, tmp_path, monkeypatch, engine):
+    """Test that navigating an unchanged start page returns NotModified, not an empty list."""
+    from xwebetl.extract.http import NotModified
+
+    path = tmp_path / "conditional.yml"
+    with open(test_sources_yml) as f:
+        path.write_text("settings:\n  http:\n    conditional_get: true\n" + f.read())
+    # Keep the validator database local to this test
+    monkeypatch.chdir(tmp_path)
+
+    first = Navigate(path=str(path), source_name="test", engine=engine)
+    job = first.jobs[0]
+    try:
+        urls = first.navigate_all([job.nav[0]], job)
+    finally:
+        first.shutdown()
+    assert len(urls) == 3
+    first.save_validators(job)
+
+    second = Navigate(path=str(path), source_name="test", engine=engine)
+    job = second.jobs[0]
+    try:
+        urls = second.navigate_all([job.nav[0]], job)
+    finally:
+        second.shutdown()
+    assert isinstance(urls, NotModified)
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+def test_dispatcher_from_cache_is_offline(test_server, test_sources_yml, tmp_path, engine):
+    """Test that a cached run can be replayed without touching the network."""
+    path = tmp_path / "cached.yml"
+    with open(test_sources_yml) as f:
+        path.write_text(
+            f"settings:\n  cache:\n    enabled: true\n    dir: {tmp_path / 'cache'}\n" + f.read()
+        )
+
+    d1 = Dispatcher(path=str(path), source_name="test", engine=engine, no_track=True)
+    d1.execute_jobs()
+
+    d2 = Dispatcher(
+        path=str(path), source_name="test", engine=engine, no_track=True, from_cache=True
+    )
+    d2.execute_jobs()
+
+    assert d2.navigate.settings.cache.offline is True
+    assert {r.url for r in d2.results[0].results} == {r.url for r in d1.results[0].results}
+
+    # Nothing of this source was cached, so the offline run finds nothing
+    d3 = Dispatcher(
+        path=str(path), source_name="test_rss_html", engine=engine, no_track=True, from_cache=True
+    )
+    d3.execute_jobs()
+    assert d3.results == []
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+@pytest.mark.parametrize("source_name", ["test_only_rss", "test_rss_html"])
+def test_dispatcher_lxml_feed_parser(test_server, test_sources_yml, tmp_path, engine, source_name):
+    """Test that the lxml feed parser yields the same results as feedparser."""
+    path = tmp_path / "lxml_feeds.yml"
+    with open(test_sources_yml) as f:
+        path.write_text("settings:\n  feed_parser: lxml\n" + f.read())
+
+    fast = Dispatcher(path=str(path), source_name=source_name, engine=engine, no_track=True)
+    fast.execute_jobs()
+    slow = Dispatcher(path=test_sources_yml, source_name=source_name, engine=engine, no_track=True)
+    slow.execute_jobs()
+
+    assert fast.navigate.settings.feed_parser == "lxml"
+    assert fast.results[0].to_json()["result"] == slow.results[0].to_json()["result"]
+
+
+CSS_SOURCE = """
+source:
+  - name: test_css
+    start: {server}/html/home.html
+    navigate:
+      - selector: "css:ul > li > a::attr(href)"
+        ftype: html
+      - selector: "#article-body > p:nth-of-type(4) a::attr(href)"
+        engine: css
+        ftype: html
+    extract:
+      ftype: html
+      fields:
+        - name: title
+          selector: "css:body > h1"
+        - name: body
+          selector: "css:#article-body"
+"""
+
+
+@pytest.mark.parametrize("fast", [True, False], ids=["selectolax", "cssselect"])
+def test_dispatcher_css_selectors(test_server, test_sources_yml, tmp_path, monkeypatch, fast):
+    """Test that CSS selectors extract the same data as the equivalent XPaths."""
+    from xwebetl.extract import fast_html
+
+    if not fast:
+        monkeypatch.setattr(fast_html, "LexborHTMLParser", None)
+    path = tmp_path / "css.yml"
+    path.write_text(CSS_SOURCE.format(server=test_server))
+
+    css = Dispatcher(path=str(path), source_name="test_css", no_track=True)
+    css.execute_jobs()
+    xpath = Dispatcher(path=test_sources_yml, source_name="test", no_track=True)
+    xpath.execute_jobs()
+
+    job = css.navigate.jobs[0]
+    assert [nav.engine for nav in job.nav] == ["css", "css"]
+    assert job.nav[0].selector == "ul > li > a::attr(href)"
+    assert css.results[0].to_json()["result"] == xpath.results[0].to_json()["result"]
+
+
+def test_navigate_requires_cssselect_for_translated_css(test_server, tmp_path, monkeypatch):
+    """Test that CSS fields needing an XPath translation fail at config load without cssselect."""
+    import sys
+
+    monkeypatch.setitem(sys.modules, "cssselect", None)
+    path = tmp_path / "css.yml"
+    path.write_text(CSS_SOURCE.format(server=test_server))
+    # Every field is CSS: selectolax serves the whole job
+    Navigate(path=str(path), source_name="test_css")
+
+    path.write_text(
+        CSS_SOURCE.format(server=test_server)
+        + "        - name: heading\n          selector: //h1\n"
+    )
+    with pytest.raises(ImportError, match=r"mixed with XPath or extracted with stream \(test_css\)"):
+        Navigate(path=str(path), source_name="test_css")
+
+    path.write_text(
+        CSS_SOURCE.format(server=test_server).replace(
+            "      ftype: html\n      fields:", "      ftype: html\n      stream: true\n      fields:"
+        )
+    )
+    with pytest.raises(ImportError, match="require cssselect"):
+        Navigate(path=str(path), source_name="test_css")
+
+
+def test_dispatcher_stream_extract(test_server, test_sources_yml, tmp_path, mocker):
+    """Test that streamed extraction gives the same results as parsing the full page."""
+    import requests
+
+    with open(test_sources_yml) as f:
+        config = f.read().replace("      ftype: html\n      fields:", "      ftype: html\n      stream: true\n      fields:")
+    path = tmp_path / "stream_extract.yml"
+    path.write_text(config)
+
+    streamed = Dispatcher(path=str(path), source_name="test", no_track=True)
+    streamed.execute_jobs()
+
+    job = streamed.navigate.jobs[0]
+    assert job.stream_extract
+    pages = streamed.results[0].results
+    assert len(pages) == 3
+    for page in pages:
+        # Bytes, so lxml honours the page's <meta charset> like the stream parser
+        body = requests.get(page.url).content
+        assert page == streamed.html_parse(job, page.url, body)
+
+    # Pages are extracted in worker processes; check the routing in this one
+    spy = mocker.spy(streamed, "html_stream_extract")
+    assert streamed.html_extract(job, pages[0].url) == pages[0]
+    assert spy.call_count == 1
+
+
+def test_dispatcher_pdf_extract_from_spooled_file(test_server, test_sources_yml, caplog):
+    """Test that PDFs are read from a streamed download and skipped over the size cap."""
+    from xwebetl.extract.http import configure_size_limits
+
+    d = Dispatcher(path=test_sources_yml, source_name="test_rss_html_pdf", no_track=True)
+    job = d.navigate.jobs[0]
+    url = f"{test_server}/files/Test%20PDF.pdf"
+
+    result = d.pdf_extract(job, url)
+    assert "This is a pdf" in result.fields[0].data
+
+    configure_size_limits({"pdf": 0.0001})
+    try:
+        assert d.pdf_extract(job, url) is None
+    finally:
+        configure_size_limits()
+    assert f"Skipping {url}" in caplog.text
+
+
+PDF_SOURCE = """
+settings:
+  pdf:
+    chunk_pages: {chunk_pages}
+source:
+  - name: test_pdf_pages
+    start: {server}/files/pages.pdf
+    extract:
+      ftype: pdf
+      pages: 2-5
+      per_page: true
+"""
+
+
+@pytest.mark.parametrize("chunk_pages", [0, 3])
+def test_dispatcher_pdf_pages(test_server, tmp_path, chunk_pages, mocker):
+    """Test that a page range is extracted per page, whether or not the PDF is split."""
+    import os
+
+    path = tmp_path / "pdf.yml"
+    path.write_text(PDF_SOURCE.format(server=test_server, chunk_pages=chunk_pages))
+    mocker.patch("tempfile.tempdir", str(tmp_path))
+
+    d = Dispatcher(path=str(path), source_name="test_pdf_pages", no_track=True)
+    d.execute_jobs()
+
+    entries = d.results[0].to_json()["result"][f"{test_server}/files/pages.pdf"]
+    assert [entry["page"] for entry in entries] == ["2", "3", "4", "5"]
+    assert all("This is a pdf" in entry["content"] for entry in entries)
+    # The copy saved for split extraction is removed afterwards
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".pdf")]
+
+
+def test_dispatcher_streams_raw_results_to_jsonl(test_server, test_sources_yml, tmp_path, monkeypatch):
+    """Test that raw_format: jsonl writes page results as they arrive, readable as usual."""
+    from xwebetl.source.data_manager import DataManager
+
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "jsonl.yml"
+    with open(test_sources_yml) as f:
+        path.write_text("settings:\n  raw_format: jsonl\n" + f.read())
+
+    streamed = Dispatcher(path=str(path), source_name="test", no_track=True)
+    streamed.execute_jobs()
+    streamed.save_results()
+    full = Dispatcher(path=test_sources_yml, source_name="test", no_track=True)
+    full.execute_jobs()
+
+    source_result = streamed.results[0]
+    assert source_result.results == []
+    assert source_result.streamed == 3
+    assert source_result.path == DataManager().raw_dir / "test.jsonl"
+    assert len(source_result.path.read_text().splitlines()) == 4
+    assert not (DataManager().raw_dir / "test.json").exists()
+
+    raw = DataManager().load_json("test", layer="raw")
+    assert raw["source"] == "test"
+    assert raw["result"] == full.results[0].to_json()["result"]
+
+
+def test_dispatcher_cleans_up_after_failed_run(test_server, test_sources_yml, tmp_path, monkeypatch, mocker):
+    """Test that a run that raises still closes its result files and deletes split PDFs."""
+    from xwebetl.extract.dispatch import JobProgress, PdfParts
+
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "jsonl.yml"
+    with open(test_sources_yml) as f:
+        path.write_text("settings:\n  raw_format: jsonl\n" + f.read())
+    split_pdf = tmp_path / "split.pdf"
+    split_pdf.write_bytes(b"%PDF")
+
+    add = JobProgress.add
+
+    def add_then_fail(self, page_result):
+        add(self, page_result)
+        raise RuntimeError("extraction failed")
+
+    mocker.patch.object(JobProgress, "add", add_then_fail)
+    d = Dispatcher(path=str(path), source_name="test", no_track=True)
+    d.pdf_parts[("test", "http://example.com/a.pdf")] = PdfParts(path=str(split_pdf), remaining=2)
+    with pytest.raises(RuntimeError, match="extraction failed"):
+        d.execute_jobs()
+
+    writer = d.progress["test"].writer
+    assert writer.file.closed
+    # The page written before the failure is kept
+    assert len(writer.path.read_text().splitlines()) == 2
+    assert not split_pdf.exists()
+    assert d.pdf_parts == {}
+
+
+def test_run_tracker_buffers_writes(tmp_path):
+    """Test that add_url batches rows, and reads or flush() make them visible."""
+    import sqlite3
+    from xwebetl.extract.dispatch import RunTracker
+
+    db_path = tmp_path / "runs.db"
+
+    def stored():
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM fetched_urls").fetchone()[0]
+
+    tracker = RunTracker(db_path, flush_size=3, flush_interval=3600)
+    assert tracker.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    tracker.add_url("http://example.com/1", "test_source")
+    tracker.add_url("http://example.com/2", "test_source")
+    assert stored() == 0
+
+    # Reads see buffered rows
+    assert tracker.has_been_fetched("http://example.com/1", "test_source")
+    assert stored() == 2
+
+    for i in range(3, 6):
+        tracker.add_url(f"http://example.com/{i}", "test_source")
+    assert stored() == 5
+
+    tracker.add_url("http://example.com/6", "test_source")
+    tracker.close()
+    assert stored() == 6
+    # Usable again after close
+    assert tracker.filter_unfetched_urls(
+        ["http://example.com/6", "http://example.com/7"], "test_source"
+    ) == ["http://example.com/7"]
+
+
+def test_run_tracker_filters_large_url_lists(tmp_path):
+    """Test that filtering works past SQLite's bound parameter limit, per source."""
+    from xwebetl.extract.dispatch import RunTracker
+
+    tracker = RunTracker(tmp_path / "runs.db")
+    for i in range(0, 40000, 2):
+        tracker.add_url(f"http://example.com/{i}", "test_source")
+    tracker.add_url("http://example.com/1", "test_other")
+
+    urls = [f"http://example.com/{i}" for i in range(40000)] + ["http://example.com/3"]
+    unfetched = tracker.filter_unfetched_urls(urls, "test_source")
+
+    # Order and duplicates are kept; another source's history doesn't count
+    assert unfetched == [f"http://example.com/{i}" for i in range(1, 40000, 2)] + [
+        "http://example.com/3"
+    ]
+    assert tracker.filter_unfetched_urls(urls[:10], "test_source") == urls[1:10:2]
+    # The temp table is emptied between calls
+    assert len(tracker.filter_unfetched_urls(urls, "test_other")) == len(urls) - 1
+
+
+def test_run_tracker_prefilter(tmp_path):
+    """Test that the prefilter skips SQLite for new URLs and is persisted per source."""
+    import sqlite3
+    from xwebetl.extract.dispatch import RunTracker
+
+    db_path = tmp_path / "runs.db"
+    tracker = RunTracker(db_path, prefilter=True)
+    for i in range(100):
+        tracker.add_url(f"http://example.com/{i}", "test_source")
+    tracker.close()
+    assert (tmp_path / "runs.bloom" / "test_source.bloom").exists()
+
+    tracker = RunTracker(db_path, prefilter=True)
+    queries = []
+    tracker.conn.set_trace_callback(queries.append)
+    assert tracker.filter_unfetched_urls(["http://example.com/5", "http://new.com/1"], "test_source") == [
+        "http://new.com/1"
+    ]
+    # Loaded from disk: no rebuild, and only the possible hit went to SQLite
+    assert not any(q.startswith("SELECT url FROM fetched_urls WHERE source_name = ?") for q in queries)
+    queries.clear()
+    assert tracker.filter_unfetched_urls(["http://new.com/2", "http://new.com/3"], "test_source") == [
+        "http://new.com/2",
+        "http://new.com/3",
+    ]
+    assert not tracker.has_been_fetched("http://new.com/2", "test_source")
+    assert queries == []
+
+    # Buffered adds are seen by the filter
+    tracker.add_url("http://new.com/2", "test_source")
+    assert tracker.has_been_fetched("http://new.com/2", "test_source")
+    tracker.close()
+
+    # Rows added behind the filter's back make it stale: it's rebuilt
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO fetched_urls VALUES ('http://new.com/4', 'test_source', '2024-01-01')"
+        )
+    tracker = RunTracker(db_path, prefilter=True)
+    assert tracker.filter_unfetched_urls(["http://new.com/4", "http://new.com/5"], "test_source") == [
+        "http://new.com/5"
+    ]
+
+    # Deletions drop the saved filter
+    tracker.delete_by_source("test_source")
+    assert not (tmp_path / "runs.bloom" / "test_source.bloom").exists()
+    assert tracker.filter_unfetched_urls(["http://example.com/5"], "test_source") == ["http://example.com/5"]
+
+
+LINKS_SOURCE = """
+settings:
+  crawl: {crawl}
+  urls:
+    canonicalize: {canonicalize}
+source:
+  - name: test_links
+    start: {server}/html/links.html
+    no_track: true
+    navigate:
+      - selector: //ul/li/a/@href
+        ftype: html
+    extract:
+      ftype: html
+      fields:
+        - name: title
+          selector: /html/body/h1
+"""
+
+
+@pytest.mark.parametrize("crawl", ["batch", "stream"])
+@pytest.mark.parametrize(
+    "canonicalize, expected",
+    [
+        # The first variant found of each page is fetched as linked
+        (True, ["article_1.html", "http://LOCALHOST:8888/html/article_2.html"]),
+        (
+            False,
+            [
+                "article_1.html",
+                "article_1.html#comments",
+                "article_1.html?utm_source=home&utm_medium=list",
+                "http://LOCALHOST:8888/html/article_2.html",
+                "article_2.html",
+            ],
+        ),
+    ],
+)
+def test_dispatcher_dedupes_urls(test_server, tmp_path, crawl, canonicalize, expected):
+    """Test that repeated links are fetched once, and URL variants too when canonicalized."""
+    path = tmp_path / "links.yml"
+    path.write_text(
+        LINKS_SOURCE.format(server=test_server, crawl=crawl, canonicalize=str(canonicalize).lower())
+    )
+
+    d = Dispatcher(path=str(path), source_name="test_links")
+    d.execute_jobs()
+
+    expected = [url if url.startswith("http") else f"{test_server}/html/{url}" for url in expected]
+    assert d.navigate.jobs[0].urls == expected
+    assert sorted(r.url for r in d.results[0].results) == sorted(expected)
+
+
+@pytest.mark.parametrize("crawl", ["batch", "stream"])
+def test_dispatcher_tracks_canonical_urls(test_server, tmp_path, monkeypatch, crawl):
+    """Test that the canonical URL is tracked while the linked URL is fetched."""
+    path = tmp_path / "links.yml"
+    path.write_text(
+        LINKS_SOURCE.format(server=test_server, crawl=crawl, canonicalize="true").replace(
+            "no_track: true", "no_track: false"
+        )
+    )
+    # Keep the tracking database local to this test
+    monkeypatch.chdir(tmp_path)
+
+    d1 = Dispatcher(path=str(path), source_name="test_links")
+    d1.execute_jobs()
+    fetched = sorted(r.url for r in d1.results[0].results)
+
+    tracker = RunTracker()
+    tracked = [url for url, _, _ in tracker.get_latest_fetches()]
+    tracker.close()
+    d2 = Dispatcher(path=str(path), source_name="test_links")
+    d2.execute_jobs()
+
+    assert fetched == ["http://LOCALHOST:8888/html/article_2.html", f"{test_server}/html/article_1.html"]
+    assert sorted(tracked) == [
+        f"{test_server}/html/article_1.html",
+        f"{test_server}/html/article_2.html",
+    ]
+    assert d2.results == []
+
+
+@pytest.mark.parametrize("crawl", ["batch", "stream"])
+@pytest.mark.parametrize("engine", ["process", "async"])
+def test_dispatcher_shares_start_documents(test_server, test_sources_yml, tmp_path, fetch_spy, engine, crawl):
+    """Test that a start page or feed used by several jobs is downloaded once per run."""
+    path = tmp_path / "sources.yml"
+    with open(test_sources_yml) as f:
+        path.write_text(f"settings:\n  crawl: {crawl}\n" + f.read())
+
+    d = Dispatcher(path=str(path), source_name=None, no_track=True, engine=engine)
+    d.execute_jobs()
+
+    counts = Counter(fetch_spy.urls())
+    for url in ["/rss/feed.xml", "/json/test.json", "/html/home.html"]:
+        assert counts[f"{test_server}{url}"] == 1
+    results = {result.source_name: result for result in d.results}
+    assert len(results["test_only_rss"].results[0].fields) == 9
+    assert len(results["test_json_direct"].results[0].fields) > 0
+    assert len(results["test_rss_html"].results) == 3
+    assert len(results["test_json_to_html"].results) == 3
+    assert d.navigate.shared.bodies == {}
+
+
+JSON_TWICE_SOURCE = """
+source:
+  - name: test_json_as_json
+    start: {server}/json/test.json
+    extract:
+      ftype: json
+      fields:
+        - name: title
+          selector: items.title
+  - name: test_json_as_html
+    start: {server}/json/test.json
+    extract:
+      ftype: html
+      fields:
+        - name: text
+          selector: //span
+"""
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+def test_dispatcher_shares_document_across_ftypes(test_server, tmp_path, fetch_spy, engine):
+    """Test that jobs reading one URL as different ftypes share the download
+    (documents are keyed by URL) and each parses it as its own ftype."""
+    path = tmp_path / "json_twice.yml"
+    path.write_text(JSON_TWICE_SOURCE.format(server=test_server))
+
+    d = Dispatcher(path=str(path), source_name=None, no_track=True, engine=engine)
+    d.execute_jobs()
+
+    assert fetch_spy.urls() == [f"{test_server}/json/test.json"]
+    results = {result.source_name: result.results[0] for result in d.results}
+    assert results["test_json_as_json"].fields[0].data == "Article 1: Introduction to RSS Feeds"
+    # Decoded to text for the HTML parser, which wraps it in a <span>
+    [text] = results["test_json_as_html"].fields
+    assert text.data.startswith('{\n    "items"')
+
+
+MIXED_SOURCE = """
+source:
+  - name: test_mixed
+    start: {server}/html/mixed.html
+    navigate:
+      - selector: //ul/li/a/@href
+        ftype: html
+    extract:
+      ftype: mixed
+      fields:
+        - name: title
+          selector: title
+        - name: heading
+          selector: //h1
+"""
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+def test_dispatcher_sniffs_mixed_documents(test_server, tmp_path, fetch_spy, engine):
+    """Test that each mixed URL goes to the parser its response calls for, in one request."""
+    path = tmp_path / "mixed.yml"
+    path.write_text(MIXED_SOURCE.format(server=test_server))
+
+    d = Dispatcher(path=str(path), source_name="test_mixed", no_track=True, engine=engine)
+    d.execute_jobs()
+
+    results = {r.url.rsplit("/", 1)[1]: r.fields for r in d.results[0].results}
+    # The extensionless feed is served as application/octet-stream
+    assert [f.name for f in results["latest"]] == ["title"] * 3
+    assert [f.name for f in results["pages.pdf"]] == ["content"]
+    assert [(f.name, f.data) for f in results["article_1.html"]] == [
+        ("heading", "Article 1: Introduction to RSS Feeds")
+    ]
+    assert d.navigate.jobs[0].extract_ftype == "mixed"
+    assert set(Counter(fetch_spy.urls()).values()) == {1}
+
+
+CAPPED_SOURCE = """
+settings:
+  crawl: {crawl}
+  workers: 1
+  async:
+    concurrency: 1
+source:
+  - name: test_capped
+    start: {server}/html/home.html
+    navigate:
+      - selector: //ul/li/a/@href
+        ftype: html
+      - selector: //a/@href
+        ftype: html
+        must_contain: [appendix]
+        max_items: 1
+        max_items_scope: step
+    extract:
+      ftype: html
+      fields:
+        - name: title
+          selector: //h1
+"""
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+@pytest.mark.parametrize("crawl", ["batch", "stream"])
+def test_dispatcher_stops_step_at_max_items(test_server, tmp_path, fetch_spy, engine, crawl):
+    """Test that a step capped by max_items_scope: step stops fetching its pages."""
+    path = tmp_path / "capped.yml"
+    path.write_text(CAPPED_SOURCE.format(server=test_server, crawl=crawl))
+
+    d = Dispatcher(path=str(path), source_name="test_capped", no_track=True, engine=engine)
+    d.execute_jobs()
+
+    assert [r.url for r in d.results[0].results] == [f"{test_server}/html/article_1_appendix.html"]
+    # One worker: the third listing page was still queued when the cap was reached
+    assert f"{test_server}/html/article_3.html" not in fetch_spy.urls()
+    assert not any("appendix" in url for url in fetch_spy.urls()[:-1])
+
+
+def test_step_stop_judges_pages_in_order():
+    """Test that a step stops at the first page, in page order, that ends it."""
+    from xwebetl.extract.dispatch import StepStop
+
+    known = {"a", "b", "c"}
+    stop = StepStop(mostly_fetched=lambda urls: all(url in known for url in urls))
+    # Page 1 is mostly known but page 0 is still running
+    assert not stop.update([None, ["a", "b"], None])
+    assert stop.update([["x", "y"], ["a", "b"], None])
+    assert stop.pages == 2
+
+    stop = StepStop(max_items=3)
+    assert not stop.update([["x", "y"], None, ["z"]])
+    assert stop.update([["x", "y"], ["y", "w"], ["z"]])
+    assert stop.pages == 2
+
+
+SEEN_SOURCE = """
+settings:
+  crawl: {crawl}
+  workers: 1
+  async:
+    concurrency: 1
+source:
+  - name: test_seen
+    start: {server}/html/home.html
+    navigate:
+      - selector: //ul/li/a/@href
+        ftype: html
+      - selector: //a/@href
+        ftype: html
+        must_contain: [appendix]
+        stop_when_seen: true
+    extract:
+      ftype: html
+      fields:
+        - name: title
+          selector: //h1
+"""
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+@pytest.mark.parametrize("crawl", ["batch", "stream"])
+def test_dispatcher_stops_when_seen(test_server, tmp_path, monkeypatch, fetch_spy, engine, crawl):
+    """Test that a later run stops navigating at the first page whose URLs are tracked."""
+    path = tmp_path / "seen.yml"
+    path.write_text(SEEN_SOURCE.format(server=test_server, crawl=crawl))
+    # Keep the tracking database local to this test
+    monkeypatch.chdir(tmp_path)
+
+    first = Dispatcher(path=str(path), source_name="test_seen", engine=engine)
+    first.execute_jobs()
+    assert len(first.results[0].results) == 3
+
+    fetch_spy.reset()
+    second = Dispatcher(path=str(path), source_name="test_seen", engine=engine)
+    second.execute_jobs()
+
+    assert second.results == []
+    # The first listing page only links tracked URLs; the third was still queued
+    assert f"{test_server}/html/article_3.html" not in fetch_spy.urls()
+    assert not any("appendix" in url for url in fetch_spy.urls())
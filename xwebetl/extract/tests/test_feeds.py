@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import feedparser
+
+from xwebetl.extract.feeds import parse_feed
+from xwebetl.extract.rss import parse_rss
+
+FEED = Path(__file__).parents[3] / "test_server" / "content" / "rss" / "feed.xml"
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example</title>
+  <entry>
+    <title>First post</title>
+    <link rel="self" href="http://example.com/api/1"/>
+    <link rel="alternate" href="http://example.com/1"/>
+    <id>urn:1</id>
+    <author><name>Ada</name></author>
+    <summary>Hello</summary>
+  </entry>
+</feed>
+"""
+
+
+def test_parse_feed_matches_feedparser():
+    """Test that the lxml parser reads the same values as feedparser."""
+    body = FEED.read_bytes()
+    fields = ["title", "link", "description", "published", "guid"]
+
+    fast = parse_feed(body, fields)
+    slow = feedparser.parse(body)
+
+    assert len(fast.entries) == len(slow.entries) == 3
+    for fast_entry, slow_entry in zip(fast.entries, slow.entries):
+        for field in fields:
+            assert fast_entry.get(field) == slow_entry.get(field)
+
+
+def test_parse_feed_reads_atom():
+    """Test Atom entries: alternate link, author name and summary."""
+    feed = parse_feed(ATOM, ["title", "link", "author", "summary", "id"])
+
+    assert feed.entries == [
+        {
+            "title": "First post",
+            "link": "http://example.com/1",
+            "author": "Ada",
+            "summary": "Hello",
+            "id": "urn:1",
+        }
+    ]
+
+
+def test_parse_feed_keeps_only_requested_fields():
+    """Test that fields which weren't asked for are not stored."""
+    feed = parse_feed(FEED.read_bytes(), ["link"])
+
+    assert all(list(entry) == ["link"] for entry in feed.entries)
+
+
+def test_parse_rss_lxml_falls_back_to_feedparser():
+    """Test fallback on malformed XML and on fields lxml doesn't support."""
+    broken = FEED.read_bytes().replace(b"</channel>", b"")
+
+    assert parse_feed(broken, ["link"]) is None
+    assert parse_feed(FEED.read_bytes(), ["tags"]) is None
+    assert parse_feed(b"<html><body>Not a feed</body></html>", ["link"]) is None
+    undeclared = FEED.read_bytes().replace(b"<guid>", b"<dc:creator>Ada</dc:creator><guid>", 1)
+    assert parse_feed(undeclared, ["link"]) is None
+
+    assert parse_rss(broken, url="broken", parser="lxml", fields=["link"]) == parse_rss(
+        broken, url="broken"
+    )
+    feed = parse_rss(FEED.read_bytes(), url="feed", parser="lxml", fields=["tags"])
+    assert isinstance(feed, feedparser.FeedParserDict)
+    assert len(feed.entries) == 3
@@ -0,0 +1,271 @@
+from xwebetl.extract import http
+from xwebetl.extract.http import (
+    configure_session,
+    configure_size_limits,
+    get_session,
+    visit_html,
+    download,
+    NotModified,
+)
+from xwebetl.extract.validators import ValidatorStore, take_validators
+from xwebetl.extract.cache import configure_cache
+from xwebetl.extract.rss import visit_rss
+from xwebetl.source.source_manager import RetryPolicy
+
+
+def test_get_session_is_reused():
+    """Test that the same pooled session is returned within a process."""
+    configure_session()
+    assert get_session() is get_session()
+
+
+def test_configure_session_sets_pool_limits():
+    """Test that pool size and per-host limits reach the mounted adapter."""
+    configure_session(pool_size=3, max_per_host=5, pool_block=True)
+    adapter = get_session().get_adapter("http://localhost")
+
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 5
+    assert adapter._pool_block is True
+
+    configure_session()
+
+
+def test_visit_html_uses_pooled_session(test_server):
+    """Test that visit_html fetches through the shared session."""
+    configure_session()
+    session = get_session()
+
+    html = visit_html(f"{test_server}/html/home.html")
+
+    assert html and "<ul>" in html
+    assert http._session is session
+
+
+def test_visit_html_conditional_not_modified(test_server, tmp_path, monkeypatch):
+    """Test that a revalidated page answers NotModified once its validators are saved."""
+    monkeypatch.chdir(tmp_path)
+    configure_cache()
+    take_validators()
+    url = f"{test_server}/html/home.html"
+
+    first = visit_html(url, conditional=True)
+    # Recorded, but not stored until the caller saves them
+    unsaved = visit_html(url, conditional=True)
+    store = ValidatorStore()
+    for validator in take_validators():
+        store.save(*validator)
+    second = visit_html(url, conditional=True)
+
+    assert first and "<ul>" in first
+    assert unsaved == first
+    assert isinstance(second, NotModified)
+    assert not second
+
+
+def test_validator_store_roundtrip(tmp_path):
+    """Test that stored validators become conditional request headers."""
+    store = ValidatorStore(tmp_path / "validators.db")
+    url = "http://example.com/feed.xml"
+
+    assert store.request_headers(url) == {}
+    store.save(url, None, None)
+    assert store.get(url) == (None, None)
+
+    store.save(url, '"abc"', "Mon, 01 Jan 2024 00:00:00 GMT")
+    assert store.request_headers(url) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert store.delete_by_url(url) == 1
+
+
+def test_visit_rss_uses_pooled_session(test_server):
+    """Test that feeds are fetched through the shared session and parsed from bytes."""
+    configure_cache()
+    configure_session()
+    session = get_session()
+
+    feed = visit_rss(f"{test_server}/rss/feed.xml")
+
+    assert feed is not None and len(feed.entries) > 0
+    assert http._session is session
+
+
+def test_visit_rss_times_out_on_hung_server():
+    """Test that a feed server that never answers can't stall a worker."""
+    import socket
+    import time
+
+    configure_cache()
+    configure_session(timeout=0.5)
+    # Accepts connections (via the backlog) but never sends a response
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    port = server.getsockname()[1]
+    try:
+        started = time.monotonic()
+        feed = visit_rss(f"http://127.0.0.1:{port}/feed.xml", retry=RetryPolicy(max_attempts=1))
+        elapsed = time.monotonic() - started
+    finally:
+        server.close()
+        configure_session()
+
+    assert feed is None
+    assert elapsed < 5
+
+
+def test_visit_html_skips_oversized_response(test_server, caplog):
+    """Test that a body over its ftype's size cap is skipped with a logged reason."""
+    configure_cache()
+    configure_size_limits({"html": 0.0001, "json": None})
+    try:
+        html = visit_html(f"{test_server}/html/home.html")
+        doc = visit_html(f"{test_server}/json/test.json", text=False, ftype="json")
+    finally:
+        configure_size_limits()
+
+    assert html is None
+    assert "exceeds the 104 bytes limit" in caplog.text
+    assert doc
+
+
+def test_copy_body_caps_chunked_response():
+    """Test that a body without Content-Length is cut off once it passes the cap."""
+    from io import BytesIO
+    from unittest.mock import MagicMock
+    import pytest
+
+    response = MagicMock()
+    response.headers = {}
+    response.iter_content.return_value = iter([b"x" * 1024] * 100)
+    out = BytesIO()
+
+    with pytest.raises(http.ResponseTooLarge):
+        http.copy_body(response, out, limit=10 * 1024)
+    assert len(out.getvalue()) == 10 * 1024
+
+    # A caller that already read the first chunk passes the rest as chunks
+    out = BytesIO()
+    http.copy_body(response, out, limit=None, chunks=iter([b"a", b"b"]))
+    assert out.getvalue() == b"ab"
+
+
+def test_download_spools_body(test_server):
+    """Test that download streams a PDF into a temp file, or skips it over the cap."""
+    configure_cache()
+    url = f"{test_server}/files/Test%20PDF.pdf"
+
+    with download(url) as f:
+        assert f.read(5) == b"%PDF-"
+
+    configure_size_limits({"pdf": 0.0001})
+    try:
+        assert download(url) is None
+    finally:
+        configure_size_limits()
+
+
+def test_async_fetcher_skips_oversized_response(test_server):
+    """Test that the async engine enforces the same size cap."""
+    import asyncio
+    from xwebetl.extract.aio import AsyncFetcher
+
+    configure_cache()
+    url = f"{test_server}/html/home.html"
+
+    async def run():
+        async with AsyncFetcher() as fetcher:
+            return (
+                await fetcher.fetch(url, max_bytes=100),
+                await fetcher.fetch(url, max_bytes=1024 * 1024),
+            )
+
+    skipped, html = asyncio.run(run())
+
+    assert skipped is None
+    assert "<ul>" in html
+
+
+def test_async_fetcher_keeps_validators_of_skipped_body(test_server, tmp_path, monkeypatch):
+    """Test that validators are only recorded once the body was actually read."""
+    import asyncio
+    from xwebetl.extract.aio import AsyncFetcher
+
+    monkeypatch.chdir(tmp_path)
+    configure_cache()
+    url = f"{test_server}/html/home.html"
+
+    async def run():
+        async with AsyncFetcher() as fetcher:
+            skipped = await fetcher.fetch(url, conditional=True, max_bytes=100)
+            after_skip = dict(fetcher.validators)
+            html = await fetcher.fetch(url, conditional=True)
+            return skipped, after_skip, html, fetcher.validators
+
+    skipped, after_skip, html, validators = asyncio.run(run())
+
+    assert skipped is None
+    assert after_skip == {}
+    assert "<ul>" in html
+    assert url in validators
+    # Nothing is stored by the fetcher itself
+    assert ValidatorStore().get(url) == (None, None)
+
+
+def test_async_fetcher_decodes_unknown_charset():
+    """Test that an unknown charset falls back to utf-8 instead of failing the crawl."""
+    import asyncio
+    from xwebetl.extract.aio import AsyncFetcher
+
+    class Response:
+        status = 200
+        charset = "no-such-charset"
+        headers = {"Content-Type": "text/html; charset=no-such-charset"}
+        content_length = None
+
+        def raise_for_status(self):
+            pass
+
+        async def read(self):
+            return "<p>café</p>".encode()
+
+    fetcher = AsyncFetcher()
+    html = asyncio.run(fetcher.read("http://example.com/", Response(), True, False, None, None))
+
+    assert html == "<p>café</p>"
+
+
+def test_cached_response_keeps_content_type_and_size_cap(test_server, tmp_path):
+    """Test that a cache hit is sniffed and capped like the live response."""
+    import asyncio
+    from xwebetl.extract.aio import AsyncFetcher
+    from xwebetl.extract.sniff import sniff_ftype
+    from xwebetl.source.source_manager import CacheSettings
+
+    configure_cache(CacheSettings(enabled=True, dir=str(tmp_path / "cache")))
+    url = f"{test_server}/html/mixed.html"
+    try:
+        live = http.fetch_document(url)
+        cached = http.fetch_document(url)
+        assert live.content_type and cached.content_type == live.content_type
+        assert sniff_ftype(b"", cached.content_type, url) == "html"
+
+        configure_size_limits({"html": 0.0001})
+        assert http.fetch_document(url, ftype="html") is None
+        assert http.fetch_document(url) is None
+
+        async def run():
+            async with AsyncFetcher() as fetcher:
+                return (
+                    await fetcher.fetch(url, max_bytes=100),
+                    await fetcher.fetch(url, raw=True),
+                )
+
+        skipped, doc = asyncio.run(run())
+        assert skipped is None
+        assert doc.content_type == live.content_type
+    finally:
+        configure_size_limits()
+        configure_cache()
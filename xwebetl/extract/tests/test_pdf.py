@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from xwebetl.extract.pdf import select_pages, extract_file, save_temp
+from xwebetl.source.source_manager import PdfOptions, parse_page_ranges
+
+PDF = Path(__file__).parents[3] / "test_server" / "content" / "files" / "pages.pdf"
+
+
+def test_select_pages():
+    """Test that page ranges are 1-based, clipped to the document and capped."""
+    assert select_pages(5, PdfOptions()) == [0, 1, 2, 3, 4]
+    assert select_pages(5, PdfOptions(max_pages=2)) == [0, 1]
+    assert select_pages(10, PdfOptions(pages=parse_page_ranges("8-, 2-3, 3"))) == [1, 2, 7, 8, 9]
+    assert select_pages(4, PdfOptions(pages=parse_page_ranges("2-20"), max_pages=2)) == [1, 2]
+    assert select_pages(3, PdfOptions(pages=parse_page_ranges("5-"))) == []
+
+
+def test_extract_file_from_saved_copy():
+    """Test that a PDF saved for splitting can be read back page by page."""
+    path = save_temp(PDF.read_bytes())
+    try:
+        pages = extract_file(path, [1, 4])
+    finally:
+        Path(path).unlink()
+
+    assert [index for index, _ in pages] == [1, 4]
+    assert all("This is a pdf" in text for _, text in pages)
@@ -0,0 +1,198 @@
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import requests
+
+from xwebetl.extract import http
+from xwebetl.extract.cache import configure_cache
+from xwebetl.extract.retry import (
+    backoff_delay,
+    parse_retry_after,
+    take_retry_count,
+    scheduled_attempt,
+    RetryLater,
+)
+from xwebetl.source.source_manager import RetryPolicy
+
+
+def fake_response(status, headers=None, text="<html></html>"):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.text = text
+    response.content = text.encode()
+    response.iter_content.return_value = [text.encode()]
+    response.encoding = "utf-8"
+    response.__enter__.return_value = response
+    if status >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(str(status))
+    return response
+
+
+def test_backoff_grows_exponentially_and_is_capped():
+    """Test that backoff doubles per attempt up to max_backoff without jitter."""
+    policy = RetryPolicy(backoff=1, max_backoff=5, jitter=0)
+
+    assert [backoff_delay(policy, attempt) for attempt in (1, 2, 3, 4)] == [1, 2, 4, 5]
+
+
+def test_backoff_jitter_stays_in_range():
+    """Test that jitter only ever shortens the delay, by at most the jitter fraction."""
+    policy = RetryPolicy(backoff=2, jitter=0.5)
+
+    delays = [backoff_delay(policy, 1) for _ in range(100)]
+    assert all(1 <= delay <= 2 for delay in delays)
+
+
+def test_retry_after_takes_precedence():
+    """Test that Retry-After (seconds or HTTP date) overrides the backoff, capped."""
+    policy = RetryPolicy(backoff=1, max_backoff=30, jitter=0)
+    future = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=20), usegmt=True)
+
+    assert backoff_delay(policy, 1, "7") == 7
+    assert 15 < backoff_delay(policy, 1, future) <= 20
+    assert backoff_delay(policy, 1, "3600") == 30
+    assert parse_retry_after("soon") is None
+
+
+def test_visit_html_retries_transient_failures(mocker):
+    """Test that 503s and connection errors are retried until the page loads."""
+    configure_cache()
+    sleep = mocker.patch("xwebetl.extract.http.time.sleep")
+    session = MagicMock()
+    session.get.side_effect = [
+        fake_response(503, {"Retry-After": "2"}),
+        requests.exceptions.ConnectionError("reset"),
+        fake_response(200, text="<html>ok</html>"),
+    ]
+    mocker.patch("xwebetl.extract.http.get_session", return_value=session)
+    take_retry_count()
+
+    html = http.visit_html("http://example.com/", retry=RetryPolicy(jitter=0))
+
+    assert html == "<html>ok</html>"
+    assert session.get.call_count == 3
+    assert sleep.call_args_list[0].args == (2.0,)
+    assert take_retry_count() == 2
+
+
+def test_scheduled_attempt_defers_retry_to_scheduler(mocker):
+    """Test that a scheduled task's failed request raises RetryLater instead of sleeping."""
+    import pickle
+    import pytest
+
+    configure_cache()
+    sleep = mocker.patch("xwebetl.extract.http.time.sleep")
+    session = MagicMock()
+    session.get.return_value = fake_response(503, {"Retry-After": "2"})
+    mocker.patch("xwebetl.extract.http.get_session", return_value=session)
+    policy = RetryPolicy(max_attempts=3, jitter=0)
+    take_retry_count()
+
+    with scheduled_attempt(1), pytest.raises(RetryLater) as raised:
+        http.visit_html("http://example.com/", retry=policy)
+    # The last attempt gives up like an unscheduled request
+    with scheduled_attempt(3):
+        assert http.visit_html("http://example.com/", retry=policy) is None
+
+    assert raised.value.delay == 2.0
+    assert pickle.loads(pickle.dumps(raised.value)).delay == 2.0
+    assert session.get.call_count == 2
+    assert take_retry_count() == 1
+    sleep.assert_not_called()
+
+
+def test_visit_html_does_not_retry_client_errors(mocker):
+    """Test that a 404 fails immediately and gives up after max_attempts."""
+    configure_cache()
+    mocker.patch("xwebetl.extract.http.time.sleep")
+    session = MagicMock()
+    session.get.return_value = fake_response(404)
+    mocker.patch("xwebetl.extract.http.get_session", return_value=session)
+
+    assert http.visit_html("http://example.com/missing") is None
+    assert session.get.call_count == 1
+
+    session.get.reset_mock()
+    session.get.return_value = fake_response(503)
+    assert http.visit_html("http://example.com/down", retry=RetryPolicy(max_attempts=2)) is None
+    assert session.get.call_count == 2
+
+
+def test_async_fetcher_retries_transient_failures():
+    """Test that the async engine retries a 503 and counts the retry per URL."""
+    import asyncio
+    from aiohttp import web
+    from xwebetl.extract.aio import AsyncFetcher
+
+    configure_cache()
+    calls = []
+
+    async def flaky(request):
+        calls.append(request.path)
+        if len(calls) == 1:
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        return web.Response(text="<html>ok</html>", content_type="text/html")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/page", flaky)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            async with AsyncFetcher() as fetcher:
+                url = f"http://127.0.0.1:{port}/page"
+                body = await fetcher.fetch(url, retry=RetryPolicy(backoff=0.01))
+                return body, fetcher.retries[url]
+        finally:
+            await runner.cleanup()
+
+    body, retries = asyncio.run(run())
+
+    assert body == "<html>ok</html>"
+    assert len(calls) == 2
+    assert retries == 1
+
+
+def test_async_fetcher_returns_retry_later_for_scheduled_attempt():
+    """Test that a scheduled async fetch hands its retry back instead of sleeping."""
+    import asyncio
+    from aiohttp import web
+    from xwebetl.extract.aio import AsyncFetcher
+
+    configure_cache()
+    calls = []
+
+    async def down(request):
+        calls.append(request.path)
+        return web.Response(status=503, headers={"Retry-After": "5"})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/page", down)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            async with AsyncFetcher() as fetcher:
+                url = f"http://127.0.0.1:{port}/page"
+                policy = RetryPolicy(max_attempts=2)
+                return (
+                    await fetcher.fetch(url, retry=policy, attempt=1),
+                    await fetcher.fetch(url, retry=policy, attempt=2),
+                )
+        finally:
+            await runner.cleanup()
+
+    first, last = asyncio.run(run())
+
+    assert isinstance(first, RetryLater)
+    assert first.delay == 5.0
+    assert last is None
+    assert len(calls) == 2
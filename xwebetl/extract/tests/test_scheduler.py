@@ -0,0 +1,214 @@
+from xwebetl.extract.scheduler import Scheduler, run_scheduled
+from xwebetl.extract.ratelimit import HostLimiter
+from xwebetl.source.source_manager import RateLimit
+import pytest
+
+
+def drain(scheduler: Scheduler) -> list:
+    tasks = []
+    while scheduler:
+        tasks.append(scheduler.pop())
+    return tasks
+
+
+def test_scheduler_round_robins_between_jobs():
+    """Test that tasks from different jobs are interleaved instead of run job by job."""
+    scheduler = Scheduler()
+    for i in range(3):
+        scheduler.push(f"a{i}", key="a")
+    for i in range(2):
+        scheduler.push(f"b{i}", key="b")
+    scheduler.push("c0", key="c")
+
+    assert drain(scheduler) == ["a0", "b0", "c0", "a1", "b1", "a2"]
+
+
+def test_scheduler_serves_higher_priority_first():
+    """Test that higher priority jobs are served before lower ones."""
+    scheduler = Scheduler()
+    scheduler.push("low0", key="low", priority=0)
+    scheduler.push("high0", key="high", priority=5)
+    scheduler.push("low1", key="low", priority=0)
+    scheduler.push("high1", key="high", priority=5)
+
+    assert drain(scheduler) == ["high0", "high1", "low0", "low1"]
+
+
+def test_scheduler_accepts_work_while_draining():
+    """Test that follow-up tasks pushed during a run are picked up fairly."""
+    scheduler = Scheduler()
+    scheduler.push("a0", key="a")
+    scheduler.push("b0", key="b")
+
+    assert scheduler.pop() == "a0"
+    scheduler.push("a1", key="a")
+    assert len(scheduler) == 2
+    assert drain(scheduler) == ["b0", "a1"]
+    assert scheduler.pop() is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_host_limiter_token_bucket():
+    """Test that requests to a host are spaced by its requests_per_second."""
+    clock = FakeClock()
+    limiter = HostLimiter(clock=clock)
+    limit = RateLimit(requests_per_second=2, burst=1)
+
+    assert limiter.acquire("a.com", limit) is True
+    limiter.release("a.com")
+    assert limiter.acquire("a.com", limit) is False
+    assert limiter.delay() == pytest.approx(0.5)
+
+    # Other hosts are not affected
+    assert limiter.acquire("b.com", limit) is True
+
+    clock.now = 0.5
+    assert limiter.acquire("a.com", limit) is True
+
+
+def test_host_limiter_max_concurrent():
+    """Test that no more than max_concurrent requests run against one host."""
+    limiter = HostLimiter()
+    limit = RateLimit(max_concurrent=2)
+
+    assert limiter.acquire("a.com", limit) is True
+    assert limiter.acquire("a.com", limit) is True
+    assert limiter.acquire("a.com", limit) is False
+
+    limiter.release("a.com")
+    assert limiter.acquire("a.com", limit) is True
+
+
+def test_host_limiter_applies_to_unlimited_requests():
+    """Test that a host's limit also holds requests of sources without one."""
+    limiter = HostLimiter(clock=FakeClock())
+    limiter.acquire("a.com", RateLimit(max_concurrent=1))
+
+    assert limiter.acquire("a.com", None) is False
+    limiter.release("a.com")
+    assert limiter.acquire("a.com", None) is True
+    # Hosts nobody limited stay unlimited
+    assert limiter.acquire("b.com", None) is True
+    assert limiter.acquire("b.com", None) is True
+
+
+def test_scheduler_limits_host_from_first_push():
+    """Test that unlimited tasks queued before a limited one wait for its host's limit."""
+    scheduler = Scheduler(HostLimiter(clock=FakeClock()))
+    scheduler.push("a0", key="a", url="http://slow.com/0")
+    scheduler.push("a1", key="a", url="http://slow.com/1")
+    scheduler.push("b0", key="b", url="http://slow.com/2", limit=RateLimit(requests_per_second=1))
+
+    assert scheduler.pop() == "a0"
+    assert scheduler.pop() is None
+    assert len(scheduler) == 2
+
+
+def test_scheduler_skips_throttled_hosts():
+    """Test that a throttled host doesn't block other jobs' tasks."""
+    scheduler = Scheduler(HostLimiter(clock=FakeClock()))
+    limit = RateLimit(requests_per_second=1)
+    scheduler.push("a0", key="a", url="http://slow.com/0", limit=limit)
+    scheduler.push("a1", key="a", url="http://slow.com/1", limit=limit)
+    scheduler.push("b0", key="b", url="http://fast.com/0")
+
+    assert scheduler.pop() == "a0"
+    assert scheduler.pop() == "b0"
+    assert scheduler.pop() is None
+    assert len(scheduler) == 1
+    assert scheduler.delay() == pytest.approx(1.0)
+
+
+def test_scheduler_cancel_drops_queued_and_later_tasks():
+    """Test that cancelled tasks are removed from the queue and never queued again."""
+    scheduler = Scheduler()
+    for i in range(3):
+        scheduler.push(f"a{i}", key="a")
+    scheduler.push("b0", key="b", priority=1)
+
+    assert scheduler.cancel(lambda task: task.startswith("a")) == 3
+    scheduler.push("a3", key="a")
+    scheduler.push("b1", key="b")
+
+    assert len(scheduler) == 2
+    assert drain(scheduler) == ["b0", "b1"]
+    assert scheduler.queues == {}
+
+
+def test_scheduler_holds_retries_until_not_before():
+    """Test that a delayed retry waits for its time, then for its host's token."""
+    import time
+
+    clock = FakeClock()
+    scheduler = Scheduler(HostLimiter(clock=clock))
+    limit = RateLimit(requests_per_second=1)
+    scheduler.push("a0", key="a", url="http://slow.com/0", limit=limit)
+    scheduler.push("retry", key="a", url="http://slow.com/1", not_before=time.monotonic() + 0.1)
+    scheduler.push("b0", key="b")
+
+    assert scheduler.pop() == "a0"
+    assert scheduler.pop() == "b0"
+    assert scheduler.pop() is None
+    assert len(scheduler) == 1
+    assert 0 < scheduler.delay() <= 0.1
+
+    time.sleep(0.1)
+    # Due now, but the host's only token went to a0
+    assert scheduler.pop() is None
+    clock.now += 1
+    assert scheduler.pop() == "retry"
+    assert not scheduler
+
+
+def test_scheduler_cancel_drops_delayed_tasks():
+    """Test that cancel also drops retries that are waiting for their backoff."""
+    import time
+
+    scheduler = Scheduler()
+    scheduler.push("a0", key="a", not_before=time.monotonic() + 60)
+    scheduler.push("b0", key="b", not_before=time.monotonic() + 60)
+
+    assert scheduler.cancel(lambda task: task == "a0") == 1
+    assert len(scheduler) == 1
+    assert [task for _, _, _, _, (task, _, _) in scheduler.delayed] == ["b0"]
+
+
+def test_run_scheduled_cancels_tasks_not_started():
+    """Test that tasks cancelled by on_result are skipped, unless already running."""
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+    import time
+
+    scheduler = Scheduler()
+    for i in range(6):
+        scheduler.push(i, key="pages")
+    started = threading.Event()
+    ran, results = [], []
+
+    def fn(task):
+        ran.append(task)
+        if task == 1:
+            # Keep the only worker busy so task 2 waits in the executor's queue
+            started.set()
+            time.sleep(0.2)
+        return task
+
+    def on_result(task, result):
+        results.append(result)
+        if task == 0:
+            started.wait(5)
+            scheduler.cancel(lambda other: other > 0)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        run_scheduled(scheduler, executor, fn, on_result, max_in_flight=3)
+
+    assert ran == [0, 1]
+    assert results == [0, 1]
+    assert not scheduler
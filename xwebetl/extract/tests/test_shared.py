@@ -0,0 +1,29 @@
+from collections import Counter
+
+from xwebetl.extract.shared import SharedDocuments, FETCH, WAIT, BODY
+
+
+def test_shared_documents_single_flight():
+    """Test that one task fetches, concurrent ones wait, later ones get the body."""
+    shared = SharedDocuments(Counter({"feed": 3, "page": 1}))
+
+    assert shared.request("page", "a") == (None, None)
+    assert shared.request("feed", "a") == (FETCH, None)
+    assert shared.request("feed", "b") == (WAIT, None)
+
+    assert shared.complete("feed", b"<rss/>") == ["b"]
+    assert shared.request("feed", "b") == (BODY, b"<rss/>")
+    assert shared.request("feed", "c") == (BODY, b"<rss/>")
+    # Every expected task was served: the body is released
+    assert shared.bodies == {}
+    assert shared.request("feed", "d") == (None, None)
+
+
+def test_shared_documents_failed_fetch():
+    """Test that after a failed download the waiting tasks fetch on their own."""
+    shared = SharedDocuments(Counter({"feed": 3}))
+    assert shared.request("feed", "a") == (FETCH, None)
+    assert shared.request("feed", "b") == (WAIT, None)
+
+    assert shared.complete("feed", None) == ["b"]
+    assert shared.request("feed", "b") == (None, None)
@@ -0,0 +1,26 @@
+from xwebetl.extract.sniff import sniff_ftype
+
+
+def test_sniff_magic_bytes_win():
+    """Test that the body decides over a misleading header or extension."""
+    assert sniff_ftype(b"%PDF-1.7\n...", "application/octet-stream", "http://x/report") == "pdf"
+    assert sniff_ftype(b'\xef\xbb\xbf  {"items": []}', "text/html", "http://x/api") == "json"
+    assert sniff_ftype(b"[1, 2]", None, "http://x/list.html") == "json"
+    feed = b'<?xml version="1.0"?>\n<!-- generated -->\n<rss version="2.0"><channel>'
+    assert sniff_ftype(feed, "text/html", "http://x/latest") == "rss"
+    assert sniff_ftype(b'<feed xmlns="http://www.w3.org/2005/Atom">', None, "http://x/a") == "rss"
+    assert sniff_ftype(b"<rdf:RDF xmlns:rdf='...'>", None, "http://x/a") == "rss"
+    assert sniff_ftype(b"<!DOCTYPE html><html>", "application/xml", "http://x/feed.xml") == "html"
+    assert sniff_ftype(b"\n<html><head>", None, "http://x/feed.rss") == "html"
+
+
+def test_sniff_falls_back_to_header_then_extension():
+    """Test that ambiguous bodies use the Content-Type, then the URL."""
+    fragment = b"<div>Hello</div>"
+    assert sniff_ftype(fragment, "text/html; charset=utf-8", "http://x/a.json") == "html"
+    assert sniff_ftype(b"", "application/rss+xml", "http://x/a") == "rss"
+    assert sniff_ftype(b"", "application/vnd.api+json", "http://x/a") == "json"
+    assert sniff_ftype(b"", "application/pdf", "http://x/a") == "pdf"
+    assert sniff_ftype(fragment, None, "http://x/a.xml") == "rss"
+    assert sniff_ftype(b"", "application/octet-stream", "http://x/a.pdf") == "pdf"
+    assert sniff_ftype(b"", None, "http://x/page") == "html"
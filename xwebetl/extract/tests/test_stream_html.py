@@ -0,0 +1,102 @@
+from lxml import html as lxml_html
+
+from xwebetl.extract.stream_html import StreamingExtractor, streamable
+from xwebetl.source.source_manager import Field
+
+PAGE = b"""<html><head><title>Page</title></head><body>
+<h1>Headline <b>news</b></h1>
+<div id="article-body"><p>First</p><p>Second <a href="/next">next</a></p></div>
+"""
+FILLER = b"<p>" + b"filler text " * 1000 + b"</p>\n"
+
+
+def chunks(body: bytes, size: int = 4096):
+    for i in range(0, len(body), size):
+        yield body[i : i + size]
+
+
+def stream(fields: list[Field], body: bytes) -> tuple[dict, int]:
+    """Feed body until the extractor is done; return values and bytes fed."""
+    extractor = StreamingExtractor(fields)
+    fed = 0
+    for chunk in chunks(body):
+        fed += len(chunk)
+        if extractor.feed(chunk):
+            break
+    return extractor.close(), fed
+
+
+def parse(fields: list[Field], body: bytes) -> dict:
+    """Values as Dispatcher.html_parse would extract them from the full page."""
+    tree = lxml_html.fromstring(body)
+    values = {}
+    for field in fields:
+        for xpath in field.xpaths:
+            data = xpath(tree)
+            if data:
+                value = data[0] if isinstance(data[0], str) else data[0].text_content()
+                values[field.name] = value.strip()
+                break
+    return values
+
+
+def test_stops_once_all_fields_are_found():
+    body = PAGE + FILLER * 100 + b"</body></html>"
+    fields = [
+        Field(name="title", selector="/html/body/h1"),
+        Field(name="body", selector="//div[@id='article-body']"),
+        Field(name="link", selector="//div[@id='article-body']/p[2]/a/@href"),
+    ]
+
+    values, fed = stream(fields, body)
+
+    assert values == parse(fields, body)
+    assert values["title"] == "Headline news"
+    assert fed < len(body) / 10
+
+
+def test_waits_for_element_to_close():
+    """A match is only taken once its element can no longer grow."""
+    body = b"<html><body><h1>Head" + b"<span>filler</span>" * 5000 + b"line</h1><p>after</p></body></html>"
+    fields = [Field(name="title", selector="//h1")]
+
+    values, _ = stream(fields, body)
+
+    assert values == parse(fields, body)
+    assert values["title"].endswith("line")
+
+
+def test_falls_back_to_later_alternative():
+    body = PAGE + FILLER * 10 + b"</body></html>"
+    fields = [
+        Field(name="body", selector="//div[@id='lol-body']|//div[@id='article-body']"),
+        Field(name="missing", selector="//table"),
+    ]
+
+    values, fed = stream(fields, body)
+
+    assert values == parse(fields, body)
+    assert "missing" not in values
+    assert fed == len(body)
+
+
+def test_unsafe_selectors_use_full_page():
+    body = PAGE + b"<ul><li>a</li><li>b</li></ul></body></html>"
+    fields = [
+        Field(name="last", selector="//li[last()]"),
+        Field(name="with_link", selector="//p[a]"),
+        Field(name="text", selector="//p[contains(., 'Second')]"),
+    ]
+
+    assert not any(streamable(field) for field in fields)
+    values, _ = stream(fields, body)
+    assert values == parse(fields, body)
+    assert values["last"] == "b"
+
+
+def test_streamable_selectors():
+    assert streamable(Field(name="a", selector="//div[@id='x']/p[4]/a/@href"))
+    assert streamable(Field(name="a", selector="//div[contains(@class, 'post')]"))
+    assert streamable(Field(name="a", selector="body > h1", engine="css"))
+    assert not streamable(Field(name="a", selector="//p[text()='x']"))
+    assert not streamable(Field(name="a", selector="//h1/following-sibling::p"))
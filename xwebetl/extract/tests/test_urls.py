@@ -0,0 +1,45 @@
+from xwebetl.extract.urls import canonicalize, dedupe
+from xwebetl.source.source_manager import UrlSettings
+
+
+def test_canonicalize():
+    """Test that URL variants of the same page map to one canonical URL."""
+    settings = UrlSettings(canonicalize=True)
+    canonical = "https://example.com/news/a?id=1&page=2"
+    for variant in [
+        "https://example.com/news/a?id=1&page=2",
+        "HTTPS://Example.COM:443/news/a?page=2&id=1",
+        "https://example.com/news/a?id=1&utm_source=feed&page=2#comments",
+        "https://example.com/news/a?fbclid=x&id=1&page=2",
+    ]:
+        assert canonicalize(variant, settings) == canonical
+
+    # Path case and parameter encoding are kept, an empty path becomes /
+    assert canonicalize("http://Example.com/A%2Fb?q=a+b", settings) == "http://example.com/A%2Fb?q=a+b"
+    assert canonicalize("http://example.com", settings) == "http://example.com/"
+    assert canonicalize("http://example.com:8080/a/", settings) == "http://example.com:8080/a/"
+
+
+def test_canonicalize_options():
+    """Test that each rule can be turned off, and nothing changes when disabled."""
+    url = "https://Example.com/a/?b=2&utm_campaign=x&a=1#top"
+    assert canonicalize(url, UrlSettings()) == url
+    assert (
+        canonicalize(url, UrlSettings(canonicalize=True, strip_trailing_slash=True))
+        == "https://example.com/a?a=1&b=2"
+    )
+    assert (
+        canonicalize(
+            url,
+            UrlSettings(canonicalize=True, strip_fragment=False, sort_query=False, drop_params=["a", "b"]),
+        )
+        == "https://example.com/a/?utm_campaign=x#top"
+    )
+
+
+def test_dedupe_keeps_first_seen_order():
+    """Test that repeats are dropped in order, across calls sharing a seen set."""
+    seen = set()
+    assert dedupe(["b", "a", "b", "c", "a"], seen) == ["b", "a", "c"]
+    assert dedupe(["c", "d", "d"], seen) == ["d"]
+    assert dedupe([]) == []
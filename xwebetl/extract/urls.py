@@ -0,0 +1,82 @@
+"""URL canonicalization and order-preserving deduplication.
+
+The same page is often linked from several listing pages or feeds under
+slightly different URLs (a fragment, utm_* tracking parameters, a trailing
+slash, an upper-case host). The canonical form of the URLs found during
+navigation is the key they are deduplicated and tracked under, so those
+variants are fetched once per run and recognised by the RunTracker on later
+runs. The URL fetched is still the one linked, since the canonical form may
+not serve the same page.
+"""
+
+from fnmatch import fnmatchcase
+from typing import Callable
+from urllib.parse import urlsplit, urlunsplit, unquote_plus
+
+from xwebetl.source.source_manager import UrlSettings
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def canonicalize(url: str, settings: UrlSettings) -> str:
+    """Canonical form of an absolute URL, or the URL itself if disabled.
+
+    Scheme and host are lower-cased and a default port is dropped. Depending
+    on the settings the fragment is removed, query parameters matching
+    `drop_params` are dropped, the remaining ones sorted, and a trailing slash
+    stripped from the path. Parameters are kept as written, so their encoding
+    is never changed.
+    """
+    if not settings.canonicalize:
+        return url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = canonical_netloc(parts.netloc, scheme)
+
+    path = parts.path or "/"
+    if settings.strip_trailing_slash and len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    params = [param for param in parts.query.split("&") if param]
+    if settings.drop_params:
+        params = [param for param in params if not dropped(param, settings.drop_params)]
+    if settings.sort_query:
+        params.sort()
+
+    fragment = "" if settings.strip_fragment else parts.fragment
+    return urlunsplit((scheme, netloc, path, "&".join(params), fragment))
+
+
+def canonical_netloc(netloc: str, scheme: str) -> str:
+    userinfo, at, host = netloc.rpartition("@")
+    host = host.lower()
+    if host.endswith(":" + DEFAULT_PORTS.get(scheme, "")):
+        host = host.rsplit(":", 1)[0]
+    return userinfo + at + host
+
+
+def dropped(param: str, patterns: list[str]) -> bool:
+    name = unquote_plus(param.split("=", 1)[0])
+    return any(fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def dedupe(
+    urls: list[str], seen: set[str] | None = None, key: Callable[[str], str] | None = None
+) -> list[str]:
+    """URLs without repeats, in first-seen order.
+
+    Args:
+        urls: URLs to deduplicate
+        seen: Keys of URLs already handed out earlier in the run; updated in place
+        key: Maps a URL to what makes it a repeat, e.g. its canonical form;
+            the URL itself by default
+    """
+    if seen is None:
+        seen = set()
+    unique = []
+    for url in urls:
+        url_key = key(url) if key else url
+        if url_key not in seen:
+            seen.add(url_key)
+            unique.append(url)
+    return unique
@@ -0,0 +1,104 @@
+from pathlib import Path
+from datetime import datetime
+import sqlite3
+
+# Validators of responses fetched by this process since the last
+# take_validators(), as (url, etag, last_modified)
+_pending: list[tuple[str, str | None, str | None]] = []
+
+
+def record_validators(url: str, etag: str | None, last_modified: str | None) -> None:
+    """Remember a response's validators until the caller can save them.
+
+    They are only stored once the job's results are recorded: saved any
+    earlier, a failed run would turn into a 304 on the next one.
+    """
+    if etag or last_modified:
+        _pending.append((url, etag, last_modified))
+
+
+def take_validators() -> list[tuple[str, str | None, str | None]]:
+    """Return and reset the validators recorded by this process."""
+    global _pending
+    pending, _pending = _pending, []
+    return pending
+
+
+class ValidatorStore:
+    """Persists ETag / Last-Modified validators per URL for conditional GETs.
+
+    Lives next to the fetch tracking database (data/validators.db). It is
+    read by whichever process performs the fetch and written by the
+    Dispatcher once a job's results are recorded (see record_validators).
+    """
+
+    def __init__(self, db_path: str | Path = None):
+        if db_path is None:
+            project_root = Path.cwd()
+            db_path = project_root / "data" / "validators.db"
+        else:
+            db_path = Path(db_path)
+
+        # Ensure data directory exists
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.db_path = db_path
+        self._create_table()
+
+    def _create_table(self) -> None:
+        """Create the validators table if it doesn't exist."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS validators (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    updated TEXT NOT NULL
+                )
+                """
+            )
+            conn.commit()
+
+    def get(self, url: str) -> tuple[str | None, str | None]:
+        """Return the stored (etag, last_modified) for a URL."""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified FROM validators WHERE url = ?", (url,)
+            ).fetchone()
+        return row if row else (None, None)
+
+    def request_headers(self, url: str) -> dict[str, str]:
+        """Conditional request headers for a URL, empty if nothing is stored."""
+        etag, last_modified = self.get(url)
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def save(self, url: str, etag: str | None, last_modified: str | None) -> None:
+        """Store the validators from a successful response.
+
+        Responses without any validator are ignored.
+        """
+        if not etag and not last_modified:
+            return
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO validators (url, etag, last_modified, updated) VALUES (?, ?, ?, ?)",
+                (url, etag, last_modified, datetime.now().isoformat()),
+            )
+            conn.commit()
+
+    def delete_by_url(self, url: str) -> int:
+        """Forget the validators of a URL so the next fetch is unconditional.
+
+        Returns:
+            Number of rows deleted
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute("DELETE FROM validators WHERE url = ?", (url,))
+            conn.commit()
+            return cursor.rowcount
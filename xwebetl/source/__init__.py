@@ -1,6 +1,6 @@
 """Source module - Source configuration and data management."""
 
-from xwebetl.source.source_manager import Source, Job, Nav, Field
+from xwebetl.source.source_manager import Source, Job, Nav, Field, Settings, HttpSettings, AsyncSettings, CacheSettings, PdfSettings, PdfOptions, TrackingSettings, UrlSettings, RateLimit, RetryPolicy
 from xwebetl.source.data_manager import DataManager
 
-__all__ = ["Source", "Job", "Nav", "Field", "DataManager"]
+__all__ = ["Source", "Job", "Nav", "Field", "Settings", "HttpSettings", "AsyncSettings", "CacheSettings", "PdfSettings", "PdfOptions", "TrackingSettings", "UrlSettings", "RateLimit", "RetryPolicy", "DataManager"]
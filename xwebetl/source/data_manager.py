@@ -86,6 +86,13 @@ class DataManager:
             filename = f"{filename}.json"
 
         file_path = directory / filename
+        jsonl_path = file_path.with_suffix(".jsonl")
+        # Results streamed during extraction (raw_format: jsonl), if newer
+        if jsonl_path.exists() and (
+            not file_path.exists() or jsonl_path.stat().st_mtime > file_path.stat().st_mtime
+        ):
+            return self.load_jsonl(jsonl_path.stem, layer)
+
         if not file_path.exists():
             logger.warning(f"JSON file not found: {file_path}")
             return None
@@ -93,6 +100,52 @@ class DataManager:
         with open(file_path, "r", encoding="utf-8") as f:
             return json.load(f)
 
+    # JSON Lines operations
+    def jsonl_path(self, filename: str, layer: str = "raw") -> Path:
+        """Path of a JSON Lines file, creating its directory.
+
+        Args:
+            filename: Name of the file (with or without .jsonl extension)
+            layer: Data layer - "raw", "silver", or "gold"
+        """
+        directory = self.ensure_dir(getattr(self, f"{layer}_dir"))
+        if not filename.endswith(".jsonl"):
+            filename = f"{filename}.jsonl"
+        return directory / filename
+
+    def iter_jsonl(self, filename: str, layer: str = "raw"):
+        """Iterate over the records of a JSON Lines file without loading it whole.
+
+        Yields:
+            One decoded object per line
+        """
+        file_path = self.jsonl_path(filename, layer)
+        if not file_path.exists():
+            logger.warning(f"JSON Lines file not found: {file_path}")
+            return
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def load_jsonl(self, filename: str, layer: str = "raw") -> dict | None:
+        """Load streamed extraction results in the same shape as save_json writes.
+
+        The first line holds the source name and extraction date, every other
+        line one page: {"url": ..., "entries": [...]}.
+
+        Returns:
+            {"source", "extraction_date", "result": {url: entries}} or None if
+            the file doesn't exist
+        """
+        records = self.iter_jsonl(filename, layer)
+        header = next(records, None)
+        if header is None:
+            return None
+        result = {record["url"]: record["entries"] for record in records}
+        return {**header, "result": result}
+
     def iter_jsons(self, directory: Path | None = None):
         """Iterate over all JSON files in a directory.
 
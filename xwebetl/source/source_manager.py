@@ -1,14 +1,134 @@
 from __future__ import annotations
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from collections import Counter
+from functools import lru_cache
+from lxml import etree
+import logging
+import re
 import yaml
 from xwebetl.source.data_manager import DataManager
 
+logger = logging.getLogger(__name__)
+
+
+SELECTOR_ENGINES = ("xpath", "css")
+CSS_PREFIX = "css:"
+# Trailing ::text or ::attr(name) on a CSS selector, as in Scrapy/parsel
+CSS_PSEUDO = re.compile(r"^(?P<css>.*?)::(?:(?P<text>text)|attr\((?P<attr>[^)]+)\))\s*$", re.S)
+
+
+def parse_selector(selector: str, engine: str | None = None) -> tuple[str, str]:
+    """Resolve a configured selector to (selector, engine).
+
+    A "css:" prefix selects the CSS engine and is stripped from the selector.
+    """
+    if selector.startswith(CSS_PREFIX):
+        return selector[len(CSS_PREFIX):].strip(), "css"
+    engine = engine or "xpath"
+    if engine not in SELECTOR_ENGINES:
+        raise ValueError(
+            f"Unknown selector engine '{engine}'. Available engines: {', '.join(SELECTOR_ENGINES)}"
+        )
+    return selector, engine
+
+
+def split_css(selector: str) -> tuple[str, str | None]:
+    """Split a CSS selector into the element selector and what to read from it.
+
+    Returns:
+        (css, what) where what is None (the element), "text" (its direct
+        text) or "@name" (the value of attribute name)
+    """
+    match = CSS_PSEUDO.match(selector)
+    if not match:
+        return selector.strip(), None
+    if match.group("text"):
+        return match.group("css").strip(), "text"
+    return match.group("css").strip(), "@" + match.group("attr").strip()
+
+
+def css_to_xpath(selector: str) -> str:
+    try:
+        from cssselect import HTMLTranslator
+    except ImportError:
+        raise ImportError(
+            "CSS selectors on the lxml engine require cssselect. "
+            "Install it with: pip install 'xwebetl[css]'"
+        )
+    css, what = split_css(selector)
+    xpath = HTMLTranslator().css_to_xpath(css)
+    if what == "text":
+        return f"{xpath}/text()"
+    if what:
+        return f"{xpath}/{what}"
+    return xpath
+
+
+@lru_cache(maxsize=1024)
+def compile_xpaths(selector: str, engine: str = "xpath") -> tuple[etree.XPath, ...]:
+    """Compile a selector's `|`-separated fallback XPaths, once per process.
+
+    CSS selectors are translated to a single XPath with cssselect.
+    """
+    if engine == "css":
+        return (etree.XPath(css_to_xpath(selector)),)
+    return tuple(etree.XPath(sel) for sel in selector.split("|"))
+
+
+class CompiledSelector:
+    """Mixin giving a dataclass with a `selector` lazily compiled XPaths.
+
+    The compiled objects can't be pickled, so they are dropped when a Job or
+    Nav is sent to a worker and rebuilt there on first use.
+    """
+
+    @property
+    def xpaths(self) -> tuple[etree.XPath, ...]:
+        if self._xpaths is None:
+            self._xpaths = compile_xpaths(self.selector, self.engine)
+        return self._xpaths
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "_xpaths": None}
+
+
+def parse_page_ranges(spec: str | int) -> list[tuple[int, int | None]]:
+    """Parse a page selection like "1-10", "3" or "1-3, 7, 20-" (1-based, inclusive).
+
+    Raises:
+        ValueError: If the selection is malformed
+    """
+    ranges = []
+    for part in str(spec).split(","):
+        match = re.fullmatch(r"\s*(\d+)\s*(?:(-)\s*(\d+)?)?\s*", part)
+        if not match:
+            raise ValueError(f"Invalid page range '{part.strip()}' in pages: {spec}")
+        start = int(match.group(1))
+        if match.group(2):
+            end = int(match.group(3)) if match.group(3) else None
+        else:
+            end = start
+        if start < 1 or (end is not None and end < start):
+            raise ValueError(f"Invalid page range '{part.strip()}' in pages: {spec}")
+        ranges.append((start, end))
+    return ranges
+
 
 @dataclass
-class Field:
+class PdfOptions:
+    # 1-based inclusive page ranges; an end of None means the last page
+    pages: list[tuple[int, int | None]] | None = None
+    max_pages: int | None = None
+    per_page: bool = False
+
+
+@dataclass
+class Field(CompiledSelector):
     name: str
     selector: str
+    engine: str = "xpath"
+    _xpaths: tuple | None = field(default=None, init=False, repr=False, compare=False)
 
 
 @dataclass
@@ -23,16 +143,134 @@ class Job:
     transform: list[dict] | None = None
     load: dict | None = None
     no_track: bool = False
+    priority: int = 0
+    rate_limit: RateLimit | None = None
+    conditional_get: bool | None = None
+    cache_ttl: int | None = None
+    retry: RetryPolicy | None = None
+    stream_extract: bool = False
+    pdf: PdfOptions = field(default_factory=PdfOptions)
+
+    def __getstate__(self) -> dict:
+        # Workers never need the discovered URL list, which can be large
+        return {**self.__dict__, "urls": None}
 
 
 @dataclass
-class Nav:
+class Nav(CompiledSelector):
     selector: str
     ftype: str
     url: str | None = None
     must_contain: list[str] | None = None
     must_contain_all: list[str] | None = None
     max_items: int | None = None
+    # "page" caps the URLs taken from each page, "step" the URLs of the whole
+    # navigation step across all of its parent pages
+    max_items_scope: str = "page"
+    # End the step at the first page where at least this share of the URLs
+    # was fetched on earlier runs (last step only, whose URLs are tracked)
+    stop_when_seen: float | None = None
+    conditional: bool = False
+    cache_ttl: int | None = None
+    retry: RetryPolicy | None = None
+    engine: str = "xpath"
+    _xpaths: tuple | None = field(default=None, init=False, repr=False, compare=False)
+
+
+@dataclass
+class RateLimit:
+    requests_per_second: float | None = None
+    max_concurrent: int | None = None
+    burst: int = 1
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    jitter: float = 0.5
+    statuses: list[int] = field(default_factory=lambda: [408, 425, 429, 500, 502, 503, 504])
+
+
+# Default cap on a response body per ftype, in MB; larger responses are skipped
+MAX_SIZE_MB = {"html": 20, "rss": 20, "json": 50, "pdf": 200}
+
+
+@dataclass
+class HttpSettings:
+    pool_size: int = 10
+    max_per_host: int = 10
+    pool_block: bool = False
+    timeout: float = 10
+    conditional_get: bool = False
+    max_size_mb: dict[str, float | None] = field(default_factory=lambda: dict(MAX_SIZE_MB))
+
+
+@dataclass
+class CacheSettings:
+    enabled: bool = False
+    dir: str | None = None
+    ttl: int = 3600
+    max_size_mb: int = 500
+    offline: bool = False
+
+
+@dataclass
+class AsyncSettings:
+    concurrency: int = 200
+    parse_workers: int = 2
+
+
+@dataclass
+class PdfSettings:
+    # PDFs with more selected pages are split into tasks of this many pages
+    # extracted by several workers; 0 disables splitting
+    chunk_pages: int = 50
+
+
+@dataclass
+class UrlSettings:
+    # Canonicalize URLs found during navigation (off by default, since it
+    # changes the URLs recorded in runs.db for existing sources)
+    canonicalize: bool = False
+    strip_fragment: bool = True
+    # Query parameters to drop, as shell-style patterns
+    drop_params: list[str] = field(default_factory=lambda: ["utm_*", "fbclid", "gclid"])
+    sort_query: bool = True
+    strip_trailing_slash: bool = False
+
+
+@dataclass
+class TrackingSettings:
+    # Keep a per-source Bloom filter of tracked URLs next to runs.db so that
+    # URLs never fetched before skip the database lookup
+    prefilter: bool = False
+    error_rate: float = 0.01
+
+
+@dataclass
+class Settings:
+    engine: str = "process"
+    crawl: str = "batch"
+    workers: int = 10
+    feed_parser: str = "feedparser"
+    raw_format: str = "json"
+    rate_limit: RateLimit | None = None
+    http: HttpSettings = field(default_factory=HttpSettings)
+    aio: AsyncSettings = field(default_factory=AsyncSettings)
+    cache: CacheSettings = field(default_factory=CacheSettings)
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    pdf: PdfSettings = field(default_factory=PdfSettings)
+    tracking: TrackingSettings = field(default_factory=TrackingSettings)
+    urls: UrlSettings = field(default_factory=UrlSettings)
+
+
+ENGINES = ("process", "async")
+CRAWL_MODES = ("batch", "stream")
+MAX_ITEMS_SCOPES = ("page", "step")
+FEED_PARSERS = ("feedparser", "lxml")
+RAW_FORMATS = ("json", "jsonl")
 
 
 class Source:
@@ -51,6 +289,12 @@ class Source:
     def gen_jobs(self):
         sources = self.sources["source"]
 
+        # Run state, tracking and output files are all keyed by the source name
+        names = Counter(s["name"] for s in sources)
+        duplicates = [name for name, count in names.items() if count > 1]
+        if duplicates:
+            raise ValueError(f"Duplicate source names in config: {', '.join(duplicates)}")
+
         if self.source_name:
             sources = [s for s in sources if s["name"] == self.source_name]
             if not sources:
@@ -65,31 +309,54 @@ class Source:
             fields = []
             if "fields" in source_conf["extract"]:
                 for field in source_conf["extract"]["fields"]:
-                    fields.append(Field(name=field["name"], selector=field["selector"]))
+                    selector, engine = parse_selector(field["selector"], field.get("engine"))
+                    fields.append(Field(name=field["name"], selector=selector, engine=engine))
+            if source_conf["extract"]["ftype"] in ("html", "mixed"):
+                self.warn_text_selectors(fields)
 
             navs = []
 
             if "navigate" in source_conf:
 
                 for i, navigate in enumerate(source_conf["navigate"]):
+                    selector, engine = parse_selector(
+                        navigate["selector"], navigate.get("engine")
+                    )
+                    max_items_scope = navigate.get("max_items_scope", "page")
+                    if max_items_scope not in MAX_ITEMS_SCOPES:
+                        raise ValueError(
+                            f"Unknown max_items_scope '{max_items_scope}' in source "
+                            f"'{source_conf['name']}'. Available scopes: {', '.join(MAX_ITEMS_SCOPES)}"
+                        )
+                    stop_when_seen = self.gen_stop_when_seen(
+                        navigate.get("stop_when_seen"),
+                        source_conf["name"],
+                        is_final=i == len(source_conf["navigate"]) - 1,
+                    )
                     if i == 0:
                         job_ftype = navigate["ftype"]
                         nav = Nav(
                             url=source_conf["start"],
-                            selector=navigate["selector"],
+                            selector=selector,
                             ftype=navigate["ftype"],
                             must_contain=navigate.get("must_contain"),
                             must_contain_all=navigate.get("must_contain_all"),
                             max_items=navigate.get("max_items"),
+                            max_items_scope=max_items_scope,
+                            stop_when_seen=stop_when_seen,
+                            engine=engine,
                         )
                     else:
                         nav = Nav(
                             url=None,
-                            selector=navigate["selector"],
+                            selector=selector,
                             ftype=navigate["ftype"],
                             must_contain=navigate.get("must_contain"),
                             must_contain_all=navigate.get("must_contain_all"),
                             max_items=navigate.get("max_items"),
+                            max_items_scope=max_items_scope,
+                            stop_when_seen=stop_when_seen,
+                            engine=engine,
                         )
 
                     navs.append(nav)
@@ -107,10 +374,115 @@ class Source:
                     transform=source_conf.get("transform", []),
                     load=source_conf.get("load", None),
                     no_track=source_conf.get("no_track", False),
+                    priority=source_conf.get("priority", 0),
+                    rate_limit=self.gen_rate_limit(source_conf.get("rate_limit")),
+                    conditional_get=source_conf.get("conditional_get"),
+                    cache_ttl=source_conf.get("cache_ttl"),
+                    retry=self.gen_retry(source_conf.get("retry")),
+                    stream_extract=source_conf["extract"].get("stream", False),
+                    pdf=self.gen_pdf(source_conf["extract"]),
                 )
             )
 
         return self.jobs
 
+    def warn_text_selectors(self, fields: list[Field]) -> None:
+        for field in fields:
+            # Warn if selector ends with /text() as it may not capture nested element text
+            if field.engine == "xpath" and field.selector.rstrip().endswith("/text()"):
+                logger.warning(
+                    f"Extraction selector '{field.selector}' ends with /text() which only captures direct text nodes. "
+                    f"This will miss text in nested elements. Consider removing /text() to capture all text content."
+                )
+
+    def gen_stop_when_seen(self, value, source_name: str, is_final: bool) -> float | None:
+        """Threshold of a navigate step's `stop_when_seen`: true means every URL."""
+        if value is None or value is False:
+            return None
+        if not is_final:
+            raise ValueError(
+                f"stop_when_seen in source '{source_name}' is only supported on the last "
+                f"navigate step, whose URLs are tracked"
+            )
+        if value is True:
+            return 1.0
+        if isinstance(value, (int, float)) and 0 < value <= 1:
+            return float(value)
+        raise ValueError(
+            f"stop_when_seen in source '{source_name}' must be true or a share between 0 and 1, "
+            f"got {value!r}"
+        )
+
+    def gen_rate_limit(self, conf: dict | None) -> RateLimit | None:
+        if not conf:
+            return None
+        return RateLimit(**conf)
+
+    def gen_retry(self, conf: dict | None) -> RetryPolicy | None:
+        if not conf:
+            return None
+        return RetryPolicy(**conf)
+
+    def gen_pdf(self, conf: dict) -> PdfOptions:
+        """Page selection of a PDF extract block (`pages`, `max_pages`, `per_page`)."""
+        pages = conf.get("pages")
+        return PdfOptions(
+            pages=parse_page_ranges(pages) if pages is not None else None,
+            max_pages=conf.get("max_pages"),
+            per_page=conf.get("per_page", False),
+        )
+
+    def gen_http(self, conf: dict | None) -> HttpSettings:
+        conf = dict(conf or {})
+        if "max_size_mb" in conf:
+            unknown = set(conf["max_size_mb"]) - set(MAX_SIZE_MB)
+            if unknown:
+                raise ValueError(
+                    f"Unknown ftype in http.max_size_mb: {', '.join(sorted(unknown))}. "
+                    f"Available ftypes: {', '.join(MAX_SIZE_MB)}"
+                )
+            # Only the ftypes given are overridden; null disables a cap
+            conf["max_size_mb"] = {**MAX_SIZE_MB, **conf["max_size_mb"]}
+        return HttpSettings(**conf)
+
+    def gen_settings(self) -> Settings:
+        """Build run-wide settings from the optional top-level `settings` block."""
+        conf = self.sources.get("settings") or {}
+        engine = conf.get("engine", "process")
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown engine '{engine}'. Available engines: {', '.join(ENGINES)}"
+            )
+        crawl = conf.get("crawl", "batch")
+        if crawl not in CRAWL_MODES:
+            raise ValueError(
+                f"Unknown crawl mode '{crawl}'. Available modes: {', '.join(CRAWL_MODES)}"
+            )
+        feed_parser = conf.get("feed_parser", "feedparser")
+        if feed_parser not in FEED_PARSERS:
+            raise ValueError(
+                f"Unknown feed parser '{feed_parser}'. Available parsers: {', '.join(FEED_PARSERS)}"
+            )
+        raw_format = conf.get("raw_format", "json")
+        if raw_format not in RAW_FORMATS:
+            raise ValueError(
+                f"Unknown raw format '{raw_format}'. Available formats: {', '.join(RAW_FORMATS)}"
+            )
+        return Settings(
+            engine=engine,
+            crawl=crawl,
+            workers=conf.get("workers", 10),
+            feed_parser=feed_parser,
+            raw_format=raw_format,
+            rate_limit=self.gen_rate_limit(conf.get("rate_limit")),
+            http=self.gen_http(conf.get("http")),
+            aio=AsyncSettings(**conf.get("async", {})),
+            cache=CacheSettings(**conf.get("cache", {})),
+            retry=self.gen_retry(conf.get("retry")) or RetryPolicy(),
+            pdf=PdfSettings(**conf.get("pdf", {})),
+            tracking=TrackingSettings(**conf.get("tracking", {})),
+            urls=UrlSettings(**conf.get("urls", {})),
+        )
+
     def __getitem__(self, index):
         return self.jobs[index]
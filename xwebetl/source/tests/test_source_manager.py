@@ -1,4 +1,14 @@
-from xwebetl.source.source_manager import Source, Nav, Field, Job
+import pytest
+from xwebetl.source.source_manager import (
+    Source,
+    Nav,
+    Field,
+    Job,
+    Settings,
+    HttpSettings,
+    PdfOptions,
+    MAX_SIZE_MB,
+)
 
 
 def test_generate_jobs_test(test_sources_yml):
@@ -146,3 +156,222 @@ def test_generate_jobs_test_rss_html_pdf(test_sources_yml):
             must_contain=[".pdf"],
         ),
     ]
+
+
+def test_gen_settings_defaults(test_sources_yml):
+    """Test that settings fall back to defaults when the config has no settings block."""
+    source = Source(test_sources_yml)
+    settings = source.gen_settings()
+
+    assert settings == Settings(http=HttpSettings())
+    assert settings.http.pool_size == 10
+    assert settings.http.max_per_host == 10
+
+
+def test_gen_settings_http(tmp_path):
+    """Test that the http settings block configures the connection pool."""
+    config = tmp_path / "sources.yml"
+    config.write_text(
+        "settings:\n"
+        "  http:\n"
+        "    pool_size: 4\n"
+        "    max_per_host: 2\n"
+        "    pool_block: true\n"
+        "source: []\n"
+    )
+
+    settings = Source(str(config)).gen_settings()
+
+    assert settings.http == HttpSettings(pool_size=4, max_per_host=2, pool_block=True)
+
+
+def test_gen_settings_max_size(tmp_path):
+    """Test that per-ftype size caps override only the ftypes given."""
+    config = tmp_path / "sources.yml"
+    config.write_text(
+        "settings:\n  http:\n    max_size_mb:\n      pdf: 500\n      html: null\nsource: []\n"
+    )
+
+    settings = Source(str(config)).gen_settings()
+
+    assert settings.http.max_size_mb == {**MAX_SIZE_MB, "pdf": 500, "html": None}
+
+    config.write_text("settings:\n  http:\n    max_size_mb:\n      docx: 5\nsource: []\n")
+    with pytest.raises(ValueError, match="Unknown ftype in http.max_size_mb: docx"):
+        Source(str(config)).gen_settings()
+
+
+def test_gen_settings_rejects_unknown_engine(tmp_path):
+    """Test that an unknown fetch engine is reported as a config error."""
+    config = tmp_path / "sources.yml"
+    config.write_text("settings:\n  engine: threads\nsource: []\n")
+
+    with pytest.raises(ValueError, match="Unknown engine 'threads'"):
+        Source(str(config)).gen_settings()
+
+
+def test_gen_settings_rejects_unknown_raw_format(tmp_path):
+    """Test that raw_format only accepts json or jsonl."""
+    config = tmp_path / "sources.yml"
+    config.write_text("settings:\n  raw_format: csv\nsource: []\n")
+
+    with pytest.raises(ValueError, match="Unknown raw format 'csv'"):
+        Source(str(config)).gen_settings()
+
+
+def test_field_compiles_xpaths_once_and_pickles_without_them():
+    """Test that compiled selectors are cached, ignored by ==, and not pickled."""
+    import pickle
+
+    field = Field(name="title", selector="//h1|//h2")
+    xpaths = field.xpaths
+
+    assert len(xpaths) == 2
+    assert field.xpaths is xpaths
+    assert field == Field(name="title", selector="//h1|//h2")
+
+    copy = pickle.loads(pickle.dumps(field))
+    assert copy._xpaths is None
+    assert copy == field
+    # Rebuilt on first use from the per-process compile cache
+    assert copy.xpaths is xpaths
+
+
+def test_text_selector_warning_at_load(tmp_path, caplog):
+    """Test that the /text() warning is emitted once per field when the config is loaded."""
+    config = tmp_path / "sources.yml"
+    config.write_text(
+        "source:\n"
+        "  - name: text_sel\n"
+        "    start: http://example.com\n"
+        "    extract:\n"
+        "      ftype: html\n"
+        "      fields:\n"
+        "        - name: title\n"
+        "          selector: //h1/text()\n"
+    )
+
+    with caplog.at_level("WARNING"):
+        Source(str(config)).gen_jobs()
+
+    warnings = [r for r in caplog.records if "ends with /text()" in r.getMessage()]
+    assert len(warnings) == 1
+
+
+def test_parse_selector_css():
+    """Test the css: prefix, the engine key and ::text / ::attr() suffixes."""
+    from xwebetl.source.source_manager import parse_selector, split_css
+
+    assert parse_selector("css: a.title") == ("a.title", "css")
+    assert parse_selector("a.title", "css") == ("a.title", "css")
+    assert parse_selector("//a/@href") == ("//a/@href", "xpath")
+    with pytest.raises(ValueError, match="Unknown selector engine 'jq'"):
+        parse_selector(".items", "jq")
+
+    assert split_css("ul li a::attr(href)") == ("ul li a", "@href")
+    assert split_css("h1::text") == ("h1", "text")
+    assert split_css("#body") == ("#body", None)
+
+    xpaths = Field(name="link", selector="ul > li > a::attr(href)", engine="css").xpaths
+    assert len(xpaths) == 1 and xpaths[0].path.endswith("/@href")
+
+
+def test_pdf_page_options(tmp_path):
+    """Test that pages, max_pages and per_page are read from a PDF extract block."""
+    config = tmp_path / "sources.yml"
+    config.write_text(
+        "source:\n"
+        "  - name: report\n"
+        "    start: http://example.com/report.pdf\n"
+        "    extract:\n"
+        "      ftype: pdf\n"
+        "      pages: 1-3, 10-\n"
+        "      max_pages: 20\n"
+        "      per_page: true\n"
+    )
+
+    job = Source(str(config)).gen_jobs()[0]
+
+    assert job.pdf == PdfOptions(pages=[(1, 3), (10, None)], max_pages=20, per_page=True)
+
+    config.write_text(config.read_text().replace("1-3, 10-", "3-1"))
+    with pytest.raises(ValueError, match="Invalid page range '3-1'"):
+        Source(str(config)).gen_jobs()
+
+
+def test_max_items_scope(tmp_path):
+    """Test that max_items_scope defaults to page and only accepts page or step."""
+    config = tmp_path / "sources.yml"
+    source = """
+source:
+  - name: capped
+    start: http://localhost/
+    navigate:
+      - selector: //a/@href
+        ftype: html
+        max_items: 5
+      - selector: //a/@href
+        ftype: html
+        max_items: 2
+        max_items_scope: {scope}
+    extract:
+      ftype: html
+      fields: []
+"""
+    config.write_text(source.format(scope="step"))
+    navs = Source(str(config)).gen_jobs()[0].nav
+    assert [(nav.max_items, nav.max_items_scope) for nav in navs] == [(5, "page"), (2, "step")]
+
+    config.write_text(source.format(scope="run"))
+    with pytest.raises(ValueError, match="Unknown max_items_scope 'run' in source 'capped'"):
+        Source(str(config)).gen_jobs()
+
+
+def test_stop_when_seen(tmp_path):
+    """Test that stop_when_seen takes true or a share, on the last navigate step only."""
+    config = tmp_path / "sources.yml"
+    source = """
+source:
+  - name: delta
+    start: http://localhost/
+    navigate:
+      - selector: //a/@href
+        ftype: html
+        stop_when_seen: {first}
+      - selector: //a/@href
+        ftype: html
+        stop_when_seen: {last}
+    extract:
+      ftype: html
+      fields: []
+"""
+    for value, expected in (("true", 1.0), ("0.5", 0.5), ("1", 1.0), ("false", None)):
+        config.write_text(source.format(first="false", last=value))
+        navs = Source(str(config)).gen_jobs()[0].nav
+        assert [nav.stop_when_seen for nav in navs] == [None, expected]
+
+    config.write_text(source.format(first="false", last="1.5"))
+    with pytest.raises(ValueError, match="must be true or a share between 0 and 1, got 1.5"):
+        Source(str(config)).gen_jobs()
+
+    config.write_text(source.format(first="true", last="true"))
+    with pytest.raises(ValueError, match="only supported on the last navigate step"):
+        Source(str(config)).gen_jobs()
+
+
+def test_duplicate_source_names_rejected(tmp_path):
+    """Test that two sources with the same name are rejected at load."""
+    config = tmp_path / "sources.yml"
+    source = """
+  - name: {name}
+    start: http://localhost/
+    extract:
+      ftype: html
+      fields: []
+"""
+    config.write_text("source:" + source.format(name="twice") + source.format(name="twice"))
+
+    with pytest.raises(ValueError, match="Duplicate source names in config: twice"):
+        Source(str(config)).gen_jobs()
+    with pytest.raises(ValueError, match="Duplicate source names"):
+        Source(str(config), source_name="twice").gen_jobs()